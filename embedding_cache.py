@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Persistent embedding cache keyed by (model, sha256(text)).
+
+Vectors are stored as float32 blobs in a SQLite file, so re-indexing the
+corpus or re-running a benchmark only sends texts that were never embedded
+with that model to OpenRouter. The file is bounded by max_bytes; when it grows
+past that, the least recently used vectors are evicted. The total vector size
+is kept up to date by triggers, so a write only pays for eviction when the
+bound is actually exceeded, and then only for the rows it removes.
+
+Usage:
+    uv run python embedding_cache.py stats
+    uv run python embedding_cache.py clear [--model qwen/qwen3-embedding-8b]
+
+Environment:
+    EMBEDDING_CACHE_PATH       cache file (default: data/embedding_cache.sqlite), "off" disables
+    EMBEDDING_CACHE_MAX_BYTES  size bound for vector data (default: 2 GiB)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_CACHE_PATH = PROJECT_ROOT / "data" / "embedding_cache.sqlite"
+DEFAULT_MAX_BYTES = 2 << 30
+CACHE_PATH_ENV = "EMBEDDING_CACHE_PATH"
+MAX_BYTES_ENV = "EMBEDDING_CACHE_MAX_BYTES"
+
+# SQLite's default limit on host parameters per statement is 999
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+CREATE TABLE IF NOT EXISTS cache_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings BEGIN
+    UPDATE cache_size SET bytes = bytes + LENGTH(NEW.vector) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings BEGIN
+    UPDATE cache_size SET bytes = bytes - LENGTH(OLD.vector) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_update AFTER UPDATE OF vector ON embeddings BEGIN
+    UPDATE cache_size SET bytes = bytes - LENGTH(OLD.vector) + LENGTH(NEW.vector) WHERE id = 0;
+END;
+"""
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed (model, text) -> float32 vector store with LRU eviction."""
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by threads (e.g. the search daemon), serialised by a lock;
+        # SQLite's own locking covers other processes
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Rows replaced by INSERT OR REPLACE only fire the delete trigger with this on
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            # Caches created before size tracking: count once (a no-op afterwards)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_size (id, bytes) "
+                "SELECT 0, COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                "WHERE NOT EXISTS (SELECT 1 FROM cache_size WHERE id = 0)"
+            )
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Cached vectors in texts order; None for misses."""
+        hashes = [text_hash(text) for text in texts]
+        found: dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock, self._conn:
+            for start in range(0, len(unique), _BATCH):
+                chunk = unique[start:start + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *chunk],
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+            if found:
+                now = time.time_ns()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found],
+                )
+            result = [found.get(key) for key in hashes]
+            hit_count = sum(vector is not None for vector in result)
+            self.hits += hit_count
+            self.misses += len(result) - hit_count
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts, then evict down to max_bytes."""
+        if len(texts) != len(vectors):
+            raise ValueError(f"Got {len(texts)} texts but {len(vectors)} vectors")
+        now = time.time_ns()
+        rows = [
+            (model, text_hash(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT bytes FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop least recently used vectors until the total fits in max_bytes."""
+        excess = self._size() - self.max_bytes
+        if excess <= 0:
+            return
+        # Walks the last_used index from the oldest entry and stops once enough is freed
+        doomed: list[int] = []
+        cursor = self._conn.execute("SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used, rowid")
+        for rowid, size in cursor:
+            doomed.append(rowid)
+            excess -= size
+            if excess <= 0:
+                break
+        cursor.close()
+        for start in range(0, len(doomed), _BATCH):
+            chunk = doomed[start:start + _BATCH]
+            self._conn.execute(f"DELETE FROM embeddings WHERE rowid IN ({','.join('?' * len(chunk))})", chunk)
+
+    def clear(self, model: Optional[str] = None) -> int:
+        """Delete all vectors (or one model's); returns the number removed."""
+        with self._lock, self._conn:
+            if model is None:
+                cursor = self._conn.execute("DELETE FROM embeddings")
+            else:
+                cursor = self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, int]:
+        """Entry count, stored vector bytes and this process's hit/miss counters."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache configured from the environment; None when disabled."""
+    global _default_cache
+    path = os.getenv(CACHE_PATH_ENV) or str(DEFAULT_CACHE_PATH)
+    if path.lower() == "off":
+        return None
+    with _default_lock:
+        if _default_cache is None or str(_default_cache.path) != path:
+            max_bytes = int(os.getenv(MAX_BYTES_ENV) or DEFAULT_MAX_BYTES)
+            _default_cache = EmbeddingCache(path, max_bytes=max_bytes)
+        return _default_cache
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or clear the embedding cache")
+    parser.add_argument("--path", type=str, default=None, help=f"Cache file (default: ${CACHE_PATH_ENV} or {DEFAULT_CACHE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show entry count and size")
+    clear_parser = subparsers.add_parser("clear", help="Delete cached vectors")
+    clear_parser.add_argument("--model", type=str, default=None, help="Only this embedding model")
+    args = parser.parse_args()
+
+    cache = EmbeddingCache(args.path) if args.path else get_default_cache()
+    if cache is None:
+        print(f"Embedding cache disabled (${CACHE_PATH_ENV}=off)")
+        return 1
+
+    if args.command == "clear":
+        print(f"Removed {cache.clear(args.model)} cached vectors from {cache.path}")
+    else:
+        stats = cache.stats()
+        print(f"{cache.path}: {stats['entries']} vectors, {stats['bytes'] / (1 << 20):.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
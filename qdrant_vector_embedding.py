@@ -4,12 +4,24 @@
 from __future__ import annotations
 
 import os
-from typing import Sequence
+import sys
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from qdrant_client import QdrantClient
 
+from embedding_cache import EmbeddingCache, get_default_cache
+
+SRC_DIR = Path(__file__).resolve().parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import client_pool
+
 load_dotenv()
 
 DEFAULT_QDRANT_URL = (
@@ -20,28 +32,58 @@ OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 
 def get_qdrant_client(url: str | None = None, api_key: str | None = None) -> QdrantClient:
-    """Build a Qdrant client from env vars or explicit args."""
+    """Shared Qdrant client from env vars or explicit args."""
     resolved_url = url or os.getenv("QDRANT_URL") or DEFAULT_QDRANT_URL
     resolved_api_key = api_key or os.getenv("QDRANT_API_KEY")
-    return QdrantClient(url=resolved_url, api_key=resolved_api_key)
+    return client_pool.get_qdrant_client(resolved_url, resolved_api_key)
 
 
 def get_openrouter_client(api_key: str | None = None) -> OpenAI:
-    """Build an OpenAI-compatible client pointed at OpenRouter."""
+    """Shared OpenAI-compatible client pointed at OpenRouter."""
     resolved_api_key = api_key or os.getenv("OPENROUTER_API_KEY")
     if not resolved_api_key:
         raise RuntimeError("OPENROUTER_API_KEY is required.")
-    return OpenAI(base_url=OPENROUTER_BASE_URL, api_key=resolved_api_key)
+    return client_pool.get_openai_client(resolved_api_key, OPENROUTER_BASE_URL)
+
+
+def _report_usage(response, on_usage: Callable[[int], None] | None) -> None:
+    usage = getattr(response, "usage", None)
+    if on_usage is not None and usage is not None:
+        on_usage(getattr(usage, "total_tokens", None) or getattr(usage, "prompt_tokens", 0) or 0)
 
 
 def embed_texts(
     texts: Sequence[str],
     model: str = DEFAULT_EMBEDDING_MODEL,
     client: OpenAI | None = None,
+    cache: EmbeddingCache | bool = True,
+    on_usage: Callable[[int], None] | None = None,
 ) -> list[list[float]]:
-    """Embed a batch of texts with OpenRouter and return vectors."""
+    """Embed a batch of texts and return vectors.
+
+    Vectors come from the embedding cache when possible; only texts missing from
+    it are sent to OpenRouter. cache=True uses the default cache, False disables it.
+    on_usage, if given, receives the token count billed for each API request.
+    """
     if not texts:
         return []
-    embed_client = client or get_openrouter_client()
-    response = embed_client.embeddings.create(model=model, input=list(texts))
-    return [item.embedding for item in response.data]
+    if cache is True:
+        cache = get_default_cache()
+    if not cache:
+        embed_client = client or get_openrouter_client()
+        response = embed_client.embeddings.create(model=model, input=list(texts))
+        _report_usage(response, on_usage)
+        return [item.embedding for item in response.data]
+
+    vectors = cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        embed_client = client or get_openrouter_client()
+        response = embed_client.embeddings.create(model=model, input=missing)
+        _report_usage(response, on_usage)
+        fetched = [item.embedding for item in response.data]
+        cache.put_many(model, missing, fetched)
+        # Return the stored float32 values so hits and misses are identical
+        by_text = {text: np.asarray(vector, dtype=np.float32) for text, vector in zip(missing, fetched)}
+        vectors = [by_text[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+    return [vector.tolist() for vector in vectors]
@@ -9,25 +9,38 @@ The Agent:
 6. Detects FINAL_RESULT markers from bash to terminate runs
 7. Passes session info to bash via environment variables
 8. Supports vision models with automatic image injection
+9. Runs synchronously (run) or on an event loop (arun), where the tool
+   calls of one turn execute concurrently
+10. Optionally streams completions and starts each tool call as soon as its
+    arguments are complete
+11. Lays out requests for provider prompt caching and records cache hits
+12. Optionally compacts old tool results and images past a context budget
 """
+import asyncio
 import os
 import re
 import json
 import uuid
 import base64
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 
-from openai import OpenAI
 from dotenv import load_dotenv
 
 from .session import Session
 from .skill_loader import SkillLoader, Skill, generate_skill_routing_prompt, generate_single_skill_prompt
+from .skill_commands import SkillCommandRegistry
 from .prompts import build_system_prompt, SKILL_ROUTING_TOOLS
 from .tools import get_tool_schemas, execute_tool, bash_with_session
 from .config import load_config, get_model_config, resolve_image_csv_path, build_client_kwargs
 from .image_loader import ImageLoader
+from .image_preprocess import ImagePreprocess, ImagePreprocessor
+from .prompt_cache import MessageLayout, prompt_cache_tokens
+from .context_compaction import DEFAULT_KEEP_TURNS, ContextCompactor
+from .streaming import STREAM_KWARGS, StreamedCompletion
+from client_pool import get_async_openai_client, get_openai_client
 
 load_dotenv()
 
@@ -38,6 +51,20 @@ MODULE_DIR = Path(__file__).parent
 FINAL_RESULT_START = "<<<FINAL_RESULT>>>"
 FINAL_RESULT_END = "<<<END_FINAL_RESULT>>>"
 
+# Sent when max_turns is reached without a final answer
+SYNTHESIS_PROMPT = (
+    "You have reached the maximum number of reasoning steps. "
+    "Based on all the research and analysis you've done so far, "
+    "provide a final conclusion or answer. Synthesize your findings "
+    "and provide the best response you can with the information gathered."
+)
+
+# Worker threads for the tool calls of arun(). They mostly wait on bash
+# subprocesses and HTTP, so the pool is sized for concurrent agents rather
+# than CPUs (asyncio's default executor is min(32, cpus + 4)).
+TOOL_WORKERS = int(os.getenv("AGENT_TOOL_WORKERS", "64"))
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="agent-tool")
+
 
 def parse_final_result(output: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
@@ -98,7 +125,12 @@ class Agent:
         custom_instructions: str = "",
         custom_system_prompt: Optional[str] = None,
         session_dir: Optional[Path] = None,
-        agent_name: Optional[str] = None
+        agent_name: Optional[str] = None,
+        in_process_skills: bool = True,
+        stream: bool = False,
+        cache_hints: Optional[bool] = None,
+        context_budget: Optional[int] = None,
+        keep_turns: int = DEFAULT_KEEP_TURNS
     ):
         """Initialize the agent.
 
@@ -116,6 +148,15 @@ class Agent:
             custom_system_prompt: Custom system prompt to append after built prompt (augments, not replaces)
             session_dir: Directory for session storage (defaults to agent_v2/sessions)
             agent_name: Agent identifier (auto-detected from skills if None)
+            in_process_skills: Run skill commands declared in SKILL.md `commands:` inside
+                this process instead of a bash subprocess
+            stream: Stream completions and start tool calls while the reply is
+                still generating; records per-turn timings in the trajectory
+            cache_hints: Mark prompt-cache breakpoints (cache_control) in requests;
+                None decides from the model id (see prompt_cache.py)
+            context_budget: Estimated prompt tokens above which old tool results and
+                images are replaced by digests (None: never compact)
+            keep_turns: Most recent turns that are never compacted
         """
         # Load config
         self.config = load_config(config_path)
@@ -126,6 +167,9 @@ class Agent:
         self.skill_names = skills or []
         self.loaded_skills: List[Skill] = []
         self._load_skills()
+        self.skill_commands: Optional[SkillCommandRegistry] = (
+            SkillCommandRegistry.from_skill_loader(self.skill_loader) if in_process_skills else None
+        )
 
         # Determine agent name (explicit > skills > default)
         if agent_name:
@@ -169,12 +213,22 @@ class Agent:
             self.supports_vision = False
             self._setup_client()
 
+        self.layout = MessageLayout(self.model_id, cache_hints)
+        self.compactor: Optional[ContextCompactor] = (
+            ContextCompactor(context_budget, keep_turns) if context_budget else None
+        )
         self.temperature = temperature
         self.max_turns = max_turns
         self.custom_instructions = custom_instructions
         self.custom_system_prompt = custom_system_prompt
+        self.stream = stream
 
         # Image loader (only for vision models)
+        self.image_preprocess = ImagePreprocess.from_config(self.config.get("image_data", {}).get("preprocess"))
+        # For user-supplied image files; ImageLoader has its own (cached) one for case images
+        self._image_preprocessor: Optional[ImagePreprocessor] = (
+            ImagePreprocessor(self.image_preprocess, ImageLoader.DEFAULT_CACHE_DIR) if self.image_preprocess else None
+        )
         self.image_loader: Optional[ImageLoader] = None
         if self.supports_vision:
             self._setup_image_loader()
@@ -188,19 +242,24 @@ class Agent:
         self._build_tools()
 
     def _setup_client(self):
-        """Setup the OpenAI client based on model name (legacy path)."""
+        """Setup the OpenAI client based on model name (legacy path).
+
+        Clients come from the process-wide pool (src/client_pool.py), so agents
+        and subagents on the same provider share keep-alive connections.
+        """
         if self.model.startswith("deepseek"):
-            self.client = OpenAI(
-                api_key=os.getenv("DEEPSEEK_API_KEY"),
-                base_url="https://api.deepseek.com"
-            )
+            self.client_kwargs = {
+                "api_key": os.getenv("DEEPSEEK_API_KEY"),
+                "base_url": "https://api.deepseek.com"
+            }
             self.model_id = self.model.replace("deepseek/", "")
         else:
-            self.client = OpenAI(
-                api_key=os.getenv("OPENROUTER_API_KEY"),
-                base_url=self.DEFAULT_BASE_URL
-            )
+            self.client_kwargs = {
+                "api_key": os.getenv("OPENROUTER_API_KEY"),
+                "base_url": self.DEFAULT_BASE_URL
+            }
             self.model_id = self.model
+        self.client = get_openai_client(**self.client_kwargs)
 
     def _infer_supports_vision(self, model_id: str) -> bool:
         """Infer vision support for an explicit model ID using configured model profiles."""
@@ -211,16 +270,16 @@ class Agent:
         return False
 
     def _setup_client_from_config(self, model_cfg: Dict[str, Any], model_override: Optional[str] = None):
-        """Setup the OpenAI client from config model entry."""
-        kwargs = build_client_kwargs(model_cfg)
-        self.client = OpenAI(**kwargs)
+        """Setup the OpenAI client from config model entry (shared per base_url/key)."""
+        self.client_kwargs = build_client_kwargs(model_cfg)
+        self.client = get_openai_client(**self.client_kwargs)
         self.model_id = model_override or model_cfg["model_id"]
 
     def _setup_image_loader(self):
         """Initialize the image loader from config."""
         try:
             csv_path = resolve_image_csv_path(self.config, self.config_path)
-            self.image_loader = ImageLoader(csv_path)
+            self.image_loader = ImageLoader(csv_path, preprocess=self.image_preprocess)
             print(f"[Vision] Loaded {self.image_loader.total_images} images "
                   f"across {len(self.image_loader.case_ids)} cases")
         except FileNotFoundError as e:
@@ -238,6 +297,8 @@ class Agent:
         """Build the system prompt based on skills and session.
 
         If custom_system_prompt is provided, it augments (appends to) the built prompt.
+        The session context changes between runs, so it is kept apart
+        (session_prompt) and placed after everything else (see prompt_cache.py).
         """
         skill_prompt = ""
         self.has_skill_routing = False
@@ -247,18 +308,19 @@ class Agent:
         elif len(self.loaded_skills) > 1:
             skill_prompt = generate_skill_routing_prompt(self.loaded_skills)
             self.has_skill_routing = True
-        session_prompt = self.session.get_context_prompt()
+        self.session_prompt = self.session.get_context_prompt()
 
-        self.system_prompt = build_system_prompt(
+        self.static_system_prompt = build_system_prompt(
             skill_prompt=skill_prompt,
-            session_prompt=session_prompt,
             has_skill_routing=self.has_skill_routing,
             custom_instructions=self.custom_instructions
         )
 
         # Augment with custom system prompt if provided
         if self.custom_system_prompt:
-            self.system_prompt = f"{self.system_prompt}\n\n{self.custom_system_prompt}"
+            self.static_system_prompt = f"{self.static_system_prompt}\n\n{self.custom_system_prompt}"
+
+        self.system_prompt = "\n\n".join(filter(None, [self.static_system_prompt, self.session_prompt]))
 
     def _build_tools(self):
         """Build tool schemas for this agent.
@@ -280,6 +342,10 @@ class Agent:
         if not path.exists():
             return None
 
+        # User-supplied files are not cached on disk
+        if self._image_preprocessor:
+            return self._image_preprocessor.data_url(path)
+
         suffix = path.suffix.lower()
         mime_types = {
             ".jpg": "image/jpeg",
@@ -319,22 +385,28 @@ class Agent:
             command = args.get("command", "")
             timeout = args.get("timeout", 60)
 
-            result = bash_with_session(
-                command=command,
-                session_id=self.session_id,
-                session_dir=str(self.session_dir),
-                timeout=timeout
-            )
+            result = None
+            if self.skill_commands:
+                # Declared skill scripts run in-process against the live session
+                self.session.reload()
+                result = self.skill_commands.execute(command, self.session, timeout=timeout)
+            if result is None:
+                result = bash_with_session(
+                    command=command,
+                    session_id=self.session_id,
+                    session_dir=str(self.session_dir),
+                    timeout=timeout
+                )
 
             # Check for FINAL_RESULT marker
             is_final, final_data = parse_final_result(result)
             if is_final:
                 # Reload session to get any updates from the script
-                self.session._load()
+                self.session.reload()
                 return result, True, final_data
 
             # Reload session in case script updated it
-            self.session._load()
+            self.session.reload()
             return result, False, None
 
         # Other tools (web_search, think)
@@ -386,35 +458,20 @@ class Agent:
 
         return False
 
-    def run(
+    def _start_run(
         self,
         user_input: str,
-        image: Optional[str] = None,
-        case_id: Optional[str | int] = None,
-        run_id: Optional[str] = None
-    ) -> str:
-        """Run the agent on a user input.
-
-        The run loop terminates when:
-        1. LLM returns a response without tool calls
-        2. A bash tool returns a FINAL_RESULT marker
-        3. Max turns is reached
-
-        Args:
-            user_input: The user's text input
-            image: Optional path to a local image file
-            case_id: Optional eurorad case ID to auto-load images (vision models)
-            run_id: Optional run identifier (auto-generated if None)
-
-        Returns:
-            The agent's final response string (or FINAL_RESULT JSON)
-        """
+        image: Optional[str],
+        case_id: Optional[str | int],
+        run_id: Optional[str]
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """Build the initial messages and trajectory record of a run."""
         run_id = run_id or f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
 
         # Rebuild prompt to include latest session context
         self._build_system_prompt()
 
-        messages = [{"role": "system", "content": self.system_prompt}]
+        messages = [self.layout.system_message(self.static_system_prompt, self.session_prompt)]
 
         # Build user message
         user_content: List[Dict[str, Any]] = [{"type": "text", "text": user_input}]
@@ -453,10 +510,246 @@ class Agent:
             "image": image,
             "case_id": str(case_id) if case_id else None,
             "turns": [],
-            "tokens": {"input": 0, "output": 0},
+            "tokens": {"input": 0, "output": 0, "cached_input": 0, "uncached_input": 0},
+            "stream": self.stream,
             "started_at": datetime.now().isoformat(),
             "termination_reason": None
         }
+        return messages, trajectory
+
+    def _completion_kwargs(self, messages: List[Any]) -> Dict[str, Any]:
+        return {
+            "model": self.model_id,
+            "messages": self.layout.render(messages),
+            "tools": self.tools if self.tools else None,
+            "temperature": self.temperature
+        }
+
+    def _stream_turn(self, messages: List[Any]) -> Tuple[StreamedCompletion, List[Future]]:
+        """Stream one completion, submitting each tool call once its arguments are complete.
+
+        Returns the completion and one future per tool call, in call order.
+        """
+        completion = StreamedCompletion()
+        futures: Dict[int, Future] = {}
+
+        def start(positions: List[int]):
+            for position in positions:
+                futures[position] = _tool_executor.submit(self._execute_tool, *completion.call(position))
+
+        stream = self.client.chat.completions.create(**self._completion_kwargs(messages), **STREAM_KWARGS)
+        for chunk in stream:
+            start(completion.feed(chunk))
+        start(completion.finish())
+        return completion, [futures[position] for position in sorted(futures)]
+
+    async def _astream_turn(self, client, messages: List[Any]) -> Tuple[StreamedCompletion, List[asyncio.Future]]:
+        """Async _stream_turn() on the event loop's client."""
+        loop = asyncio.get_running_loop()
+        completion = StreamedCompletion()
+        futures: Dict[int, asyncio.Future] = {}
+
+        def start(positions: List[int]):
+            for position in positions:
+                futures[position] = loop.run_in_executor(_tool_executor, self._execute_tool, *completion.call(position))
+
+        stream = await client.chat.completions.create(**self._completion_kwargs(messages), **STREAM_KWARGS)
+        async for chunk in stream:
+            start(completion.feed(chunk))
+        start(completion.finish())
+        return completion, [futures[position] for position in sorted(futures)]
+
+    def _compact_context(self, messages: List[Any], turn: int, trajectory: Dict[str, Any]) -> None:
+        """Compact old messages if over the context budget; the trajectory keeps full results."""
+        if not self.compactor:
+            return
+        record = self.compactor.compact(messages)
+        if record:
+            trajectory.setdefault("compactions", []).append({"turn": turn, **record})
+
+    def _record_usage(self, trajectory: Dict[str, Any], response) -> Optional[Dict[str, int]]:
+        """Add the token usage of a response (or StreamedCompletion) to the trajectory.
+
+        Returns this call's counts, including prompt tokens served from the
+        provider's prompt cache, or None if the response had no usage.
+        """
+        if not response.usage:
+            return None
+        usage = {
+            "input": response.usage.prompt_tokens,
+            "output": response.usage.completion_tokens,
+            **prompt_cache_tokens(response.usage)
+        }
+        for key, count in usage.items():
+            trajectory["tokens"][key] = trajectory["tokens"].get(key, 0) + count
+        return usage
+
+    def _parse_tool_calls(self, message) -> List[Tuple[Any, str, dict]]:
+        """(tool_call, name, parsed args) for each tool call of a message."""
+        calls = []
+        for tool_call in message.tool_calls:
+            try:
+                args = json.loads(tool_call.function.arguments)
+            except json.JSONDecodeError:
+                args = {}
+            calls.append((tool_call, tool_call.function.name, args))
+        return calls
+
+    def _apply_tool_results(
+        self,
+        calls: List[Tuple[Any, str, dict]],
+        outcomes,
+        messages: List[Any],
+        turn: int,
+        turn_record: Dict[str, Any],
+        trajectory: Dict[str, Any]
+    ) -> Optional[Tuple[str, Optional[Dict]]]:
+        """Append a turn's tool results to the conversation in call order.
+
+        outcomes yields the _execute_tool() result of each call, either lazily
+        (run executes a call only when it is reached) or precomputed (arun).
+        Stops at the first FINAL_RESULT and returns (final_response,
+        final_result_data); otherwise injects navigated case images, adds the
+        turn counter and returns None.
+        """
+        trajectory["turns"].append(turn_record)
+
+        for (tool_call, name, args), (result, is_final, final_data) in zip(calls, outcomes):
+            turn_record["tool_calls"].append({
+                "name": name,
+                "args": args,
+                "result": result, # need full results
+                "is_final": is_final
+            })
+
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": result
+            })
+
+            # Check for FINAL_RESULT termination
+            if is_final:
+                trajectory["termination_reason"] = "final_result"
+                turn_record["final"] = True
+                return (json.dumps(final_data) if final_data else result), final_data
+
+        # Inject images when agent navigates to a case (vision models)
+        if self.image_loader:
+            for _, name, args in calls:
+                if name == "bash":
+                    nav_case_id = self._extract_navigate_case_id(args.get("command", ""))
+                    if nav_case_id:
+                        injected = self._inject_case_images(nav_case_id, messages)
+                        if injected:
+                            turn_record.setdefault("images_injected", []).append(nav_case_id)
+
+        # Add turn counter reminder to keep LLM aware of remaining turns
+        turns_remaining = self.max_turns - turn
+        if turns_remaining <= 3:
+            # Urgent warning when very low
+            turn_warning = f"\n[Turn {turn}/{self.max_turns} - Only {turns_remaining} turns left! Prioritize completing your task.]"
+        elif turns_remaining <= 5:
+            # Moderate warning
+            turn_warning = f"\n[Turn {turn}/{self.max_turns} - {turns_remaining} turns remaining, work efficiently.]"
+        else:
+            # Just a counter
+            turn_warning = f"\n[Turn {turn}/{self.max_turns}]"
+
+        # Append turn info to last tool/user message
+        if messages and messages[-1]["role"] == "tool":
+            messages[-1]["content"] += turn_warning
+        elif messages and messages[-1]["role"] == "user":
+            # Images were injected as user message; append counter there
+            content = messages[-1]["content"]
+            if isinstance(content, str):
+                messages[-1]["content"] += turn_warning
+            elif isinstance(content, list):
+                content.append({"type": "text", "text": turn_warning})
+        return None
+
+    def _complete_naturally(self, message, turn_record: Dict[str, Any], trajectory: Dict[str, Any]) -> str:
+        """Record a reply without tool calls (the LLM finished) and return it."""
+        turn_record["final"] = True
+        trajectory["termination_reason"] = "llm_complete"
+        trajectory["turns"].append(turn_record)
+        return message.content or ""
+
+    def _record_synthesis(self, trajectory: Dict[str, Any], response, turn: int) -> str:
+        """Record the max-turns synthesis reply and return it."""
+        usage = self._record_usage(trajectory, response)
+        final_response = response.choices[0].message.content or "Unable to synthesize findings."
+        trajectory["turns"].append({
+            "turn": turn + 1,
+            "content": final_response,
+            "tool_calls": [],
+            "final": True,
+            "synthesis": True,
+            "tokens": usage
+        })
+        return final_response
+
+    def _finish_run(
+        self,
+        user_input: str,
+        trajectory: Dict[str, Any],
+        final_response: str,
+        final_result_data: Optional[Dict],
+        turn: int
+    ) -> str:
+        """Save the trajectory and add the run to the session history."""
+        trajectory["finished_at"] = datetime.now().isoformat()
+        trajectory["output"] = final_response
+        trajectory["final_result_data"] = final_result_data
+        trajectory["total_turns"] = turn
+        if self.image_loader:
+            # Process-wide counters: the cache is shared by all agents
+            trajectory["image_cache"] = self.image_loader.url_cache.stats()
+
+        # Store trajectory as instance variable for external access
+        self.trajectory = trajectory
+
+        self._save_trajectory(trajectory)
+
+        # Reload session to capture any updates from scripts
+        self.session.reload()
+
+        self.session.add_run({
+            "run_id": trajectory["run_id"],
+            "input": user_input,
+            "output_summary": final_response[:500],
+            "output": final_response,
+            "final_result_data": final_result_data,
+            "turns": turn,
+            "tokens": trajectory["tokens"]
+        })
+
+        return final_response
+
+    def run(
+        self,
+        user_input: str,
+        image: Optional[str] = None,
+        case_id: Optional[str | int] = None,
+        run_id: Optional[str] = None
+    ) -> str:
+        """Run the agent on a user input.
+
+        The run loop terminates when:
+        1. LLM returns a response without tool calls
+        2. A bash tool returns a FINAL_RESULT marker
+        3. Max turns is reached
+
+        Args:
+            user_input: The user's text input
+            image: Optional path to a local image file
+            case_id: Optional eurorad case ID to auto-load images (vision models)
+            run_id: Optional run identifier (auto-generated if None)
+
+        Returns:
+            The agent's final response string (or FINAL_RESULT JSON)
+        """
+        messages, trajectory = self._start_run(user_input, image, case_id, run_id)
 
         turn = 0
         final_response = ""
@@ -464,185 +757,156 @@ class Agent:
 
         while turn < self.max_turns:
             turn += 1
+            self._compact_context(messages, turn, trajectory)
 
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model_id,
-                    messages=messages,
-                    tools=self.tools if self.tools else None,
-                    temperature=self.temperature
-                )
+                if self.stream:
+                    response, tool_futures = self._stream_turn(messages)
+                    message = response.message()
+                else:
+                    response = self.client.chat.completions.create(**self._completion_kwargs(messages))
+                    message = response.choices[0].message
             except Exception as e:
                 final_response = f"Error calling LLM: {str(e)}"
                 trajectory["termination_reason"] = "llm_error"
                 break
 
-            if response.usage:
-                trajectory["tokens"]["input"] += response.usage.prompt_tokens
-                trajectory["tokens"]["output"] += response.usage.completion_tokens
-
-            choice = response.choices[0]
-            message = choice.message
+            usage = self._record_usage(trajectory, response)
 
             turn_record = {
                 "turn": turn,
                 "content": message.content,
-                "tool_calls": []
+                "tool_calls": [],
+                "tokens": usage
             }
+            if self.stream:
+                turn_record["timing"] = response.timings()
 
-            if message.tool_calls:
-                messages.append(message)
-
-                for tool_call in message.tool_calls:
-                    name = tool_call.function.name
-                    try:
-                        args = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        args = {}
-
-                    result, is_final, final_data = self._execute_tool(name, args)
-
-                    turn_record["tool_calls"].append({
-                        "name": name,
-                        "args": args,
-                        "result": result, # need full results
-                        "is_final": is_final
-                    })
-
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result
-                    })
-
-                    # Check for FINAL_RESULT termination
-                    if is_final:
-                        final_result_data = final_data
-                        final_response = json.dumps(final_data) if final_data else result
-                        trajectory["termination_reason"] = "final_result"
-                        turn_record["final"] = True
-                        trajectory["turns"].append(turn_record)
-                        break
-
-                trajectory["turns"].append(turn_record)
-
-                # Exit outer loop if we got a final result
-                if final_result_data is not None:
-                    break
-
-                # Inject images when agent navigates to a case (vision models)
-                if self.image_loader:
-                    for tc in (message.tool_calls or []):
-                        if tc.function.name == "bash":
-                            try:
-                                tc_args = json.loads(tc.function.arguments)
-                            except json.JSONDecodeError:
-                                continue
-                            nav_case_id = self._extract_navigate_case_id(tc_args.get("command", ""))
-                            if nav_case_id:
-                                injected = self._inject_case_images(nav_case_id, messages)
-                                if injected:
-                                    turn_record.setdefault("images_injected", []).append(nav_case_id)
-
-                # Add turn counter reminder to keep LLM aware of remaining turns
-                turns_remaining = self.max_turns - turn
-                if turns_remaining <= 3:
-                    # Urgent warning when very low
-                    turn_warning = f"\n[Turn {turn}/{self.max_turns} - Only {turns_remaining} turns left! Prioritize completing your task.]"
-                elif turns_remaining <= 5:
-                    # Moderate warning
-                    turn_warning = f"\n[Turn {turn}/{self.max_turns} - {turns_remaining} turns remaining, work efficiently.]"
-                else:
-                    # Just a counter
-                    turn_warning = f"\n[Turn {turn}/{self.max_turns}]"
-
-                # Append turn info to last tool/user message
-                if messages and messages[-1]["role"] == "tool":
-                    messages[-1]["content"] += turn_warning
-                elif messages and messages[-1]["role"] == "user":
-                    # Images were injected as user message; append counter there
-                    content = messages[-1]["content"]
-                    if isinstance(content, str):
-                        messages[-1]["content"] += turn_warning
-                    elif isinstance(content, list):
-                        content.append({"type": "text", "text": turn_warning})
+            if not message.tool_calls:
+                final_response = self._complete_naturally(message, turn_record, trajectory)
+                break
+
+            messages.append(message)
+            calls = self._parse_tool_calls(message)
+            if self.stream:
+                # Already started while the reply was streaming
+                outcomes = (future.result() for future in tool_futures)
             else:
-                # No tool calls - LLM finished naturally
-                final_response = message.content or ""
-                turn_record["final"] = True
-                trajectory["termination_reason"] = "llm_complete"
-                trajectory["turns"].append(turn_record)
+                # Tools run one at a time, and none after a FINAL_RESULT
+                outcomes = (self._execute_tool(name, args) for _, name, args in calls)
+            final = self._apply_tool_results(calls, outcomes, messages, turn, turn_record, trajectory)
+            if final is not None:
+                final_response, final_result_data = final
                 break
 
         if turn >= self.max_turns and not final_response:
             # Max turns reached - make one final call to synthesize findings
             trajectory["termination_reason"] = "max_turns_synthesized"
-
             try:
-                # Add instruction for final synthesis
-                synthesis_prompt = (
-                    "You have reached the maximum number of reasoning steps. "
-                    "Based on all the research and analysis you've done so far, "
-                    "provide a final conclusion or answer. Synthesize your findings "
-                    "and provide the best response you can with the information gathered."
-                )
+                messages.append({"role": "user", "content": SYNTHESIS_PROMPT})
+                self._compact_context(messages, turn + 1, trajectory)
+                response = self.client.chat.completions.create(**self._completion_kwargs(messages))
+                final_response = self._record_synthesis(trajectory, response, turn)
+            except Exception as e:
+                final_response = f"Reached maximum reasoning steps. Failed to synthesize: {str(e)}"
+                trajectory["termination_reason"] = "max_turns_synthesis_failed"
 
-                messages.append({
-                    "role": "user",
-                    "content": synthesis_prompt
-                })
+        return self._finish_run(user_input, trajectory, final_response, final_result_data, turn)
 
-                # Final LLM call without tools - just get the synthesis
-                response = self.client.chat.completions.create(
-                    model=self.model_id,
-                    messages=messages,
-                    tools=self.tools if self.tools else None,
-                    temperature=self.temperature
-                )
+    async def arun(
+        self,
+        user_input: str,
+        image: Optional[str] = None,
+        case_id: Optional[str | int] = None,
+        run_id: Optional[str] = None
+    ) -> str:
+        """Async run() on the pooled AsyncOpenAI client.
 
-                if response.usage:
-                    trajectory["tokens"]["input"] += response.usage.prompt_tokens
-                    trajectory["tokens"]["output"] += response.usage.completion_tokens
+        Same loop, trajectory and session records as run(), except that all
+        tool calls of a turn start together (bash and skill scripts block, so
+        each runs on a worker thread, see TOOL_WORKERS) and the turn takes as long as the slowest
+        one. Results are still appended in the order the model issued the
+        calls; a FINAL_RESULT ends the run at the first final call in that
+        order, even though the calls after it have already run.
 
-                final_response = response.choices[0].message.content or "Unable to synthesize findings."
+        Many agents can share one event loop instead of a thread each:
 
-                # Record the synthesis turn
-                trajectory["turns"].append({
-                    "turn": turn + 1,
-                    "content": final_response,
-                    "tool_calls": [],
-                    "final": True,
-                    "synthesis": True
-                })
+            results = await asyncio.gather(*(agent.arun(task) for agent, task in jobs))
 
+        Steps that block (image loading, session file locking, trajectory
+        writes) also run on worker threads, so one agent never stalls the
+        others on the loop.
+        """
+        client = get_async_openai_client(**self.client_kwargs)
+        loop = asyncio.get_running_loop()
+        messages, trajectory = await loop.run_in_executor(
+            _tool_executor, self._start_run, user_input, image, case_id, run_id
+        )
+
+        turn = 0
+        final_response = ""
+        final_result_data = None
+
+        while turn < self.max_turns:
+            turn += 1
+            self._compact_context(messages, turn, trajectory)
+
+            try:
+                if self.stream:
+                    response, tool_futures = await self._astream_turn(client, messages)
+                    message = response.message()
+                else:
+                    response = await client.chat.completions.create(**self._completion_kwargs(messages))
+                    message = response.choices[0].message
             except Exception as e:
-                final_response = f"Reached maximum reasoning steps. Failed to synthesize: {str(e)}"
-                trajectory["termination_reason"] = "max_turns_synthesis_failed"
+                final_response = f"Error calling LLM: {str(e)}"
+                trajectory["termination_reason"] = "llm_error"
+                break
 
-        trajectory["finished_at"] = datetime.now().isoformat()
-        trajectory["output"] = final_response
-        trajectory["final_result_data"] = final_result_data
-        trajectory["total_turns"] = turn
+            usage = self._record_usage(trajectory, response)
 
-        # Store trajectory as instance variable for external access
-        self.trajectory = trajectory
+            turn_record = {
+                "turn": turn,
+                "content": message.content,
+                "tool_calls": [],
+                "tokens": usage
+            }
+            if self.stream:
+                turn_record["timing"] = response.timings()
 
-        self._save_trajectory(trajectory)
+            if not message.tool_calls:
+                final_response = self._complete_naturally(message, turn_record, trajectory)
+                break
 
-        # Reload session to capture any updates from scripts
-        self.session._load()
+            messages.append(message)
+            calls = self._parse_tool_calls(message)
+            if not self.stream:
+                tool_futures = [
+                    loop.run_in_executor(_tool_executor, self._execute_tool, name, args) for _, name, args in calls
+                ]
+            outcomes = await asyncio.gather(*tool_futures)
+            # Loads navigated cases' images (disk, Pillow, possibly a browser download)
+            final = await loop.run_in_executor(
+                _tool_executor, self._apply_tool_results, calls, outcomes, messages, turn, turn_record, trajectory
+            )
+            if final is not None:
+                final_response, final_result_data = final
+                break
 
-        self.session.add_run({
-            "run_id": run_id,
-            "input": user_input,
-            "output_summary": final_response[:500],
-            "output": final_response,
-            "final_result_data": final_result_data,
-            "turns": turn,
-            "tokens": trajectory["tokens"]
-        })
+        if turn >= self.max_turns and not final_response:
+            trajectory["termination_reason"] = "max_turns_synthesized"
+            try:
+                messages.append({"role": "user", "content": SYNTHESIS_PROMPT})
+                self._compact_context(messages, turn + 1, trajectory)
+                response = await client.chat.completions.create(**self._completion_kwargs(messages))
+                final_response = self._record_synthesis(trajectory, response, turn)
+            except Exception as e:
+                final_response = f"Reached maximum reasoning steps. Failed to synthesize: {str(e)}"
+                trajectory["termination_reason"] = "max_turns_synthesis_failed"
 
-        return final_response
+        return await loop.run_in_executor(
+            _tool_executor, self._finish_run, user_input, trajectory, final_response, final_result_data, turn
+        )
 
     def _save_trajectory(self, trajectory: dict):
         """Save trajectory to log file."""
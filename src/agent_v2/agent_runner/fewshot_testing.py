@@ -41,6 +41,10 @@ Usage:
     # Run only baseline or only fewshot
     uv run python src/agent_v2/agent_runner/fewshot_testing.py --mode baseline
     uv run python src/agent_v2/agent_runner/fewshot_testing.py --mode fewshot
+
+    # Stream responses (tool calls start before the reply finishes; per-turn
+    # time-to-first-token/tool is recorded in the trajectory logs)
+    uv run python src/agent_v2/agent_runner/fewshot_testing.py --stream
 """
 
 import sys
@@ -48,8 +52,8 @@ import csv
 import json
 import re
 import argparse
+import asyncio
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
@@ -62,7 +66,8 @@ AGENT_V2_DIR = SRC_DIR / "agent_v2"
 sys.path.insert(0, str(SRC_DIR))
 
 from agent_v2.agent import Agent
-from med_search import MedSearchEngine
+from agent_v2.image_loader import get_url_cache
+from case_store import CaseStore
 
 # Default paths
 DEFAULT_CASES_CSV = PROJECT_ROOT / "medd_selected_50.csv"
@@ -153,9 +158,9 @@ def load_relevant_cases_csv(csv_path: Path) -> Dict[str, List[Tuple[str, str]]]:
 
 def build_relevant_cases_fulltext(
     relevant_map: Dict[str, List[Tuple[str, str]]],
-    search_engine: MedSearchEngine
+    case_store: CaseStore
 ) -> Dict[str, str]:
-    """Build full text blocks for all relevant cases using MedSearchEngine.
+    """Build full text blocks for all relevant cases from the keyed case store.
 
     For each target case, looks up each relevant case by number in the database
     and formats it using MedCase.display() (same as med_search.py output).
@@ -168,9 +173,10 @@ def build_relevant_cases_fulltext(
     for target_num, relevant_list in relevant_map.items():
         parts = []
         for case_id, reason in relevant_list:
-            results = search_engine.search(case_id, top_k=1)
-            if results:
-                case_obj, _ = results[0]
+            # Ids that are not case numbers (blank, free text) are reported as not found
+            case_number = str(case_id).strip()
+            case_obj = case_store.get(int(case_number)) if case_number.isdigit() else None
+            if case_obj is not None:
                 case_text = case_obj.display()
                 parts.append(
                     f"[Relevant Case {case_id}]\n"
@@ -281,7 +287,7 @@ def extract_answer(result: str) -> Tuple[Optional[str], str]:
     return answer, reasoning
 
 
-def run_single_case(
+async def run_single_case(
     case: Dict[str, Any],
     case_index: int,
     relevant_fulltext: Optional[str],
@@ -293,8 +299,9 @@ def run_single_case(
     skills_dir: Path,
     session_dir: Path,
     retry_no_answer: int = 1,
+    stream: bool = False,
 ) -> Dict[str, Any]:
-    """Run a single case through the vision agent.
+    """Run a single case through the vision agent (on the caller's event loop).
 
     Args:
         case: Case dict from CSV
@@ -304,6 +311,7 @@ def run_single_case(
         config_path: Path to agent_config.yaml
         skills_dir: Path to skills directory
         session_dir: Path to session directory
+        stream: Stream completions (see Agent(stream=True))
 
     Returns:
         Dict with result data
@@ -354,7 +362,9 @@ def run_single_case(
                 this_max_turns = 3
                 this_temperature = 0.2
 
-            agent = Agent(
+            # Agent setup loads the image index from disk, so keep it off the loop
+            agent = await asyncio.to_thread(
+                Agent,
                 session_id=this_session_id,
                 session_dir=session_dir,
                 skills=[],  # no skills, custom prompt only
@@ -365,11 +375,12 @@ def run_single_case(
                 max_turns=this_max_turns,
                 temperature=this_temperature,
                 custom_system_prompt=this_system_prompt,
-                agent_name=f"fewshot-{mode}-{case_index}"
+                agent_name=f"fewshot-{mode}-{case_index}",
+                stream=stream,
             )
 
             start_time = time.time()
-            result = agent.run(user_prompt, case_id=case_number, run_id=f"fewshot_{mode}_{case_index}_a{attempt}")
+            result = await agent.arun(user_prompt, case_id=case_number, run_id=f"fewshot_{mode}_{case_index}_a{attempt}")
             elapsed_total += (time.time() - start_time)
             final_result_text = result or ""
 
@@ -438,21 +449,24 @@ def run_mode(
     session_dir: Path,
     workers: int,
     retry_no_answer: int,
+    stream: bool = False,
 ) -> Tuple[List[Dict[str, Any]], int, int]:
     """Run all cases in a given mode.
 
+    Up to `workers` agents run concurrently as coroutines on one event loop.
+
     Returns:
         (results_list, correct_count, total_count)
     """
     total_cases = len(case_indices)
     workers = max(1, min(workers, total_cases))
 
-    def _run_idx(idx: int) -> Dict[str, Any]:
+    async def _run_idx(idx: int) -> Dict[str, Any]:
         case = cases[idx]
         case_number = extract_case_number(case.get('case_title', ''))
         relevant_text = relevant_fulltext_dict.get(case_number) if mode == "fewshot" else None
         relevant_entries = relevant_map.get(case_number, []) if mode == "fewshot" else []
-        return run_single_case(
+        return await run_single_case(
             case=case,
             case_index=idx,
             relevant_fulltext=relevant_text,
@@ -464,10 +478,11 @@ def run_mode(
             skills_dir=skills_dir,
             session_dir=session_dir,
             retry_no_answer=retry_no_answer,
+            stream=stream,
         )
 
     # Sequential fallback (workers=1) to preserve existing behavior when desired.
-    if workers == 1:
+    async def _run_sequential() -> Tuple[List[Dict[str, Any]], int, int]:
         results = []
         correct = 0
         total = 0
@@ -476,7 +491,7 @@ def run_mode(
             print(f"\n{'─'*60}")
             print(f"[{mode.upper()}] Case {total+1}/{total_cases}: {case.get('case_title', '')}")
             print(f"{'─'*60}")
-            result = _run_idx(idx)
+            result = await _run_idx(idx)
             results.append(result)
             total += 1
             if result['correct']:
@@ -486,16 +501,18 @@ def run_mode(
             print(f"  Running Accuracy: {correct}/{total} ({100*correct/total:.1f}%)")
         return results, correct, total
 
-    print(f"Running {mode} with {workers} workers...")
-    results_by_idx: Dict[int, Dict[str, Any]] = {}
-    done = 0
-    correct = 0
+    async def _run_concurrent() -> Tuple[List[Dict[str, Any]], int, int]:
+        semaphore = asyncio.Semaphore(workers)
+        results_by_idx: Dict[int, Dict[str, Any]] = {}
+        done = 0
+        correct = 0
+
+        async def _bounded(idx: int) -> Tuple[int, Dict[str, Any]]:
+            async with semaphore:
+                return idx, await _run_idx(idx)
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = {executor.submit(_run_idx, idx): idx for idx in case_indices}
-        for future in as_completed(futures):
-            idx = futures[future]
-            result = future.result()
+        for next_done in asyncio.as_completed([_bounded(idx) for idx in case_indices]):
+            idx, result = await next_done
             results_by_idx[idx] = result
             done += 1
             if result['correct']:
@@ -508,8 +525,14 @@ def run_mode(
                 f"GT: {result['ground_truth']} | Agent: {result['agent_answer']}"
             )
 
-    ordered_results = [results_by_idx[idx] for idx in case_indices]
-    return ordered_results, correct, total_cases
+        ordered_results = [results_by_idx[idx] for idx in case_indices]
+        return ordered_results, correct, total_cases
+
+    if workers == 1:
+        return asyncio.run(_run_sequential())
+
+    print(f"Running {mode} with {workers} concurrent agents...")
+    return asyncio.run(_run_concurrent())
 
 
 def print_summary(all_results: Dict[str, Dict[str, Any]]):
@@ -543,6 +566,12 @@ def print_summary(all_results: Dict[str, Dict[str, Any]]):
             title = b['case_title'][:29]
             print(f"{title:<30} {b_status:>10} {f_status:>10} {change:>8}")
 
+    image_cache = get_url_cache().stats()
+    if image_cache["hits"] + image_cache["misses"]:
+        print(f"\nImage data URL cache: {image_cache['hits']} hits / {image_cache['misses']} misses "
+              f"({100*image_cache['hit_rate']:.0f}%), {image_cache['bytes'] / (1 << 20):.1f} MB in "
+              f"{image_cache['entries']} entries, {image_cache['evictions']} evicted")
+
 
 def _bool_icon(value: bool) -> str:
     return "Y" if value else "N"
@@ -665,12 +694,17 @@ Examples:
     )
     parser.add_argument(
         "--workers", type=int, default=5,
-        help="Parallel workers per mode (default: 5)"
+        help="Concurrent agents per mode, sharing one event loop (default: 5)"
     )
     parser.add_argument(
         "--retry-no-answer", type=int, default=1,
         help="Retries when no answer can be parsed (default: 1)"
     )
+
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Stream completions and start tool calls before the reply finishes"
+    )
 
     args = parser.parse_args()
     args.output_dir.mkdir(parents=True, exist_ok=True)
@@ -689,8 +723,8 @@ Examples:
 
     # Step 2: Build full text for relevant cases from the database
     print("\n[2] Loading case database and building reference text...")
-    engine = MedSearchEngine(str(args.database_csv))
-    relevant_fulltext = build_relevant_cases_fulltext(relevant_map, engine)
+    case_store = CaseStore.open(args.database_csv)
+    relevant_fulltext = build_relevant_cases_fulltext(relevant_map, case_store)
     for case_num, text in relevant_fulltext.items():
         print(f"    Case {case_num}: {len(text):,} chars of reference text")
 
@@ -732,6 +766,7 @@ Examples:
             session_dir=args.session_dir,
             workers=args.workers,
             retry_no_answer=args.retry_no_answer,
+            stream=args.stream,
         )
         all_results["baseline"] = {
             "results": baseline_results,
@@ -755,6 +790,7 @@ Examples:
             session_dir=args.session_dir,
             workers=args.workers,
             retry_no_answer=args.retry_no_answer,
+            stream=args.stream,
         )
         all_results["fewshot"] = {
             "results": fewshot_results,
@@ -21,7 +21,7 @@ SRC_DIR = Path(__file__).resolve().parent.parent.parent
 PROJECT_ROOT = SRC_DIR.parent
 sys.path.insert(0, str(SRC_DIR))
 
-from med_search import MedSearchEngine
+from case_store import CaseStore
 from agent_v2.agent_runner.fewshot_testing import (
     build_relevant_cases_fulltext,
     extract_case_number,
@@ -131,12 +131,12 @@ def main() -> int:
     print(f"Loaded {len(benchmark_cases)} benchmark cases ({len(case_lookup)} with valid case IDs)")
 
     print(f"Loading full database: {args.database_csv}")
-    engine = MedSearchEngine(str(args.database_csv))
+    case_store = CaseStore.open(args.database_csv)
 
     for relevant_csv in relevant_csvs:
         print(f"\nProcessing: {relevant_csv}")
         relevant_map = load_relevant_cases_csv(relevant_csv)
-        relevant_fulltext = build_relevant_cases_fulltext(relevant_map, engine)
+        relevant_fulltext = build_relevant_cases_fulltext(relevant_map, case_store)
 
         output_name = f"{relevant_csv.stem}-fewshot-view.csv"
         output_csv = args.output_dir / output_name
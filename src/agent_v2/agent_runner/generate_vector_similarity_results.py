@@ -4,10 +4,15 @@ Generate vector-similarity related cases for target cases in a CSV.
 
 For each target case title from med-diagnosis-relevant-search.csv:
 1. Find the same case in deepsearch_complete.csv
-2. Build query text from searchable fields
-3. Query Qdrant vector index
-4. Exclude target case ID itself
+2. Use its stored vector from the index (targets are indexed corpus cases);
+   targets missing from the index are embedded from their searchable fields
+3. Query the vector index (Qdrant, or a local export with --backend local)
+4. Exclude target case ID itself (filtered inside the backend's top-k)
 5. Save top-k related case IDs to output CSV
+
+Steps 2 and 3 run for all targets at once: one bulk retrieve, one batched
+embedding request for unindexed targets and one batched kNN query, instead of
+an embedding call plus a query per target.
 """
 
 from __future__ import annotations
@@ -22,8 +27,13 @@ from typing import Any
 
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.append(str(REPO_ROOT))
+sys.path.append(str(REPO_ROOT / "src"))
+
+from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL, embed_texts, get_openrouter_client
+from vector_backends import BACKEND_ENV, BACKENDS, DEFAULT_COLLECTION, open_backend
 
-from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL, embed_texts, get_openrouter_client, get_qdrant_client
+# Texts per embedding request for targets that are not in the index
+EMBED_BATCH_SIZE = 64
 
 
 def extract_case_id(case_title: str, link: str = "") -> str | None:
@@ -76,7 +86,9 @@ def main() -> int:
     parser.add_argument("--input-csv", type=Path, default=default_input, help="Target cases CSV")
     parser.add_argument("--corpus-csv", type=Path, default=default_corpus, help="Corpus CSV")
     parser.add_argument("--output-csv", type=Path, default=default_output, help="Output CSV path")
-    parser.add_argument("--collection", type=str, default="med_deepresearch_qwen3_8b", help="Qdrant collection")
+    parser.add_argument("--collection", type=str, default=DEFAULT_COLLECTION, help="Qdrant collection")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help=f"Vector backend (default: ${BACKEND_ENV} or qdrant)")
+    parser.add_argument("--local-index", type=Path, default=None, help="Local index dir (default: data/vector_index/<collection>)")
     parser.add_argument("--model", type=str, default=DEFAULT_EMBEDDING_MODEL, help="Embedding model")
     parser.add_argument("--top-k", type=int, default=7, help="Number of related case IDs to keep")
     parser.add_argument(
@@ -85,23 +97,54 @@ def main() -> int:
         default=30,
         help="How many vector candidates to fetch before filtering",
     )
+    parser.add_argument(
+        "--reembed",
+        action="store_true",
+        help="Embed every target's text with --model instead of reusing its stored vector",
+    )
     args = parser.parse_args()
 
     target_rows = read_csv_rows(args.input_csv)
     corpus_rows = read_csv_rows(args.corpus_csv)
     corpus_index = build_case_index(corpus_rows)
 
-    qdrant = get_qdrant_client()
+    backend = open_backend(args.backend, args.collection, args.local_index)
     openrouter = get_openrouter_client()
 
     args.output_csv.parent.mkdir(parents=True, exist_ok=True)
 
+    target_ids = [extract_case_id(target.get("case_title", "")) for target in target_rows]
+    found_ids = list(dict.fromkeys(tid for tid in target_ids if tid and tid in corpus_index))
+
+    # Stored vectors for indexed targets (one bulk retrieve), batched embedding for the rest
+    query_vectors: dict[str, list[float]] = {}
+    if not args.reembed:
+        stored = backend.retrieve([int(tid) for tid in found_ids])
+        query_vectors = {str(point_id): vector.tolist() for point_id, vector in stored.items()}
+    to_embed = [tid for tid in found_ids if tid not in query_vectors]
+    if to_embed:
+        print(f"Embedding {len(to_embed)} targets ({len(found_ids) - len(to_embed)} reuse stored vectors)")
+        for start in range(0, len(to_embed), EMBED_BATCH_SIZE):
+            chunk = to_embed[start:start + EMBED_BATCH_SIZE]
+            vectors = embed_texts([searchable_text(corpus_index[tid]) for tid in chunk], model=args.model, client=openrouter)
+            query_vectors.update(zip(chunk, vectors))
+
+    hits_by_target = dict(
+        zip(
+            found_ids,
+            backend.query_many(
+                [query_vectors[tid] for tid in found_ids],
+                limit=args.candidate_limit,
+                exclude_ids=[[int(tid)] for tid in found_ids],
+            ),
+        )
+    )
+
     output_rows: list[dict[str, str]] = []
     missing_targets = 0
 
-    for idx, target in enumerate(target_rows, 1):
+    for idx, (target, target_id) in enumerate(zip(target_rows, target_ids), 1):
         target_title = target.get("case_title", "")
-        target_id = extract_case_id(target_title)
         if not target_id or target_id not in corpus_index:
             missing_targets += 1
             output_rows.append(
@@ -115,20 +158,10 @@ def main() -> int:
             print(f"[{idx}/{len(target_rows)}] missing target in corpus: {target_title}")
             continue
 
-        query_text = searchable_text(corpus_index[target_id])
-        query_vector = embed_texts([query_text], model=args.model, client=openrouter)[0]
-        response = qdrant.query_points(
-            collection_name=args.collection,
-            query=query_vector,
-            limit=args.candidate_limit,
-            with_payload=True,
-        )
-
         related_ids: list[str] = []
         seen = {target_id}
-        for point in response.points:
-            payload = point.payload or {}
-            related_id = extract_point_case_id(payload)
+        for point in hits_by_target[target_id]:
+            related_id = extract_point_case_id(point.payload)
             if not related_id or related_id in seen:
                 continue
             seen.add(related_id)
@@ -23,6 +23,9 @@ Usage:
         --input-csv /path/to/cases.csv \
         --output-csv results/custom_output.csv \
         --num-cases 10
+
+    # Keep late turns small: compact old tool results/images past ~40k tokens
+    python run_diagnosis_relevant_search.py --context-budget 40000
 """
 
 import sys
@@ -230,6 +233,7 @@ def run_agent_for_case(
     skill_name: str,
     model: str,
     model_type: str,
+    context_budget: Optional[int] = None,
 ):
     """Run an agent to find diagnosis-relevant cases for a single clinical case.
 
@@ -238,6 +242,7 @@ def run_agent_for_case(
         case_index: Index of this case
         output_csv: Path to output CSV
         session_dir: Directory for agent sessions
+        context_budget: Estimated prompt tokens before old turns are compacted
 
     Returns:
         Dict with results
@@ -274,7 +279,8 @@ def run_agent_for_case(
             config_path=DEFAULT_CONFIG_PATH,
             max_turns=20,
             temperature=1,
-            agent_name=f"diagsearch-agent-{case_index}"
+            agent_name=f"diagsearch-agent-{case_index}",
+            context_budget=context_budget
         )
 
         # Run the agent with case_id so vision model receives the case images
@@ -311,6 +317,11 @@ def run_agent_for_case(
 
         print(f"\n{'='*80}")
         print(f"Completed Case {case_index + 1} in {elapsed_time:.1f}s")
+        tokens = agent.trajectory.get('tokens', {}) if hasattr(agent, 'trajectory') else {}
+        if tokens.get('input'):
+            print(f"Prompt tokens: {tokens['input']:,} "
+                  f"({tokens.get('cached_input', 0):,} from provider cache, "
+                  f"{100 * tokens.get('cached_input', 0) / tokens['input']:.0f}%)")
         print(f"{'='*80}\n")
 
         return {
@@ -393,6 +404,12 @@ def main():
         default=DEFAULT_SESSION_DIR,
         help=f'Directory for agent sessions (default: {DEFAULT_SESSION_DIR})'
     )
+    parser.add_argument(
+        '--context-budget',
+        type=int,
+        default=None,
+        help='Estimated prompt tokens above which old tool results and images are compacted (default: off)'
+    )
 
     args = parser.parse_args()
 
@@ -448,6 +465,7 @@ def main():
             skill_name=args.skill_name,
             model=args.model,
             model_type=args.model_type,
+            context_budget=args.context_budget,
         )
         results.append(result)
 
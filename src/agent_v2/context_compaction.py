@@ -0,0 +1,161 @@
+"""Context compaction for long agent runs.
+
+The conversation of a run only grows: every navigate/query output (full case
+text) and every injected image stays in context, so with max_turns=20 the
+late requests are many times larger (and slower) than the first ones.
+
+ContextCompactor keeps an estimate of the tokens of each message. Once the
+total passes a budget, everything older than the last `keep_turns` turns is
+compacted in one pass:
+
+    tool results      -> digest: case number, final diagnosis and a one-line
+                         history summary per case shown, or the first line
+    injected images   -> caption placeholders (the caption text blocks stay)
+    long user notes   -> first line (text-model image descriptions)
+
+The system prompt and the first user message (the task and its case images)
+are never compacted, and neither are assistant messages. Compacting all old
+messages at once, only when over budget, keeps the request prefix stable
+between compactions, so provider prompt caching (prompt_cache.py) still hits.
+The trajectory keeps the full tool results; only the model's view shrinks.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# Rough token estimates; only used to decide when and what to compact
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1000
+DEFAULT_KEEP_TURNS = 2
+# Messages smaller than this are not worth replacing
+MIN_COMPACT_TOKENS = 200
+SUMMARY_CHARS = 120
+
+COMPACTED_MARKER = "[Compacted"
+
+# Case blocks as printed by MedCase.display() (navigate and query outputs)
+_CASE_BLOCK = re.compile(r"^CASE: (?P<title>.*?)$(?P<body>.*?)(?=^CASE: |\Z)", re.MULTILINE | re.DOTALL)
+_CASE_LINK = re.compile(r"/case/(\d+)")
+_CASE_NUMBER = re.compile(r"\b(\d{3,6})\b")
+
+
+def _section(body: str, name: str) -> str:
+    match = re.search(rf"^--- {name} ---\n(.*?)(?=^--- |\Z)", body, re.MULTILINE | re.DOTALL)
+    return " ".join(match.group(1).split()) if match else ""
+
+
+def _shorten(text: str, limit: int = SUMMARY_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def estimate_tokens(message: Any) -> int:
+    """Estimated prompt tokens of a message (dict or SDK assistant message)."""
+    if isinstance(message, dict):
+        content = message.get("content")
+        tool_calls = message.get("tool_calls") or []
+    else:
+        content = getattr(message, "content", None)
+        tool_calls = getattr(message, "tool_calls", None) or []
+
+    chars = len(_text_of(content))
+    images = sum(1 for part in content if isinstance(part, dict) and part.get("type") == "image_url") if isinstance(content, list) else 0
+    for call in tool_calls:
+        function = call.get("function", {}) if isinstance(call, dict) else call.function
+        arguments = function.get("arguments", "") if isinstance(function, dict) else function.arguments
+        chars += len(arguments or "")
+    return chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS + 4
+
+
+def digest_tool_result(text: str) -> str:
+    """Short stand-in for a tool result that listed or showed cases."""
+    cases = []
+    for match in _CASE_BLOCK.finditer(text):
+        title, body = match.group("title").strip(), match.group("body")
+        number = _CASE_LINK.search(body) or _CASE_NUMBER.search(title)
+        case_id = number.group(1) if number else title
+        diagnosis = _section(body, "FINAL DIAGNOSIS") or "N/A"
+        history = _section(body, "CLINICAL HISTORY")
+        cases.append(f"- Case {case_id} | Diagnosis: {_shorten(diagnosis, 80)} | {_shorten(history)}")
+
+    if cases:
+        header = f"{COMPACTED_MARKER} tool result: {len(cases)} case(s), {len(text):,} chars; navigate again for full text]"
+        return "\n".join([header] + cases)
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    return f"{COMPACTED_MARKER} tool result, {len(text):,} chars] {_shorten(first_line)}"
+
+
+def placeholder_images(content: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Content blocks with each image replaced by a placeholder; captions are kept."""
+    return [
+        {"type": "text", "text": f"{COMPACTED_MARKER}: image omitted, see caption above]"}
+        if isinstance(part, dict) and part.get("type") == "image_url" else part
+        for part in content
+    ]
+
+
+class ContextCompactor:
+    """Keeps a run's messages under a token budget by compacting old turns."""
+
+    def __init__(self, budget: int, keep_turns: int = DEFAULT_KEEP_TURNS):
+        self.budget = budget
+        self.keep_turns = keep_turns
+
+    def _compact_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Compacted copy of a message, or None to keep it."""
+        content = message.get("content")
+        if message.get("role") == "tool" and isinstance(content, str):
+            if content.startswith(COMPACTED_MARKER) or estimate_tokens(message) < MIN_COMPACT_TOKENS:
+                return None
+            return {**message, "content": digest_tool_result(content)}
+        if message.get("role") != "user":
+            return None
+        if isinstance(content, list):
+            if not any(isinstance(part, dict) and part.get("type") == "image_url" for part in content):
+                return None
+            return {**message, "content": placeholder_images(content)}
+        if isinstance(content, str) and estimate_tokens(message) >= MIN_COMPACT_TOKENS and not content.startswith(COMPACTED_MARKER):
+            first_line = content.strip().splitlines()[0]
+            return {**message, "content": f"{COMPACTED_MARKER}, {len(content):,} chars] {_shorten(first_line)}"}
+        return None
+
+    def compact(self, messages: List[Any]) -> Optional[Dict[str, int]]:
+        """Compact old messages in place if the estimate is over budget.
+
+        Returns {"tokens_before", "tokens_after", "messages"} when anything was
+        compacted, else None.
+        """
+        before = sum(estimate_tokens(message) for message in messages)
+        if before <= self.budget:
+            return None
+
+        # Turns start at assistant messages; the last keep_turns stay verbatim
+        turn_starts = [
+            i for i, message in enumerate(messages)
+            if not isinstance(message, dict) or message.get("role") == "assistant"
+        ]
+        if self.keep_turns <= 0:
+            cutoff = len(messages)
+        elif len(turn_starts) >= self.keep_turns:
+            cutoff = turn_starts[-self.keep_turns]
+        else:
+            return None
+
+        compacted = 0
+        # messages[0] is the system prompt, messages[1] the task
+        for i in range(2, cutoff):
+            if isinstance(messages[i], dict):
+                replacement = self._compact_message(messages[i])
+                if replacement is not None:
+                    messages[i] = replacement
+                    compacted += 1
+        if not compacted:
+            return None
+        after = sum(estimate_tokens(message) for message in messages)
+        return {"tokens_before": before, "tokens_after": after, "messages": compacted}
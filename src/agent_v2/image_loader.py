@@ -8,14 +8,101 @@ Image loading:
 1. Check local cache (data/image_cache/{case_id}/{img_id}.jpg) — instant
 2. On cache miss, lazily start a browser to bypass Cloudflare and download
 3. Downloaded images are cached to disk — never downloaded twice
+4. With preprocessing configured, images are downscaled and re-encoded
+   before encoding (see image_preprocess.py)
+5. Encoded data URLs are kept in a process-wide LRU cache (DataURLCache), so
+   a case injected again (task message, navigate, other agents) costs no
+   disk read or base64 work
 """
 import asyncio
 import base64
 import csv
+import os
 import re
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from .image_preprocess import ImagePreprocess, ImagePreprocessor
+
+
+# Memory budget of the shared data URL cache (AGENT_IMAGE_CACHE_MB)
+DEFAULT_URL_CACHE_MB = 256
+
+
+class DataURLCache:
+    """Thread-safe LRU of encoded image data URLs, bounded by total size.
+
+    Keyed by (case_id, img_id, variant), where variant is the preprocessing
+    key (or "original"), so loaders with different settings never share an
+    entry. A URL larger than the whole budget is not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            url = self._entries.get(key)
+            if url is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return url
+
+    def put(self, key: Tuple[str, str, str], url: str) -> None:
+        if len(url) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = url
+            self._bytes += len(url)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_url_cache: Optional[DataURLCache] = None
+_url_cache_lock = threading.Lock()
+
+
+def get_url_cache() -> DataURLCache:
+    """Process-wide data URL cache shared by every ImageLoader (and so every Agent)."""
+    global _url_cache
+    with _url_cache_lock:
+        if _url_cache is None:
+            megabytes = float(os.getenv("AGENT_IMAGE_CACHE_MB", DEFAULT_URL_CACHE_MB))
+            _url_cache = DataURLCache(int(megabytes * (1 << 20)))
+        return _url_cache
 
 
 class BrowserFetcher:
@@ -171,9 +258,17 @@ class ImageLoader:
         csv_path: str | Path,
         cache_dir: Optional[str | Path] = None,
         local_index_csv: Optional[str | Path] = None,
+        preprocess: Optional[ImagePreprocess] = None,
+        url_cache: Optional[DataURLCache] = None,
     ):
         self.csv_path = Path(csv_path)
         self.cache_dir = Path(cache_dir) if cache_dir else self.DEFAULT_CACHE_DIR
+        self._preprocessor: Optional[ImagePreprocessor] = (
+            ImagePreprocessor(preprocess, self.cache_dir) if preprocess else None
+        )
+        self.url_cache = url_cache or get_url_cache()
+        # Cache variant: preprocessing output (its params key) or the stored file
+        self._variant = preprocess.key if self._preprocessor and self._preprocessor.enabled else "original"
         self._index: Dict[str, List[Dict[str, str]]] = {}
         self._local_path_index: Dict[tuple[str, str], Path] = {}
         self._fetcher: Optional[BrowserFetcher] = None
@@ -280,6 +375,16 @@ class ImageLoader:
             print(f"[ImageLoader] Failed to encode {path}: {e}")
             return None
 
+    def _encode_image(self, case_id: str, img_id: str, path: Path) -> Optional[str]:
+        """Data URL of a cached image, preprocessed if configured."""
+        if not self._preprocessor:
+            return self._encode_local_image(path)
+        try:
+            return self._preprocessor.data_url(path, case_id, img_id)
+        except Exception as e:
+            print(f"[ImageLoader] Failed to encode {path}: {e}")
+            return None
+
     def _download_via_browser(self, case_id: str, img: Dict[str, str]) -> Optional[Path]:
         """Download an image via browser and cache it. Returns cached path or None."""
         if not self._fetcher:
@@ -309,20 +414,28 @@ class ImageLoader:
     def _resolve_image(self, case_id: str, img: Dict[str, str]) -> Optional[str]:
         """Resolve an image to a base64 data URL.
 
+        0. Check the in-memory data URL cache (shared across agents)
         1. Check local cache (instant)
         2. On miss, download via browser and cache (one-time cost per image)
         """
+        key = (case_id, img["img_id"], self._variant)
+        data_url = self.url_cache.get(key)
+        if data_url:
+            return data_url
+
         # 1. Cache hit
         cached = self._get_cached_path(case_id, img["img_id"])
         if cached:
-            return self._encode_local_image(cached)
-
-        # 2. Download on-the-fly, cache it, then encode
-        downloaded = self._download_via_browser(case_id, img)
-        if downloaded:
-            return self._encode_local_image(downloaded)
-
-        return None
+            data_url = self._encode_image(case_id, img["img_id"], cached)
+        else:
+            # 2. Download on-the-fly, cache it, then encode
+            downloaded = self._download_via_browser(case_id, img)
+            data_url = self._encode_image(case_id, img["img_id"], downloaded) if downloaded else None
+
+        # Failures are not cached: a later call may download the image
+        if data_url:
+            self.url_cache.put(key, data_url)
+        return data_url
 
     def format_as_api_content(self, case_id: str | int) -> List[Dict[str, Any]]:
         """Format case images as OpenAI API content blocks.
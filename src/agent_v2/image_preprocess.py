@@ -0,0 +1,209 @@
+"""Downscaling and re-encoding of case images before vision injection.
+
+Eurorad originals are often several megapixels, and one navigate can inject a
+dozen of them as base64, so every vision turn uploads (and the provider
+decodes and tokenizes) far more pixels than the model uses. Before encoding,
+each image is:
+
+    1. rotated per its EXIF orientation
+    2. optionally cropped to its content (uniform borders removed)
+    3. shrunk so its longest edge is at most max_edge
+    4. re-encoded as JPEG/WebP/PNG at the given quality
+
+Derived bytes are cached on disk under
+<cache_dir>/derived/<params key>/<case_id>/<img_id>.<ext>, so each
+(image, parameters) pair is processed once per machine.
+
+Configured in agent_config.yaml:
+
+    image_data:
+      preprocess:
+        max_edge: 1024
+        format: jpeg        # jpeg, webp or png (Grok only accepts jpeg/png)
+        quality: 85
+        crop_borders: false
+
+Pillow is a declared dependency; if it is missing anyway, images are sent
+as stored, as before.
+"""
+import base64
+import io
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+FORMATS = {"jpeg": ("JPEG", "image/jpeg", ".jpg"), "webp": ("WEBP", "image/webp", ".webp"), "png": ("PNG", "image/png", ".png")}
+# Grayscale modes deeper than 8 bits (DICOM-derived PNG/TIFF exports)
+HIGH_DEPTH_MODES = ("I", "I;16", "I;16B", "I;16L", "I;16N", "F")
+MIME_TYPES = {
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
+    ".png": "image/png", ".gif": "image/gif", ".webp": "image/webp"
+}
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _warn_missing_pillow() -> None:
+    """Print the install hint once per process."""
+    print("[ImageLoader] Pillow not installed — images are sent at original size.")
+    print("[ImageLoader] Install with: uv sync")
+
+
+def data_url(data: bytes, mime_type: str) -> str:
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+@dataclass(frozen=True)
+class ImagePreprocess:
+    """Parameters of the preprocessing stage."""
+    max_edge: int = 1024
+    format: str = "jpeg"
+    quality: int = 85
+    crop_borders: bool = False
+    # Max per-channel difference from the corner colour still counted as border
+    border_tolerance: int = 12
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown image format '{self.format}'. Use one of: {', '.join(FORMATS)}")
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]]) -> Optional["ImagePreprocess"]:
+        """From the image_data.preprocess config section; None if disabled.
+
+        A missing or empty section means the defaults; only `enabled: false`
+        turns preprocessing off.
+        """
+        cfg = cfg or {}
+        if cfg.get("enabled", True) is False:
+            return None
+        known = {k: v for k, v in cfg.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+    @property
+    def key(self) -> str:
+        """Directory name of this parameter set in the derived cache."""
+        crop = f"_crop{self.border_tolerance}" if self.crop_borders else ""
+        return f"e{self.max_edge}_{self.format}_q{self.quality}{crop}"
+
+    @property
+    def mime_type(self) -> str:
+        return FORMATS[self.format][1]
+
+    @property
+    def suffix(self) -> str:
+        return FORMATS[self.format][2]
+
+    def process(self, data: bytes) -> bytes:
+        """Derived image bytes in self.format (requires Pillow)."""
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(data)) as source:
+            image = ImageOps.exif_transpose(source)
+            if image.mode in HIGH_DEPTH_MODES:
+                image = _to_8bit(image)
+            if self.crop_borders:
+                image = _crop_borders(image, self.border_tolerance)
+            if max(image.size) > self.max_edge:
+                image = image.copy()
+                image.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+
+            # Keep grayscale (most radiology images) as one channel; drop alpha
+            if self.format == "jpeg" and image.mode not in ("L", "RGB"):
+                image = image.convert("L" if image.mode == "LA" else "RGB")
+            elif image.mode not in ("L", "RGB", "RGBA", "LA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+            out = io.BytesIO()
+            if self.format == "png":
+                image.save(out, FORMATS["png"][0], optimize=True)
+            else:
+                image.save(out, FORMATS[self.format][0], quality=self.quality, optimize=True)
+            return out.getvalue()
+
+
+def _to_8bit(image):
+    """Map a 16-bit/32-bit grayscale image's own intensity range onto 0-255.
+
+    A plain convert("L") clips everything above 255, which turns 12/16-bit
+    radiographs almost entirely white.
+    """
+    if image.mode.startswith("I;16"):
+        image = image.convert("I")
+    low, high = image.getextrema()
+    if high <= low:
+        return image.point(lambda v: v * 0).convert("L")
+    scale = 255.0 / (high - low)
+    return image.point(lambda v: v * scale - low * scale).convert("L")
+
+
+def _crop_borders(image, tolerance: int):
+    """Crop uniform margins (same colour as the top-left pixel)."""
+    from PIL import Image, ImageChops
+
+    rgb = image.convert("RGB")
+    background = Image.new("RGB", rgb.size, rgb.getpixel((0, 0)))
+    diff = ImageChops.difference(rgb, background).convert("L").point(lambda p: 255 if p > tolerance else 0)
+    bbox = diff.getbbox()
+    if not bbox:
+        return image
+    # Don't trust a "content" box that is a sliver of the image (e.g. a black frame)
+    width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    if width * height < 0.1 * image.size[0] * image.size[1]:
+        return image
+    return image.crop(bbox)
+
+
+class ImagePreprocessor:
+    """Applies ImagePreprocess to image files, with the on-disk derived cache."""
+
+    def __init__(self, params: ImagePreprocess, cache_dir: Path):
+        self.params = params
+        self.cache_dir = Path(cache_dir) / "derived" / params.key
+        self.enabled = pillow_available()
+        if not self.enabled:
+            _warn_missing_pillow()
+
+    def derived_path(self, case_id: str, img_id: str) -> Path:
+        return self.cache_dir / case_id / f"{img_id}{self.params.suffix}"
+
+    def encode(self, source: Path, case_id: Optional[str] = None, img_id: Optional[str] = None) -> Tuple[bytes, str]:
+        """(bytes, mime type) to send for an image file.
+
+        With case_id and img_id the result is cached on disk (and rebuilt if
+        the source is newer). Falls back to the original bytes without
+        Pillow, or if the image cannot be decoded.
+        """
+        derived = self.derived_path(case_id, img_id) if case_id and img_id else None
+        if derived and derived.exists() and derived.stat().st_mtime >= source.stat().st_mtime:
+            return derived.read_bytes(), self.params.mime_type
+
+        original = source.read_bytes()
+        if not self.enabled:
+            return original, MIME_TYPES.get(source.suffix.lower(), "image/jpeg")
+        try:
+            data = self.params.process(original)
+        except Exception as e:
+            print(f"[ImageLoader] Preprocessing failed for {source}: {e}")
+            return original, MIME_TYPES.get(source.suffix.lower(), "image/jpeg")
+
+        if derived:
+            derived.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename: parallel agents may derive the same image
+            tmp = derived.with_name(f"{derived.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, derived)
+        return data, self.params.mime_type
+
+    def data_url(self, source: Path, case_id: Optional[str] = None, img_id: Optional[str] = None) -> str:
+        return data_url(*self.encode(source, case_id, img_id))
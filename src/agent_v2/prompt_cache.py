@@ -0,0 +1,98 @@
+"""Prompt-cache friendly request layout and cache usage accounting.
+
+Providers reuse the longest prompt prefix they have already processed.
+OpenAI, DeepSeek and Grok do this automatically. Anthropic and Gemini models
+(through OpenRouter) only cache up to content parts marked with cache_control.
+Either way the prefix must be byte-identical to hit the cache, so a run's
+request is laid out from most to least stable:
+
+    tools, system prompt (base + skills + custom prompt), session context,
+    first user message (case text and images), then the growing history
+
+The session context is the only part of the system prompt that changes
+between runs and retries, so it goes last, where it no longer invalidates the
+several thousand tokens of skill and relevant-case text before it. History
+messages are not rewritten in place, except by context compaction
+(context_compaction.py), which rewrites all old messages at once.
+
+For providers that need hints, MessageLayout.render() marks three breakpoints:
+the end of the static system prompt, the first user message and the newest
+message (moved forward every turn, so each turn reads the previous turn's
+cache entry and writes a longer one).
+"""
+from typing import Any, Dict, List, Optional
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Model ids whose providers only cache at explicit cache_control breakpoints
+CACHE_HINT_PREFIXES = ("anthropic/", "claude", "google/gemini")
+
+
+def supports_cache_hints(model_id: str) -> bool:
+    return model_id.lower().startswith(CACHE_HINT_PREFIXES)
+
+
+def _as_parts(message: Dict[str, Any], breakpoint: bool = False) -> Dict[str, Any]:
+    """Copy of a message with list content, optionally marking its last part.
+
+    Marked or not, a message is always sent in the same shape, so moving the
+    breakpoint on does not change the bytes of the earlier request.
+    """
+    content = message.get("content")
+    if isinstance(content, str):
+        parts = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content:
+        parts = list(content)
+    else:
+        return message
+    if breakpoint:
+        parts[-1] = {**parts[-1], "cache_control": CACHE_CONTROL}
+    return {**message, "content": parts}
+
+
+class MessageLayout:
+    """Assembles the messages of each request of a run."""
+
+    def __init__(self, model_id: str, cache_hints: Optional[bool] = None):
+        self.cache_hints = supports_cache_hints(model_id) if cache_hints is None else cache_hints
+
+    def system_message(self, static_prompt: str, session_prompt: str = "") -> Dict[str, Any]:
+        """System message with the volatile session context after the static prompt."""
+        if not self.cache_hints:
+            content = f"{static_prompt}\n\n{session_prompt}" if session_prompt else static_prompt
+            return {"role": "system", "content": content}
+        parts = [{"type": "text", "text": static_prompt, "cache_control": CACHE_CONTROL}]
+        if session_prompt:
+            parts.append({"type": "text", "text": session_prompt})
+        return {"role": "system", "content": parts}
+
+    def render(self, messages: List[Any]) -> List[Any]:
+        """Messages to send this turn; the history itself is left untouched.
+
+        Assistant messages (SDK objects) are sent as they are; breakpoints go on
+        the first user message and the newest user/tool message.
+        """
+        if not self.cache_hints:
+            return messages
+        last = len(messages) - 1
+        return [
+            _as_parts(message, breakpoint=i in (1, last))
+            if isinstance(message, dict) and message.get("role") in ("user", "tool") else message
+            for i, message in enumerate(messages)
+        ]
+
+
+def prompt_cache_tokens(usage) -> Dict[str, int]:
+    """Cached and uncached prompt tokens of a response's usage.
+
+    OpenAI-style APIs (and OpenRouter for every provider) report
+    prompt_tokens_details.cached_tokens; DeepSeek reports
+    prompt_cache_hit_tokens. Missing fields count as uncached.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    cached = int(cached or 0)
+    prompt = int(usage.prompt_tokens or 0)
+    return {"cached_input": cached, "uncached_input": max(0, prompt - cached)}
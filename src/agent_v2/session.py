@@ -8,6 +8,7 @@ A session is a multi-interaction context. Think of it like a patient visit:
 import json
 import uuid
 import fcntl
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -56,6 +57,26 @@ class Session:
     def session_file(self) -> Path:
         return self.session_dir / f"{self.session_id}.json"
 
+    @property
+    def lock_file(self) -> Path:
+        return self.session_dir / f"{self.session_id}.lock"
+
+    @contextmanager
+    def _update_lock(self):
+        """Exclusive lock around a load-modify-save of the session file.
+
+        Tool calls of one turn can run concurrently (Agent.arun), each in its own
+        thread or script process, so appends re-read the file under this lock
+        instead of saving a stale copy. flock on separately opened files also
+        excludes threads of the same process.
+        """
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
     def _load(self):
         """Load session from disk (with file locking)."""
         if not self.session_file.exists():
@@ -77,6 +98,16 @@ class Session:
         except (json.JSONDecodeError, IOError):
             pass
 
+    def reload(self):
+        """Re-read the session from disk, e.g. after a script updated it.
+
+        Takes the update lock: tool calls of one turn share this object, and a
+        reload landing between another thread's append and save would make
+        that save drop the appended entry.
+        """
+        with self._update_lock():
+            self._load()
+
     def save(self):
         """Persist session to disk (with file locking)."""
         self.updated_at = datetime.now().isoformat()
@@ -103,18 +134,21 @@ class Session:
 
         This is the only way to add data - append only, no delete/update.
         """
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }
-        self.store.append(entry)
-        self.save()
+        with self._update_lock():
+            self._load()
+            self.store.append({
+                "timestamp": datetime.now().isoformat(),
+                "data": data
+            })
+            self.save()
 
     def add_run(self, run_summary: Dict[str, Any]):
         """Add a run summary to history."""
-        run_summary["timestamp"] = datetime.now().isoformat()
-        self.history.append(run_summary)
-        self.save()
+        with self._update_lock():
+            self._load()
+            run_summary["timestamp"] = datetime.now().isoformat()
+            self.history.append(run_summary)
+            self.save()
 
     def get_context_prompt(self) -> str:
         """Generate prompt snippet for agent to see session state."""
@@ -0,0 +1,261 @@
+"""In-process execution of skill script commands.
+
+Skill scripts are normally run through bash_with_session, which forks a shell
+and a fresh `uv run python` interpreter for every tool call. A skill can
+instead declare scripts that may run inside the agent process, in the
+`commands:` field of its SKILL.md frontmatter (space-separated paths relative
+to the skill folder):
+
+    commands: scripts/research_tools.py scripts/research_tools_bm25.py
+
+A declared script must expose:
+    build_parser() -> argparse.ArgumentParser
+    run(args, session=None) -> int   # prints its output, returns exit code
+
+When a bash command is a plain invocation of a declared script (optionally
+prefixed by `uv run` and/or `python`), the agent parses the arguments with the
+script's own parser and calls run() against its live Session. Anything else
+(pipes, redirects, several commands, undeclared scripts) still goes through
+bash. Output is formatted exactly like bash_with_session, and the bash tool's
+timeout applies the same way.
+"""
+import importlib.util
+import io
+import shlex
+import sys
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+from .tools.implementations import PROJECT_ROOT
+
+# Same cap as bash_with_session
+MAX_TIMEOUT = 300
+
+# Command prefixes that just select the interpreter
+_PREFIXES = (["uv", "run", "python"], ["uv", "run", "python3"], ["uv", "run"], ["python"], ["python3"])
+
+# Anything that needs a real shell
+_SHELL_TOKENS = {"|", "||", "&", "&&", ";", ">", ">>", "<", "2>", "2>&1", "&>"}
+_SHELL_CHARS = ("\n", "$(", "`")
+
+
+class _ThreadCapture:
+    """stdout/stderr proxy that captures writes from threads that asked for it.
+
+    contextlib.redirect_stdout swaps the process-wide stream, which would mix
+    output between agents running in parallel threads. The proxy itself is
+    process-wide too (see _captures), but threads that did not ask for capture
+    write straight through to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]) -> None:
+        self._local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self) -> None:
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_install_lock = threading.Lock()
+
+
+def _captures() -> Tuple[_ThreadCapture, _ThreadCapture]:
+    """Install (once) and return the stdout/stderr capture proxies.
+
+    This replaces sys.stdout and sys.stderr for the whole process on the first
+    in-process command and never restores them. Other code keeps working, as
+    uncaptured writes and attribute lookups go to the original streams, but
+    sys.stdout is no longer the original object: code holding a reference
+    taken earlier bypasses capture, and anything that later reassigns
+    sys.stdout (e.g. redirect_stdout) shadows the proxy until it restores it.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadCapture):
+            sys.stdout = _ThreadCapture(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadCapture):
+            sys.stderr = _ThreadCapture(sys.stderr)
+    return sys.stdout, sys.stderr
+
+
+class _CommandSession:
+    """Session handed to one in-process command, writable until it expires.
+
+    A command that times out keeps running on its thread; once the timeout is
+    reported, expire() makes its writes fail instead of changing the session
+    behind the agent's back. Reads go to the live session.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._lock = threading.Lock()
+        self._expired = False
+
+    def expire(self) -> None:
+        """Refuse further writes; waits for a write already in progress."""
+        with self._lock:
+            self._expired = True
+
+    def _write(self, method: str, *args):
+        with self._lock:
+            if self._expired:
+                raise RuntimeError("command timed out; session is no longer writable")
+            return getattr(self._session, method)(*args)
+
+    def append_store(self, data):
+        return self._write("append_store", data)
+
+    def add_run(self, run_summary):
+        return self._write("add_run", run_summary)
+
+    def save(self):
+        return self._write("save")
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class SkillCommandRegistry:
+    """Scripts that may be executed in-process, keyed by resolved path."""
+
+    def __init__(self, cwd: Path = PROJECT_ROOT):
+        self.cwd = Path(cwd)
+        self._scripts: Dict[Path, Optional[ModuleType]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_skill_loader(cls, skill_loader, cwd: Path = PROJECT_ROOT) -> "SkillCommandRegistry":
+        """Register the commands of every skill in the loader's skills dir.
+
+        Skills may call scripts of other skills (e.g. research_tools.py), so
+        declarations are collected from all skills, not only loaded ones.
+        """
+        registry = cls(cwd)
+        for name in skill_loader.discover_skills():
+            skill = skill_loader.load_skill(name)
+            for script in (skill.commands if skill else []):
+                registry.register(script)
+        return registry
+
+    def register(self, script: Path) -> None:
+        self._scripts.setdefault(Path(script).resolve(), None)
+
+    def __len__(self) -> int:
+        return len(self._scripts)
+
+    def match(self, command: str) -> Optional[Tuple[Path, List[str]]]:
+        """(script path, argv) if command is a plain call of a registered script."""
+        if any(ch in command for ch in _SHELL_CHARS):
+            return None
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return None
+        if not tokens or any(tok in _SHELL_TOKENS for tok in tokens):
+            return None
+
+        for prefix in _PREFIXES:
+            if tokens[:len(prefix)] == prefix:
+                tokens = tokens[len(prefix):]
+                break
+        if not tokens or not tokens[0].endswith(".py"):
+            return None
+
+        script = Path(tokens[0])
+        script = (script if script.is_absolute() else self.cwd / script).resolve()
+        if script not in self._scripts:
+            return None
+        return script, tokens[1:]
+
+    def _module(self, script: Path) -> ModuleType:
+        with self._lock:
+            module = self._scripts.get(script)
+            if module is None:
+                name = f"_skill_command_{abs(hash(script)):x}"
+                spec = importlib.util.spec_from_file_location(name, script)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._scripts[script] = module
+            return module
+
+    def execute(self, command: str, session, timeout: int = 60) -> Optional[str]:
+        """Run command in-process against session.
+
+        Returns the tool output (same format as bash_with_session), or None if
+        the command is not a registered skill command and must go to bash.
+
+        The script runs on its own daemon thread. Past the timeout the call
+        is reported as timed out like bash; the thread cannot be killed and
+        is left to finish (or hang) in the background, but its session writes
+        are refused from then on.
+        """
+        matched = self.match(command)
+        if matched is None:
+            return None
+        script, argv = matched
+        timeout = min(timeout, MAX_TIMEOUT)
+
+        future: Future = Future()
+        command_session = _CommandSession(session) if session is not None else None
+
+        def target():
+            try:
+                future.set_result(self._run(script, argv, command_session))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f"skill-command-{script.stem}", daemon=True).start()
+        try:
+            code, output, error = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if command_session is not None:
+                command_session.expire()
+            # It may have finished while a last write held off expire()
+            if not future.done():
+                return f"Error: Command timed out after {timeout} seconds"
+            code, output, error = future.result()
+
+        if not code:
+            return output if output else "Command executed successfully (no output)"
+        return f"Error (exit {code}): {error or output}"
+
+    def _run(self, script: Path, argv: List[str], session) -> Tuple[int, str, str]:
+        """(exit code, stdout, stderr) of a script run on the current thread."""
+        stdout_proxy, stderr_proxy = _captures()
+        out, err = io.StringIO(), io.StringIO()
+        stdout_proxy.capture(out)
+        stderr_proxy.capture(err)
+        try:
+            module = self._module(script)
+            parser = module.build_parser()
+            parser.prog = script.name
+            args = parser.parse_args(argv)
+            code = module.run(args, session=session)
+        except SystemExit as e:
+            # argparse errors and sys.exit() inside the script
+            if isinstance(e.code, str):
+                err.write(e.code)
+                code = 1
+            else:
+                code = e.code
+        except Exception as e:
+            err.write(f"{type(e).__name__}: {e}")
+            code = 1
+        finally:
+            stdout_proxy.capture(None)
+            stderr_proxy.capture(None)
+
+        return code, out.getvalue().strip(), err.getvalue().strip()
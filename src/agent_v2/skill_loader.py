@@ -5,6 +5,8 @@ Each skill has:
 - SKILL.md: Main instructions with YAML frontmatter + markdown content
 - Optional reference/ folder with additional context
 - Optional scripts/ folder with executable scripts
+- Optional `commands:` frontmatter listing scripts that the agent may run
+  in-process instead of through bash (see skill_commands.py)
 
 Skill loading modes:
 1. No skills: Agent only has basic tools (web_search, bash, session_store)
@@ -26,6 +28,7 @@ class Skill:
     content: str  # Full markdown content (after frontmatter)
     path: Path
     references: Dict[str, str] = field(default_factory=dict)  # filename -> content
+    commands: List[Path] = field(default_factory=list)  # scripts runnable in-process
 
     @property
     def summary(self) -> str:
@@ -88,7 +91,8 @@ class SkillLoader:
                 description=frontmatter.get("description", ""),
                 content=content.strip(),
                 path=skill_path,
-                references=self._load_references(skill_path)
+                references=self._load_references(skill_path),
+                commands=[skill_path / script for script in frontmatter.get("commands", "").split()]
             )
 
             self._cache[skill_name] = skill
@@ -7,21 +7,24 @@ The session_id is passed via AGENT_SESSION_ID environment variable.
 
 Commands:
     plan     - Record research plan (queries to run, steps to take)
-    query    - Execute a vector-embedding search query and record results
+    query    - Execute a vector-embedding (or hybrid BM25 + vector) search query and record results
     navigate - Select a case to investigate further
+    similar  - List the cases most similar to a case (precomputed graph)
     submit   - Submit final diagnosis answer
 
 Usage:
     python research_tools.py plan --steps "1. Search for X" "2. Compare with Y"
     python research_tools.py query --name "chest pain CT findings"
+    python research_tools.py query --name "chest pain CT findings" --mode hybrid
+    python research_tools.py query --name "ring enhancing lesion" --fields imaging_findings
     python research_tools.py navigate --case-id 1000
+    python research_tools.py similar --case-id 1000 --source bm25
     python research_tools.py submit --answer A --reasoning "..."
 """
 import os
 import sys
 import json
 import argparse
-import subprocess
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +32,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
 from agent_v2.session import Session
+import search_daemon
 
 # Session directory (relative to project root)
 DEFAULT_SESSION_DIR = Path(__file__).parent.parent.parent.parent.parent.parent / "sessions"
@@ -45,10 +49,8 @@ def get_session() -> Session:
     return Session(session_id=session_id, session_dir=Path(session_dir))
 
 
-def cmd_plan(args):
+def cmd_plan(args, session: Session):
     """Record a research plan."""
-    session = get_session()
-
     plan_data = {
         "type": "plan",
         "steps": args.steps,
@@ -64,45 +66,48 @@ def cmd_plan(args):
     return 0
 
 
-def cmd_query(args):
-    """Execute a search query and record results."""
-    session = get_session()
-
-    # Run vector search script
-    search_script = Path(__file__).parent.parent.parent.parent.parent / "med_search_vector.py"
-
-    cmd = ["uv", "run", "python", str(search_script), args.name]
-    if args.top_k:
-        cmd.extend(["--top_k", str(args.top_k)])
-
+def cmd_query(args, session: Session):
+    """Execute a search query and record results."""
+    # Run the search via the search daemon (in-process if it isn't running)
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=str(Path(__file__).parent.parent.parent.parent.parent.parent)
-        )
-        output = result.stdout
-        error = result.stderr
+        if args.fields:
+            response = search_daemon.search(
+                "field_query",
+                query=args.name,
+                top_k=args.top_k or 5,
+                fields=args.fields,
+            )
+        elif args.mode == "hybrid":
+            response = search_daemon.search(
+                "hybrid_query",
+                query=args.name,
+                top_k=args.top_k or 5,
+                fusion=args.fusion,
+            )
+        else:
+            response = search_daemon.search(
+                "vector_query",
+                query=args.name,
+                top_k=args.top_k or 5,
+            )
 
         # Record the query in session
-        query_data = {
-            "type": "query",
-            "query": args.name,
-            "top_k": args.top_k or 5,
-            "search_mode": "vector_embedding",
-            "success": result.returncode == 0
-        }
-        session.append_store(query_data)
-
-        if result.returncode == 0:
-            print(output)
+        query_data = {
+            "type": "query",
+            "query": args.name,
+            "top_k": args.top_k or 5,
+            "search_mode": "per_field" if args.fields else ("hybrid" if args.mode == "hybrid" else "vector_embedding"),
+            "success": response["code"] == 0
+        }
+        session.append_store(query_data)
+
+        if response["code"] == 0:
+            print(response["output"])
         else:
-            print(f"Search error: {error or output}", file=sys.stderr)
+            print(f"Search error: {response['error'] or response['output']}", file=sys.stderr)
             return 1
 
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         print("Error: Search timed out", file=sys.stderr)
         return 1
     except Exception as e:
@@ -112,24 +117,11 @@ def cmd_query(args):
     return 0
 
 
-def cmd_navigate(args):
+def cmd_navigate(args, session: Session):
     """Select a case to investigate further."""
-    session = get_session()
-
-    # Run med_search.py with case ID
-    search_script = Path(__file__).parent.parent.parent.parent.parent / "med_search.py"
-
-    cmd = ["uv", "run", "python", str(search_script), str(args.case_id)]
-
+    # Look the case up in the search daemon (in-process if it isn't running)
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=str(Path(__file__).parent.parent.parent.parent.parent.parent)
-        )
-        output = result.stdout
+        response = search_daemon.search("navigate", case_id=args.case_id)
 
         # Record the navigation in session
         nav_data = {
@@ -139,8 +131,8 @@ def cmd_navigate(args):
         }
         session.append_store(nav_data)
 
-        if result.returncode == 0:
-            print(output)
+        if response["code"] == 0:
+            print(response["output"])
         else:
             print(f"Case {args.case_id} not found", file=sys.stderr)
             return 1
@@ -152,10 +144,42 @@ def cmd_navigate(args):
     return 0
 
 
-def cmd_submit(args):
-    """Submit final diagnosis answer."""
-    session = get_session()
+def cmd_similar(args, session: Session):
+    """List the cases most similar to a case."""
+    # Neighbours come from the precomputed similarity graph via the search daemon
+    try:
+        response = search_daemon.search(
+            "similar",
+            case_id=args.case_id,
+            top_k=args.top_k or 5,
+            source=args.source,
+        )
+
+        # Record the lookup in session
+        similar_data = {
+            "type": "similar",
+            "case_id": args.case_id,
+            "top_k": args.top_k or 5,
+            "source": args.source,
+            "success": response["code"] == 0
+        }
+        session.append_store(similar_data)
+
+        if response["code"] == 0:
+            print(response["output"])
+        else:
+            print(f"Similar-case error: {response['error'] or response['output']}", file=sys.stderr)
+            return 1
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
 
+def cmd_submit(args, session: Session):
+    """Submit final diagnosis answer."""
     # Normalize answer
     answer = args.answer.upper()
     if answer not in ['A', 'B', 'C', 'D', 'E']:
@@ -184,7 +208,7 @@ def cmd_submit(args):
     return 0
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Research tools for medical diagnosis",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -220,6 +244,27 @@ def main():
         default=5,
         help="Number of results (default: 5)"
     )
+    query_parser.add_argument(
+        "--mode", "-m",
+        type=str,
+        default="vector",
+        choices=["vector", "hybrid"],
+        help="vector: embeddings only; hybrid: BM25 and vector fused into one list (default: vector)"
+    )
+    query_parser.add_argument(
+        "--fusion",
+        type=str,
+        default="rrf",
+        choices=["rrf", "weighted"],
+        help="How hybrid mode merges the rankings (default: rrf)"
+    )
+    query_parser.add_argument(
+        "--fields", "-f",
+        nargs="+",
+        default=None,
+        choices=["clinical_history", "imaging_findings", "differential_diagnosis", "final_diagnosis"],
+        help="Match only these case sections, each embedded separately (e.g. imaging_findings)"
+    )
 
     # navigate command
     nav_parser = subparsers.add_parser("navigate", help="Select a case to investigate")
@@ -236,6 +281,28 @@ def main():
         help="Reason for selecting this case"
     )
 
+    # similar command
+    similar_parser = subparsers.add_parser("similar", help="List cases most similar to a case")
+    similar_parser.add_argument(
+        "--case-id", "-c",
+        type=int,
+        required=True,
+        help="Case number to find neighbours of"
+    )
+    similar_parser.add_argument(
+        "--top-k", "-k",
+        type=int,
+        default=5,
+        help="Number of similar cases (default: 5)"
+    )
+    similar_parser.add_argument(
+        "--source", "-s",
+        type=str,
+        default="vector",
+        choices=["vector", "bm25"],
+        help="Similarity source: embeddings or BM25 text overlap (default: vector)"
+    )
+
     # submit command
     submit_parser = subparsers.add_parser("submit", help="Submit final answer")
     submit_parser.add_argument(
@@ -252,20 +319,31 @@ def main():
         help="Reasoning for the answer"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def run(args, session: Session = None) -> int:
+    """Run a parsed command against session (default: the one named in the environment)."""
+    session = session or get_session()
 
     if args.command == "plan":
-        return cmd_plan(args)
+        return cmd_plan(args, session)
     elif args.command == "query":
-        return cmd_query(args)
+        return cmd_query(args, session)
     elif args.command == "navigate":
-        return cmd_navigate(args)
+        return cmd_navigate(args, session)
+    elif args.command == "similar":
+        return cmd_similar(args, session)
     elif args.command == "submit":
-        return cmd_submit(args)
+        return cmd_submit(args, session)
     else:
-        parser.print_help()
+        build_parser().print_help()
         return 1
 
 
+def main():
+    return run(build_parser().parse_args())
+
+
 if __name__ == "__main__":
     sys.exit(main())
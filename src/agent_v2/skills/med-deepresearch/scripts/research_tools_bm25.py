@@ -21,7 +21,6 @@ import os
 import sys
 import json
 import argparse
-import subprocess
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +28,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
 from agent_v2.session import Session
+import search_daemon
 
 # Session directory (relative to project root)
 DEFAULT_SESSION_DIR = Path(__file__).parent.parent.parent.parent.parent.parent / "sessions"
@@ -45,10 +45,8 @@ def get_session() -> Session:
     return Session(session_id=session_id, session_dir=Path(session_dir))
 
 
-def cmd_plan(args):
+def cmd_plan(args, session: Session):
     """Record a research plan."""
-    session = get_session()
-
     plan_data = {
         "type": "plan",
         "steps": args.steps,
@@ -64,44 +62,34 @@ def cmd_plan(args):
     return 0
 
 
-def cmd_query(args):
+def cmd_query(args, session: Session):
     """Execute a search query and record results."""
-    session = get_session()
-
-    # Run med_search.py
-    search_script = Path(__file__).parent.parent.parent.parent.parent / "med_search.py"
-
-    cmd = ["uv", "run", "python", str(search_script), args.name]
-    if args.top_k:
-        cmd.extend(["--top_k", str(args.top_k)])
-
+    # Run BM25 search via the search daemon (in-process if it isn't running)
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=str(Path(__file__).parent.parent.parent.parent.parent.parent)
+        response = search_daemon.search(
+            "bm25_query",
+            query=args.name,
+            top_k=args.top_k or 5,
+            mode=args.mode,
         )
-        output = result.stdout
-        error = result.stderr
 
         # Record the query in session
         query_data = {
             "type": "query",
             "query": args.name,
             "top_k": args.top_k or 5,
-            "success": result.returncode == 0
+            "mode": args.mode,
+            "success": response["code"] == 0
         }
         session.append_store(query_data)
 
-        if result.returncode == 0:
-            print(output)
+        if response["code"] == 0:
+            print(response["output"])
         else:
-            print(f"Search error: {error or output}", file=sys.stderr)
+            print(f"Search error: {response['error'] or response['output']}", file=sys.stderr)
             return 1
 
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         print("Error: Search timed out", file=sys.stderr)
         return 1
     except Exception as e:
@@ -111,24 +99,11 @@ def cmd_query(args):
     return 0
 
 
-def cmd_navigate(args):
+def cmd_navigate(args, session: Session):
     """Select a case to investigate further."""
-    session = get_session()
-
-    # Run med_search.py with case ID
-    search_script = Path(__file__).parent.parent.parent.parent.parent / "med_search.py"
-
-    cmd = ["uv", "run", "python", str(search_script), str(args.case_id)]
-
+    # Look the case up in the search daemon (in-process if it isn't running)
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=str(Path(__file__).parent.parent.parent.parent.parent.parent)
-        )
-        output = result.stdout
+        response = search_daemon.search("navigate", case_id=args.case_id)
 
         # Record the navigation in session
         nav_data = {
@@ -138,8 +113,8 @@ def cmd_navigate(args):
         }
         session.append_store(nav_data)
 
-        if result.returncode == 0:
-            print(output)
+        if response["code"] == 0:
+            print(response["output"])
         else:
             print(f"Case {args.case_id} not found", file=sys.stderr)
             return 1
@@ -151,10 +126,8 @@ def cmd_navigate(args):
     return 0
 
 
-def cmd_submit(args):
+def cmd_submit(args, session: Session):
     """Submit final diagnosis answer."""
-    session = get_session()
-
     # Normalize answer
     answer = args.answer.upper()
     if answer not in ['A', 'B', 'C', 'D', 'E']:
@@ -183,7 +156,7 @@ def cmd_submit(args):
     return 0
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Research tools for medical diagnosis",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -219,6 +192,12 @@ def main():
         default=5,
         help="Number of results (default: 5)"
     )
+    query_parser.add_argument(
+        "--mode", "-m",
+        choices=["bm25", "bm25f"],
+        default="bm25",
+        help="Ranking: bm25 (default) or field-weighted bm25f (boosts diagnosis/imaging matches)"
+    )
 
     # navigate command
     nav_parser = subparsers.add_parser("navigate", help="Select a case to investigate")
@@ -251,20 +230,29 @@ def main():
         help="Reasoning for the answer"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def run(args, session: Session = None) -> int:
+    """Run a parsed command against session (default: the one named in the environment)."""
+    session = session or get_session()
 
     if args.command == "plan":
-        return cmd_plan(args)
+        return cmd_plan(args, session)
     elif args.command == "query":
-        return cmd_query(args)
+        return cmd_query(args, session)
     elif args.command == "navigate":
-        return cmd_navigate(args)
+        return cmd_navigate(args, session)
     elif args.command == "submit":
-        return cmd_submit(args)
+        return cmd_submit(args, session)
     else:
-        parser.print_help()
+        build_parser().print_help()
         return 1
 
 
+def main():
+    return run(build_parser().parse_args())
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -7,7 +7,7 @@ Usage:
 This script:
 1. Takes up to 5 research tasks as arguments (each task as a quoted string)
 2. Creates sub-agents with predefined research prompt
-3. Runs them in parallel using threads
+3. Runs them concurrently on one event loop (Agent.arun)
 4. Gathers all reports
 5. Stores task assignments and reports in main agent's session
 
@@ -21,8 +21,8 @@ Example:
 import sys
 import json
 import os
+import asyncio
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # Add project root to path
@@ -60,7 +60,7 @@ def load_subagent_prompt():
         return None, f"Error reading subagent prompt: {str(e)}"
 
 
-def run_subagent(task_id: int, task_description: str, subagent_prompt: str, main_session_id: str):
+async def run_subagent(task_id: int, task_description: str, subagent_prompt: str, main_session_id: str):
     """Run a single sub-agent on a task.
 
     Args:
@@ -87,7 +87,7 @@ def run_subagent(task_id: int, task_description: str, subagent_prompt: str, main
         )
 
         # Run the sub-agent on the task
-        result = agent.run(task_description)
+        result = await agent.arun(task_description)
 
         return {
             "task_id": task_id,
@@ -107,6 +107,24 @@ def run_subagent(task_id: int, task_description: str, subagent_prompt: str, main
         }
 
 
+async def run_subagents(tasks, subagent_prompt: str, main_session_id: str):
+    """Run all sub-agents concurrently; results are in task order."""
+    results = await asyncio.gather(
+        *(run_subagent(i + 1, task, subagent_prompt, main_session_id) for i, task in enumerate(tasks)),
+        return_exceptions=True
+    )
+    return [
+        result if not isinstance(result, BaseException) else {
+            "task_id": i + 1,
+            "task": tasks[i],
+            "status": "error",
+            "error": f"Unexpected error: {str(result)}",
+            "report": None
+        }
+        for i, result in enumerate(results)
+    ]
+
+
 def main():
     """Main function to spawn sub-agents in parallel."""
 
@@ -154,33 +172,8 @@ def main():
     }
     main_session.append_store(task_assignment)
 
-    # Run sub-agents in parallel using ThreadPoolExecutor
-    results = []
-
-    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
-        # Submit all tasks
-        future_to_task = {
-            executor.submit(run_subagent, i + 1, task, subagent_prompt, main_session_id): i
-            for i, task in enumerate(tasks)
-        }
-
-        # Gather results as they complete
-        for future in as_completed(future_to_task):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                task_idx = future_to_task[future]
-                results.append({
-                    "task_id": task_idx + 1,
-                    "task": tasks[task_idx],
-                    "status": "error",
-                    "error": f"Unexpected error: {str(e)}",
-                    "report": None
-                })
-
-    # Sort results by task_id for consistent ordering
-    results.sort(key=lambda x: x["task_id"])
+    # Run sub-agents concurrently on one event loop
+    results = asyncio.run(run_subagents(tasks, subagent_prompt, main_session_id))
 
     # Store all results in main session
     results_record = {
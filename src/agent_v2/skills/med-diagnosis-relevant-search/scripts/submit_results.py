@@ -6,12 +6,13 @@ Outputs structured JSON with relevant case IDs and reasoning.
 Uses Final Result Protocol for proper termination.
 """
 
+import sys
 import json
 import argparse
 from datetime import datetime
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Submit diagnosis-relevant case search results"
     )
@@ -22,19 +23,22 @@ def main():
         help='JSON string with relevant cases: {"case_id": "reason", ...}'
     )
 
-    args = parser.parse_args()
+    return parser
+
 
+def run(args, session=None) -> int:
+    """Print the final result for parsed args; session is unused."""
     # Parse the relevant cases JSON
     try:
         relevant_cases = json.loads(args.relevant_cases)
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON format: {e}")
-        exit(1)
+        return 1
 
     # Validate it's a dict
     if not isinstance(relevant_cases, dict):
         print("Error: relevant-cases must be a JSON object/dict, not array or primitive")
-        exit(1)
+        return 1
 
     # Build the final result
     final_result = {
@@ -47,7 +51,12 @@ def main():
     print("<<<FINAL_RESULT>>>")
     print(json.dumps(final_result, indent=2))
     print("<<<END_FINAL_RESULT>>>")
+    return 0
+
+
+def main():
+    return run(build_parser().parse_args())
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
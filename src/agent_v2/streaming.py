@@ -0,0 +1,149 @@
+"""Assembly of streamed chat completions.
+
+In streaming mode (Agent(stream=True)) the agent reads the completion chunk by
+chunk instead of waiting for the whole message. Tool-call arguments arrive as
+JSON fragments; a call is complete as soon as its arguments parse as a JSON
+object (a complete object cannot be extended), when the next call starts, or
+when the stream ends. The agent starts each call at that point, so tool work
+overlaps with the rest of the generation.
+
+    completion = StreamedCompletion()
+    for chunk in stream:
+        for position in completion.feed(chunk):
+            name, args = completion.call(position)   # start it now
+    for position in completion.finish():
+        ...
+    message = completion.message()   # same shape as a non-streamed message
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from openai.types.chat import ChatCompletionMessage, ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+# Extra create() arguments for a streamed request; include_usage makes the
+# last chunk carry token usage like a non-streamed response
+STREAM_KWARGS = {"stream": True, "stream_options": {"include_usage": True}}
+
+
+class StreamedCompletion:
+    """Content, tool calls, usage and timings of one streamed completion."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.first_tool: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.content_parts: List[str] = []
+        self.tool_calls: List[Dict[str, Any]] = []  # {"id", "name", "arguments", "ready"}
+        self.usage = None
+        self.finish_reason: Optional[str] = None
+        # stream index -> position in tool_calls
+        self._positions: Dict[int, int] = {}
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def feed(self, chunk) -> List[int]:
+        """Add one chunk; returns positions of tool calls that just became complete."""
+        if getattr(chunk, "usage", None):
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return []
+
+        choice = chunk.choices[0]
+        delta = choice.delta
+        # Reasoning models stream their thinking in a non-standard field first
+        if self.first_token is None and (delta.content or delta.tool_calls or getattr(delta, "reasoning", None)):
+            self.first_token = self._elapsed()
+        if delta.content:
+            self.content_parts.append(delta.content)
+
+        completed = []
+        for tool_delta in delta.tool_calls or []:
+            position = self._position(tool_delta)
+            # Providers stream calls one after another: a new call ends the earlier ones
+            completed += self._complete(range(position))
+            entry = self.tool_calls[position]
+            if tool_delta.function:
+                entry["name"] += tool_delta.function.name or ""
+                entry["arguments"] += tool_delta.function.arguments or ""
+            if not entry["ready"] and entry["name"] and _is_complete_json(entry["arguments"]):
+                completed += self._complete([position])
+
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        return completed
+
+    def _position(self, tool_delta) -> int:
+        position = self._positions.get(tool_delta.index)
+        if position is not None:
+            entry = self.tool_calls[position]
+            # Some providers send every call with index 0; a new id is a new call
+            if not (tool_delta.id and entry["id"] and tool_delta.id != entry["id"]):
+                entry["id"] = entry["id"] or tool_delta.id
+                return position
+        self.tool_calls.append({"id": tool_delta.id, "name": "", "arguments": "", "ready": False})
+        position = self._positions[tool_delta.index] = len(self.tool_calls) - 1
+        return position
+
+    def _complete(self, positions) -> List[int]:
+        completed = [p for p in positions if not self.tool_calls[p]["ready"]]
+        for position in completed:
+            self.tool_calls[position]["ready"] = True
+        if completed and self.first_tool is None:
+            self.first_tool = self._elapsed()
+        return completed
+
+    def finish(self) -> List[int]:
+        """End of stream: returns positions of calls not yet reported complete."""
+        self.finished = self._elapsed()
+        return self._complete(range(len(self.tool_calls)))
+
+    def call(self, position: int) -> Tuple[str, dict]:
+        """(name, parsed args) of a tool call; unparseable args become {} as in run()."""
+        entry = self.tool_calls[position]
+        try:
+            args = json.loads(entry["arguments"])
+        except json.JSONDecodeError:
+            args = {}
+        return entry["name"], args
+
+    def message(self) -> ChatCompletionMessage:
+        """The assembled assistant message, as a non-streamed response would return it."""
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=entry["id"] or f"call_{position}",
+                type="function",
+                function=Function(name=entry["name"], arguments=entry["arguments"]),
+            )
+            for position, entry in enumerate(self.tool_calls)
+        ]
+        return ChatCompletionMessage(
+            role="assistant",
+            content="".join(self.content_parts) or None,
+            tool_calls=tool_calls or None,
+        )
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        """Seconds from the request to the first token, first complete tool call and end of stream."""
+        return {
+            "first_token": _rounded(self.first_token),
+            "first_tool": _rounded(self.first_tool),
+            "completion": _rounded(self.finished),
+        }
+
+
+def _is_complete_json(text: str) -> bool:
+    text = text.strip()
+    if not text.endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(text), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+def _rounded(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds, 3) if seconds is not None else None
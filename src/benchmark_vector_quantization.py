@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of the quantized local vector index against exact search.
+
+Every query is a stored case vector (its own case excluded), like the
+case-to-case lookups of the similarity graph and the benchmark runners. For
+each quantization and rescore factor the script reports recall@k against the
+exact float32 ranking, per-query latency and the resident memory of the codes.
+
+Usage:
+    # Benchmark an exported index (see med_vector_search.py export)
+    uv run python src/benchmark_vector_quantization.py bench --collection med_deepresearch_qwen3_8b -k 5
+    # Without an index: synthetic clustered vectors of the qwen3-embedding-8b size
+    uv run python src/benchmark_vector_quantization.py bench --synthetic 3000x4096
+    # Store codes in the index directory so workers do not compute them on load
+    uv run python src/benchmark_vector_quantization.py build --quantization int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from bm25_index import read_manifest
+from vector_backends import (
+    DEFAULT_COLLECTION, DEFAULT_RESCORE_FACTOR, QUANTIZATIONS, LocalVectorIndex, QuantizedVectorIndex,
+)
+
+
+def synthetic_index(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> LocalVectorIndex:
+    """Clustered random vectors, so neighbours are meaningful like real embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=count)] + 0.8 * rng.normal(size=(count, dimension)).astype(np.float32)
+    return LocalVectorIndex(np.arange(count, dtype=np.int64), vectors, [{} for _ in range(count)])
+
+
+def parse_shape(value: str) -> tuple[int, int]:
+    try:
+        count, dimension = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COUNTxDIMENSION, got '{value}'")
+    return count, dimension
+
+
+def timed_queries(index, queries: np.ndarray, query_ids: np.ndarray, k: int) -> tuple[list[list[int]], np.ndarray]:
+    """Top-k ids of each query (one query() call each) and per-query seconds."""
+    results, seconds = [], np.empty(len(queries))
+    for i, (vector, query_id) in enumerate(zip(queries, query_ids)):
+        start = time.perf_counter()
+        hits = index.query(vector, limit=k, exclude_ids=[int(query_id)])
+        seconds[i] = time.perf_counter() - start
+        results.append([hit.id for hit in hits])
+    return results, seconds
+
+
+def recall_at_k(approximate: list[list[int]], exact: list[list[int]], k: int) -> float:
+    return float(np.mean([len(set(a[:k]) & set(e[:k])) / max(1, min(k, len(e))) for a, e in zip(approximate, exact)]))
+
+
+def bench(
+    index: LocalVectorIndex,
+    k: int,
+    num_queries: int,
+    rescore_factors: Optional[list[int]],
+    seed: int = 0,
+) -> None:
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(index.count(), size=min(num_queries, index.count()), replace=False)
+    queries = np.asarray(index.vectors[np.sort(rows)])
+    query_ids = index.ids[np.sort(rows)]
+    float_bytes = index.count() * index.dimension * 4
+
+    exact, exact_seconds = timed_queries(index, queries, query_ids, k)
+    print(f"{index.count()} vectors x {index.dimension} dims, {len(queries)} queries, k={k}\n")
+    print(f"{'method':<16} {'recall@k':>9} {'mean ms':>9} {'p95 ms':>9} {'resident':>10} {'vs f32':>7}")
+    print(f"{'exact float32':<16} {1.0:>9.4f} {exact_seconds.mean() * 1000:>9.3f} "
+          f"{np.percentile(exact_seconds, 95) * 1000:>9.3f} {float_bytes / (1 << 20):>8.1f}MB {1.0:>6.1f}x")
+
+    for quantization in QUANTIZATIONS:
+        quantized = QuantizedVectorIndex(
+            index.ids, index.vectors, index.payloads, normalized=True, quantization=quantization,
+            projection=index.projection,
+        )
+        start = time.perf_counter()
+        resident = quantized.resident_bytes()
+        build_ms = (time.perf_counter() - start) * 1000
+        for factor in rescore_factors or [DEFAULT_RESCORE_FACTOR[quantization]]:
+            quantized.rescore_factor = factor
+            approximate, seconds = timed_queries(quantized, queries, query_ids, k)
+            label = f"{quantization} x{factor}"
+            print(f"{label:<16} {recall_at_k(approximate, exact, k):>9.4f} {seconds.mean() * 1000:>9.3f} "
+                  f"{np.percentile(seconds, 95) * 1000:>9.3f} {resident / (1 << 20):>8.1f}MB "
+                  f"{float_bytes / resident:>6.1f}x")
+        print(f"  ({quantization} codes computed in {build_ms:.0f} ms)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Quantized local vector index: build codes or benchmark recall/latency")
+    parser.add_argument("--collection", type=str, default=DEFAULT_COLLECTION, help="Collection of the local index")
+    parser.add_argument("--local-index", type=Path, default=None, help="Local index dir (default: data/vector_index/<collection>)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Store quantized codes in the local index directory")
+    build_parser.add_argument("--quantization", choices=QUANTIZATIONS, default="int8", help="Code type (default: int8)")
+
+    bench_parser = subparsers.add_parser("bench", help="Compare recall@k and latency with exact search")
+    bench_parser.add_argument("-k", type=int, default=5, help="Neighbours per query (default: 5)")
+    bench_parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries (default: 200)")
+    bench_parser.add_argument(
+        "--rescore", type=lambda v: [int(x) for x in v.split(",")], default=None,
+        help="Comma-separated rescore factors to try (default: 4 for int8, 16 for binary)",
+    )
+    bench_parser.add_argument("--synthetic", type=parse_shape, default=None, help="Use random COUNTxDIMENSION vectors instead of an index")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Query sampling seed")
+    args = parser.parse_args()
+
+    local_path = args.local_index or LocalVectorIndex.default_dir(args.collection)
+    if args.command == "build":
+        index = QuantizedVectorIndex.load(local_path, args.quantization)
+        index.save(local_path, source=(read_manifest(local_path) or {}).get("source"))
+        print(f"Stored {args.quantization} codes for {index.count()} vectors in {local_path} "
+              f"({index.resident_bytes() / (1 << 20):.1f} MB resident)")
+        return 0
+
+    index = synthetic_index(*args.synthetic) if args.synthetic else LocalVectorIndex.load(local_path)
+    bench(index, args.k, args.queries, args.rescore, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
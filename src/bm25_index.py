@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Array-backed BM25 index with an on-disk snapshot format.
+
+Scores are identical to rank_bm25.BM25Okapi (same IDF epsilon floor), but the
+index lives in flat NumPy arrays so it can be written once and memory-mapped
+by every later process instead of being rebuilt from the CSV.
+
+Queries are answered from an inverted index (per-term postings lists), so only
+documents containing a query term are touched, and top-k selection uses
+argpartition instead of sorting the whole corpus. Batches of queries are scored
+together as one sparse product of a query-term matrix with the precomputed
+term-document weight matrix (see top_k_many).
+
+BM25FIndex adds per-field postings and field lengths on top of a BM25Index for
+field-weighted ranking (BM25F).
+
+Snapshot layout (one directory):
+    manifest.json     format version, BM25 parameters, caller metadata
+    vocab.json        term strings, list position = term id
+    idf.npy           float64 IDF per term id
+    doc_len.npy       int32 token count per document
+    doc_offsets.npy   int64 CSR row offsets into doc_terms / doc_tfs
+    doc_terms.npy     int32 term ids of each document (tokenized corpus)
+    doc_tfs.npy       int32 term frequency for each (document, term) entry
+    post_offsets.npy  int64 CSR offsets into post_docs / post_tfs, per term id
+    post_docs.npy     int32 doc ids of each term's postings list (ascending)
+    post_tfs.npy      int32 term frequency for each posting
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import math
+import os
+import shutil
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 2
+
+_ARRAYS = (
+    "idf", "doc_len", "doc_offsets", "doc_terms", "doc_tfs",
+    "post_offsets", "post_docs", "post_tfs",
+)
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(index_dir: str | Path) -> Optional[dict[str, Any]]:
+    """Return a snapshot's manifest, or None if missing/unreadable."""
+    path = Path(index_dir) / "manifest.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def replace_dir(tmp_dir: Path, final_dir: Path) -> None:
+    """Swap a freshly written directory into place.
+
+    Readers that already memory-mapped the old files keep working: on POSIX
+    the unlinked files stay alive until their mappings are closed.
+    """
+    if final_dir.exists():
+        shutil.rmtree(final_dir)
+    os.replace(tmp_dir, final_dir)
+
+
+@contextmanager
+def dir_lock(target_dir: Path) -> Iterator[None]:
+    """Exclusive lock serialising rebuilds of a snapshot directory across processes."""
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(target_dir.parent / f".{target_dir.name}.lock", "w") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class BM25Index:
+    """BM25Okapi over a CSR document-term matrix and its inverted postings."""
+
+    def __init__(
+        self,
+        vocab: list[str],
+        idf: np.ndarray,
+        doc_len: np.ndarray,
+        doc_offsets: np.ndarray,
+        doc_terms: np.ndarray,
+        doc_tfs: np.ndarray,
+        post_offsets: Optional[np.ndarray] = None,
+        post_docs: Optional[np.ndarray] = None,
+        post_tfs: Optional[np.ndarray] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ):
+        self.vocab = vocab
+        self.term_ids: dict[str, int] = {term: i for i, term in enumerate(vocab)}
+        self.idf = idf
+        self.doc_len = doc_len
+        self.doc_offsets = doc_offsets
+        self.doc_terms = doc_terms
+        self.doc_tfs = doc_tfs
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.corpus_size = len(doc_len)
+        self.avgdl = float(doc_len.sum()) / self.corpus_size if self.corpus_size else 0.0
+        # Per-document BM25 length normalisation, k1 * (1 - b + b * |d| / avgdl)
+        self._norm = self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) if self.corpus_size else doc_len
+
+        if post_offsets is None:
+            post_offsets, post_docs, post_tfs = self._invert(len(vocab), doc_offsets, doc_terms, doc_tfs)
+        self.post_offsets = post_offsets
+        self.post_docs = post_docs
+        self.post_tfs = post_tfs
+        self._post_weights: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _invert(
+        num_terms: int,
+        doc_offsets: np.ndarray,
+        doc_terms: np.ndarray,
+        doc_tfs: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Transpose the document-term CSR into per-term postings lists."""
+        entry_docs = np.repeat(np.arange(len(doc_offsets) - 1, dtype=np.int32), np.diff(doc_offsets))
+        # Stable sort keeps doc ids ascending inside each postings list
+        order = np.argsort(doc_terms, kind="stable")
+        post_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(doc_terms, minlength=num_terms), out=post_offsets[1:])
+        return post_offsets, entry_docs[order], np.asarray(doc_tfs)[order]
+
+    @classmethod
+    def from_tokenized(
+        cls,
+        corpus: Iterable[Sequence[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "BM25Index":
+        """Build an index from a tokenized corpus (one token list per document)."""
+        term_ids: dict[str, int] = {}
+        doc_len: list[int] = []
+        offsets = [0]
+        terms: list[int] = []
+        tfs: list[int] = []
+        df: list[int] = []
+
+        for tokens in corpus:
+            doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                tid = term_ids.get(term)
+                if tid is None:
+                    tid = term_ids[term] = len(term_ids)
+                    df.append(0)
+                df[tid] += 1
+                terms.append(tid)
+                tfs.append(tf)
+            offsets.append(len(terms))
+
+        # Same IDF as BM25Okapi._calc_idf, including the epsilon floor for
+        # terms present in more than half of the documents.
+        n_docs = len(doc_len)
+        idf = np.array(
+            [math.log(n_docs - freq + 0.5) - math.log(freq + 0.5) for freq in df],
+            dtype=np.float64,
+        )
+        if len(idf):
+            eps = epsilon * (idf.sum() / len(idf))
+            idf[idf < 0] = eps
+
+        return cls(
+            vocab=list(term_ids),
+            idf=idf,
+            doc_len=np.array(doc_len, dtype=np.int32),
+            doc_offsets=np.array(offsets, dtype=np.int64),
+            doc_terms=np.array(terms, dtype=np.int32),
+            doc_tfs=np.array(tfs, dtype=np.int32),
+            k1=k1,
+            b=b,
+            epsilon=epsilon,
+        )
+
+    def save(self, index_dir: str | Path, metadata: Optional[dict[str, Any]] = None) -> None:
+        """Write the index arrays and manifest into index_dir."""
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(index_dir / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(index_dir / "vocab.json", "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "num_docs": self.corpus_size,
+            "num_terms": len(self.vocab),
+            **(metadata or {}),
+        }
+        # Manifest last: a directory without one is never treated as valid
+        with open(index_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, index_dir: str | Path, mmap: bool = True) -> "BM25Index":
+        """Open a saved index; arrays are memory-mapped unless mmap=False."""
+        index_dir = Path(index_dir)
+        manifest = read_manifest(index_dir)
+        if not manifest or manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"No compatible BM25 snapshot in {index_dir}")
+
+        mode = "r" if mmap else None
+        arrays = {name: np.load(index_dir / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+        with open(index_dir / "vocab.json", "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+
+        return cls(
+            vocab=vocab,
+            k1=manifest["k1"],
+            b=manifest["b"],
+            epsilon=manifest["epsilon"],
+            **arrays,
+        )
+
+    def _postings(self, term: str) -> tuple[int, np.ndarray, np.ndarray]:
+        """(term id, doc ids, term frequencies) for one term; empty if unknown."""
+        tid = self.term_ids.get(term)
+        if tid is None:
+            return -1, self.post_docs[:0], self.post_tfs[:0]
+        start, end = int(self.post_offsets[tid]), int(self.post_offsets[tid + 1])
+        return tid, self.post_docs[start:end], self.post_tfs[start:end]
+
+    def _term_weights(self, tid: int, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        """BM25 contribution of term tid to each document in its postings list."""
+        return self.idf[tid] * (tfs * (self.k1 + 1) / (tfs + self._norm[docs]))
+
+    @property
+    def post_weights(self) -> np.ndarray:
+        """BM25 weight of every posting: the term-document weight matrix in CSR form.
+
+        Computed on first use only; single queries weigh just their own postings.
+        """
+        if self._post_weights is None:
+            post_terms = np.repeat(np.arange(len(self.vocab)), np.diff(self.post_offsets))
+            tfs = self.post_tfs
+            self._post_weights = self.idf[post_terms] * (
+                tfs * (self.k1 + 1) / (tfs + self._norm[self.post_docs])
+            )
+        return self._post_weights
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """BM25 score of every document for a tokenized query.
+
+        Repeated query tokens count once per occurrence, as in BM25Okapi.
+        """
+        scores = np.zeros(self.corpus_size)
+        for term, qf in Counter(query_tokens).items():
+            tid, docs, tfs = self._postings(term)
+            if len(docs):
+                scores[docs] += qf * self._term_weights(tid, docs, tfs)
+        return scores
+
+    def candidate_scores(self, query_tokens: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Scores of the documents that contain at least one query term.
+
+        Work is proportional to the total postings length of the query terms,
+        not to the corpus size. Returns (doc_ids ascending, scores).
+        """
+        doc_parts: list[np.ndarray] = []
+        weight_parts: list[np.ndarray] = []
+        for term, qf in Counter(query_tokens).items():
+            tid, docs, tfs = self._postings(term)
+            if len(docs):
+                doc_parts.append(docs)
+                weight_parts.append(qf * self._term_weights(tid, docs, tfs))
+
+        if not doc_parts:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        if len(doc_parts) == 1:
+            return np.asarray(doc_parts[0]), weight_parts[0]
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(weight_parts), minlength=len(docs))
+
+    def top_k(
+        self,
+        query_tokens: Sequence[str],
+        k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Best k documents with a positive score, highest first.
+
+        Ties are broken by document order, matching a stable full sort.
+        exclude is an optional boolean mask over documents (True = skip).
+        Returns (doc_ids, scores).
+        """
+        docs, scores = self.candidate_scores(query_tokens)
+        return select_top_k(docs, scores, k, exclude)
+
+    def top_k_many(
+        self,
+        queries: Sequence[Sequence[str]],
+        k: int,
+        max_cells: int = 1 << 24,
+        exclude: Optional[np.ndarray] = None,
+        max_postings: int = 1 << 22,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """top_k for many tokenized queries in one vectorized pass.
+
+        Builds the sparse query-term matrix Q (entries = query term counts) and
+        computes Q @ W against the precomputed weight matrix W by gathering the
+        postings of the (query, term) entries and scattering them into a
+        queries x docs score block. Per-query top-k is then selected with one
+        row-wise partition. Results match top_k exactly.
+
+        Memory is bounded by both limits: queries are processed in blocks of at
+        most max_cells score cells, and each block's postings are gathered at
+        most max_postings at a time (long queries, e.g. whole documents, touch
+        a large share of all postings per query).
+
+        exclude is a boolean document mask shared by all queries (shape
+        [num_docs]) or one mask per query (shape [num_queries, num_docs]);
+        excluded cells are zeroed before selection.
+        """
+        weights = self.post_weights
+        offsets = np.asarray(self.post_offsets)
+        results: list[tuple[np.ndarray, np.ndarray]] = [
+            (np.empty(0, dtype=np.int32), np.empty(0)) for _ in queries
+        ]
+        if k <= 0 or not self.corpus_size:
+            return results
+
+        rows_per_block = max(1, max_cells // self.corpus_size)
+        for block_start in range(0, len(queries), rows_per_block):
+            block = queries[block_start:block_start + rows_per_block]
+
+            # Sparse query-term matrix of this block in COO form
+            q_rows: list[int] = []
+            q_terms: list[int] = []
+            q_counts: list[int] = []
+            for qi, tokens in enumerate(block):
+                for term, qf in Counter(tokens).items():
+                    tid = self.term_ids.get(term)
+                    if tid is not None:
+                        q_rows.append(qi)
+                        q_terms.append(tid)
+                        q_counts.append(qf)
+            if not q_rows:
+                continue
+
+            rows = np.array(q_rows, dtype=np.int64)
+            terms = np.array(q_terms, dtype=np.int64)
+            counts = np.array(q_counts, dtype=np.float64)
+            starts = offsets[terms]
+            lengths = offsets[terms + 1] - starts
+            ends = np.cumsum(lengths)
+            total = int(ends[-1])
+
+            # Q @ W for this block. The concatenated postings ranges of all
+            # (query, term) entries are gathered max_postings at a time. Every
+            # cell must sum its terms in query order to match top_k exactly:
+            # bincount does that for the first chunk, np.add.at (unbuffered,
+            # in order) continues the sums for the rest.
+            num_cells = len(block) * self.corpus_size
+            chunk = max(1, max_postings)
+            block_scores = None
+            for chunk_start in range(0, total, chunk):
+                flat = np.arange(chunk_start, min(total, chunk_start + chunk))
+                entry_of = np.searchsorted(ends, flat, side="right")
+                positions = starts[entry_of] + (flat - (ends[entry_of] - lengths[entry_of]))
+                cells = rows[entry_of] * self.corpus_size + np.asarray(self.post_docs)[positions]
+                contrib = counts[entry_of] * weights[positions]
+                if block_scores is None:
+                    block_scores = np.bincount(cells, weights=contrib, minlength=num_cells)
+                else:
+                    np.add.at(block_scores, cells, contrib)
+            block_scores = block_scores.reshape(len(block), self.corpus_size)
+            if exclude is not None:
+                if exclude.ndim == 1:
+                    block_scores[:, exclude] = 0.0
+                else:
+                    block_scores[exclude[block_start:block_start + len(block)]] = 0.0
+
+            for qi, pair in enumerate(_rowwise_top_k(block_scores, k)):
+                results[block_start + qi] = pair
+        return results
+
+
+def _rowwise_top_k(scores: np.ndarray, k: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    """select_top_k applied to every row of a dense score block at once."""
+    n_rows, n_cols = scores.shape
+    if k < n_cols:
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1]
+        mask = (scores >= kth[:, None]) & (scores > 0)
+    else:
+        mask = scores > 0
+    rows, docs = np.nonzero(mask)
+    values = scores[rows, docs]
+
+    order = np.lexsort((docs, -values, rows))
+    rows, docs, values = rows[order], docs[order], values[order]
+    keep = (np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")) < k
+    rows, docs, values = rows[keep], docs[keep].astype(np.int32), values[keep]
+
+    bounds = np.searchsorted(rows, np.arange(n_rows + 1))
+    return [(docs[bounds[r]:bounds[r + 1]], values[bounds[r]:bounds[r + 1]]) for r in range(n_rows)]
+
+
+def select_top_k(
+    docs: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    exclude: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pick the k highest positive scores without sorting every candidate.
+
+    exclude is an optional boolean mask indexed by document id (True = skip).
+    """
+    positive = scores > 0
+    if exclude is not None:
+        positive &= ~exclude[docs]
+    docs, scores = docs[positive], scores[positive]
+    if k <= 0 or not len(docs):
+        return docs[:0], scores[:0]
+    if len(docs) > k:
+        # Keep everything tied with the k-th score so tie-breaking stays exact
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth
+        docs, scores = docs[keep], scores[keep]
+    order = np.lexsort((docs, -scores))[:k]
+    return docs[order], scores[order]
+
+
+_FIELD_ARRAYS = ("field_len", "post_offsets", "post_docs", "post_fields", "post_tfs")
+
+
+class BM25FIndex:
+    """Field-weighted BM25F sharing the vocabulary and IDF of a BM25Index.
+
+    Term frequencies are kept per field; at query time each field's frequency
+    is length-normalised against that field's average length, weighted, and
+    summed into one pseudo-frequency before BM25 saturation:
+
+        tf~(t, d) = sum_f w_f * tf_f(t, d) / (1 - b_f + b_f * len_f(d) / avglen_f)
+        score(d)  = sum_t idf(t) * tf~ * (k1 + 1) / (k1 + tf~)
+
+    Field weights and b values are query-time parameters, so they can be tuned
+    without rebuilding. Arrays are stored in the BM25 snapshot with an "f_" prefix.
+    """
+
+    def __init__(
+        self,
+        base: BM25Index,
+        fields: Sequence[str],
+        field_len: np.ndarray,
+        post_offsets: np.ndarray,
+        post_docs: np.ndarray,
+        post_fields: np.ndarray,
+        post_tfs: np.ndarray,
+    ):
+        self.base = base
+        self.fields = list(fields)
+        self.field_len = field_len  # (num_fields, num_docs)
+        self.post_offsets = post_offsets
+        self.post_docs = post_docs
+        self.post_fields = post_fields
+        self.post_tfs = post_tfs
+        self.k1 = base.k1
+        self.corpus_size = base.corpus_size
+        self.avg_field_len = field_len.mean(axis=1) if self.corpus_size else np.zeros(len(self.fields))
+
+    @classmethod
+    def from_tokenized_fields(
+        cls,
+        base: BM25Index,
+        fields: Sequence[str],
+        corpus: Iterable[Sequence[Sequence[str]]],
+    ) -> "BM25FIndex":
+        """Build from per-document lists of per-field tokens (same order as fields).
+
+        base must have been built from the concatenation of the same fields.
+        """
+        field_len: list[list[int]] = [[] for _ in fields]
+        terms: list[int] = []
+        docs: list[int] = []
+        field_ids: list[int] = []
+        tfs: list[int] = []
+
+        for doc_id, doc_fields in enumerate(corpus):
+            for f, tokens in enumerate(doc_fields):
+                field_len[f].append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    terms.append(base.term_ids[term])
+                    docs.append(doc_id)
+                    field_ids.append(f)
+                    tfs.append(tf)
+
+        terms_arr = np.array(terms, dtype=np.int32)
+        order = np.argsort(terms_arr, kind="stable")
+        post_offsets = np.zeros(len(base.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms_arr, minlength=len(base.vocab)), out=post_offsets[1:])
+
+        return cls(
+            base=base,
+            fields=fields,
+            field_len=np.array(field_len, dtype=np.int32).reshape(len(fields), -1),
+            post_offsets=post_offsets,
+            post_docs=np.array(docs, dtype=np.int32)[order],
+            post_fields=np.array(field_ids, dtype=np.uint8)[order],
+            post_tfs=np.array(tfs, dtype=np.int32)[order],
+        )
+
+    def save(self, index_dir: str | Path) -> None:
+        """Write field arrays next to an already saved base index."""
+        index_dir = Path(index_dir)
+        for name in _FIELD_ARRAYS:
+            np.save(index_dir / f"f_{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(index_dir / "f_fields.json", "w", encoding="utf-8") as f:
+            json.dump(self.fields, f)
+
+    @classmethod
+    def load(cls, index_dir: str | Path, base: BM25Index, mmap: bool = True) -> "BM25FIndex":
+        """Open the field arrays saved next to base's snapshot."""
+        index_dir = Path(index_dir)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(index_dir / f"f_{name}.npy", mmap_mode=mode) for name in _FIELD_ARRAYS}
+        with open(index_dir / "f_fields.json", "r", encoding="utf-8") as f:
+            fields = json.load(f)
+        return cls(base=base, fields=fields, **arrays)
+
+    def _field_params(
+        self,
+        weights: Optional[dict[str, float]],
+        b: Optional[dict[str, float]],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Per-field weight vector and (num_fields, num_docs) length normalisers."""
+        for name in list(weights or {}) + list(b or {}):
+            if name not in self.fields:
+                raise ValueError(f"Unknown field '{name}'. Available: {self.fields}")
+        w = np.array([(weights or {}).get(f, 1.0) for f in self.fields])
+        bf = np.array([(b or {}).get(f, 0.75) for f in self.fields])
+        avg = np.where(self.avg_field_len > 0, self.avg_field_len, 1.0)
+        norm = 1 - bf[:, None] + bf[:, None] * self.field_len / avg[:, None]
+        return w, norm
+
+    def candidate_scores(
+        self,
+        query_tokens: Sequence[str],
+        weights: Optional[dict[str, float]] = None,
+        b: Optional[dict[str, float]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """BM25F scores of documents containing a query term: (doc_ids, scores)."""
+        w, norm = self._field_params(weights, b)
+        doc_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+
+        for term, qf in Counter(query_tokens).items():
+            tid = self.base.term_ids.get(term)
+            if tid is None:
+                continue
+            start, end = int(self.post_offsets[tid]), int(self.post_offsets[tid + 1])
+            docs = self.post_docs[start:end]
+            fields = self.post_fields[start:end]
+            pseudo = w[fields] * self.post_tfs[start:end] / norm[fields, docs]
+
+            # One term may hit several fields of the same document
+            term_docs, inverse = np.unique(docs, return_inverse=True)
+            tf_tilde = np.bincount(inverse, weights=pseudo, minlength=len(term_docs))
+            doc_parts.append(term_docs)
+            score_parts.append(qf * self.base.idf[tid] * tf_tilde * (self.k1 + 1) / (self.k1 + tf_tilde))
+
+        if not doc_parts:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(score_parts), minlength=len(docs))
+
+    def top_k(
+        self,
+        query_tokens: Sequence[str],
+        k: int,
+        weights: Optional[dict[str, float]] = None,
+        b: Optional[dict[str, float]] = None,
+        exclude: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Best k documents by BM25F score: (doc_ids, scores).
+
+        exclude is an optional boolean document mask, as in BM25Index.top_k.
+        """
+        docs, scores = self.candidate_scores(query_tokens, weights=weights, b=b)
+        return select_top_k(docs, scores, k, exclude)
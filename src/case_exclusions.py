@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Named case exclusion lists shared by the BM25 and vector search paths.
+
+Instead of keeping physically filtered copies of the corpus CSV, searches run
+over the complete corpus and drop excluded case numbers at top-k time.
+An exclusion spec is a list mixing:
+  - case numbers (ints or digit strings), e.g. 19172
+  - named lists from EXCLUSION_LISTS, e.g. "benchmark_50"
+  - "target", meaning the case being diagnosed (passed separately as target_case)
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Named exclusion lists: name -> CSV whose case_title/link columns name the cases
+EXCLUSION_LISTS: dict[str, Path] = {
+    "benchmark_50": PROJECT_ROOT / "medd_selected_50.csv",
+}
+
+# Placeholder for the target case itself
+TARGET = "target"
+
+# What the CLIs exclude unless told otherwise (matches the old filtered CSV)
+DEFAULT_EXCLUDE = ("benchmark_50",)
+
+ExcludeSpec = Iterable[Union[int, str]]
+
+
+def case_number_from_row(row: dict[str, str]) -> Optional[int]:
+    """Case number from a corpus row ("Case number N" title or /case/N link)."""
+    match = re.search(r"Case number (\d+)", row.get("case_title", "") or "")
+    if not match:
+        match = re.search(r"/case/(\d+)", row.get("link", "") or "")
+    return int(match.group(1)) if match else None
+
+
+@lru_cache(maxsize=None)
+def load_case_list(csv_path: Path) -> frozenset[int]:
+    """Case numbers listed in a CSV (cached per path)."""
+    for encoding in ["utf-8", "utf-8-sig", "latin-1", "cp1252"]:
+        try:
+            with open(csv_path, "r", encoding=encoding) as f:
+                numbers = {case_number_from_row(row) for row in csv.DictReader(f)}
+            numbers.discard(None)
+            return frozenset(numbers)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"Could not decode exclusion list {csv_path}")
+
+
+def resolve_exclusions(exclude: Optional[ExcludeSpec], target_case: Optional[int] = None) -> frozenset[int]:
+    """Expand an exclusion spec into a set of case numbers."""
+    numbers: set[int] = set()
+    for item in exclude or ():
+        if isinstance(item, int):
+            numbers.add(item)
+            continue
+        item = str(item).strip()
+        if item.isdigit():
+            numbers.add(int(item))
+        elif item == TARGET:
+            if target_case is not None:
+                numbers.add(int(target_case))
+        elif item in EXCLUSION_LISTS:
+            numbers |= load_case_list(EXCLUSION_LISTS[item])
+        else:
+            raise ValueError(
+                f"Unknown exclusion '{item}'. Use case numbers, '{TARGET}' or one of: {sorted(EXCLUSION_LISTS)}"
+            )
+    return frozenset(numbers)
+
+
+def parse_exclude(value: str) -> list[str]:
+    """argparse type for comma-separated exclusion specs; "none" disables exclusion."""
+    items = [part.strip() for part in value.split(",") if part.strip()]
+    if items == ["none"]:
+        return []
+    for item in items:
+        if not (item.isdigit() or item == TARGET or item in EXCLUSION_LISTS):
+            raise argparse.ArgumentTypeError(
+                f"unknown exclusion '{item}' (case numbers, '{TARGET}', 'none' or: {', '.join(EXCLUSION_LISTS)})"
+            )
+    return items
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Precomputed case-to-case kNN similarity graph.
+
+An offline job computes the top-K most similar corpus cases of every case,
+once per similarity source, so "which cases are most similar to case X" is a
+dictionary lookup instead of an embedding call and a vector/BM25 query:
+
+    vector  cosine similarity of stored case embeddings (local vector index,
+            exported from Qdrant if needed), blocked matrix multiply
+    bm25    BM25 score of every case when the other case's full text is the query
+            (batched through BM25Index.top_k_many)
+
+Usage:
+    uv run python src/case_similarity_graph.py build --source all --k 50
+    uv run python src/case_similarity_graph.py neighbors 17930 --source bm25 -k 10
+
+Graph layout (one directory per source, default data/case_graph/<source>):
+    manifest.json   format version, source, k, what it was built from
+    case_ids.npy    int64 case number of each node (row)
+    offsets.npy     int64 CSR row offsets into neighbors / scores
+    neighbors.npy   int64 neighbour case numbers, best first
+    scores.npy      float32 similarity score of each neighbour
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from bm25_index import dir_lock, read_manifest, replace_dir
+
+PROJECT_ROOT = SRC_DIR.parent
+FORMAT_VERSION = 1
+SOURCES = ("vector", "bm25")
+DEFAULT_ROOT = PROJECT_ROOT / "data" / "case_graph"
+DEFAULT_CSV = PROJECT_ROOT / "deepsearch_complete.csv"
+DEFAULT_K = 50
+_ARRAYS = ("case_ids", "offsets", "neighbors", "scores")
+
+
+class CaseSimilarityGraph:
+    """Top-k neighbour lists of every case in CSR form."""
+
+    def __init__(
+        self,
+        case_ids: np.ndarray,
+        offsets: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        source: str,
+        metadata: Optional[dict] = None,
+    ):
+        self.case_ids = case_ids
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.scores = scores
+        self.source = source
+        self.metadata = metadata or {}
+        self.row_of = {int(case_id): row for row, case_id in enumerate(case_ids)}
+
+    @staticmethod
+    def default_dir(source: str) -> Path:
+        return DEFAULT_ROOT / source
+
+    @property
+    def k(self) -> int:
+        return int(np.diff(self.offsets).max()) if len(self.case_ids) else 0
+
+    def neighbors_of(self, case_id: int, k: Optional[int] = None) -> list[tuple[int, float]]:
+        """(case number, score) of up to k nearest cases, best first; [] for unknown cases."""
+        row = self.row_of.get(int(case_id))
+        if row is None:
+            return []
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        if k is not None:
+            end = min(end, start + k)
+        return [(int(n), float(s)) for n, s in zip(self.neighbors[start:end], self.scores[start:end])]
+
+    @classmethod
+    def from_topk(
+        cls,
+        case_ids: Sequence[int],
+        topk: Sequence[tuple[np.ndarray, np.ndarray]],
+        source: str,
+        metadata: Optional[dict] = None,
+    ) -> "CaseSimilarityGraph":
+        """Graph from per-node (neighbour case ids, scores), both best first."""
+        lengths = np.array([len(ids) for ids, _ in topk], dtype=np.int64)
+        offsets = np.zeros(len(topk) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        neighbors = np.concatenate([ids for ids, _ in topk]).astype(np.int64) if len(topk) else np.empty(0, np.int64)
+        scores = np.concatenate([s for _, s in topk]).astype(np.float32) if len(topk) else np.empty(0, np.float32)
+        return cls(np.asarray(case_ids, dtype=np.int64), offsets, neighbors, scores, source, metadata)
+
+    def save(self, graph_dir: str | Path) -> None:
+        """Write the graph atomically (tmp dir + rename) under the directory lock."""
+        graph_dir = Path(graph_dir)
+        with dir_lock(graph_dir):
+            tmp_dir = graph_dir.parent / f".{graph_dir.name}.tmp-{os.getpid()}"
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+            for name in _ARRAYS:
+                np.save(tmp_dir / f"{name}.npy", getattr(self, name))
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "source": self.source,
+                "k": self.k,
+                "num_cases": len(self.case_ids),
+                **self.metadata,
+            }
+            with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            replace_dir(tmp_dir, graph_dir)
+
+    @classmethod
+    def load(cls, graph_dir: str | Path, mmap: bool = True) -> "CaseSimilarityGraph":
+        graph_dir = Path(graph_dir)
+        manifest = read_manifest(graph_dir)
+        if manifest is None or manifest.get("format_version") != FORMAT_VERSION:
+            raise FileNotFoundError(
+                f"No similarity graph at {graph_dir}. Build one with: "
+                "uv run python src/case_similarity_graph.py build --source <vector|bm25|all>"
+            )
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(graph_dir / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAYS}
+        metadata = {key: value for key, value in manifest.items() if key not in {"format_version", "source", "k", "num_cases"}}
+        return cls(source=manifest["source"], metadata=metadata, **arrays)
+
+
+def vector_topk(
+    vectors: np.ndarray,
+    case_ids: np.ndarray,
+    k: int,
+    max_cells: int = 1 << 24,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Cosine top-k neighbours of every row (itself excluded).
+
+    Rows are processed in blocks of at most max_cells similarity cells, so
+    memory stays bounded for any corpus size.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1.0)
+    n = len(vectors)
+    k = min(k, n - 1)
+    results: list[tuple[np.ndarray, np.ndarray]] = []
+    if k <= 0:
+        return [(case_ids[:0], np.empty(0, np.float32)) for _ in range(n)]
+
+    block_rows = max(1, max_cells // max(n, 1))
+    for start in range(0, n, block_rows):
+        sims = vectors[start:start + block_rows] @ vectors.T
+        rows = np.arange(len(sims))
+        sims[rows, start + rows] = -np.inf  # never your own neighbour
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        for cols, scores in zip(part, part_scores):
+            order = np.lexsort((case_ids[cols], -scores))
+            results.append((case_ids[cols[order]], scores[order]))
+    return results
+
+
+def build_vector_graph(
+    collection: Optional[str] = None,
+    local_path: Optional[Path] = None,
+    k: int = DEFAULT_K,
+) -> CaseSimilarityGraph:
+    """Graph from stored embeddings (local index; exported from Qdrant if there is none)."""
+    from vector_backends import DEFAULT_COLLECTION, LocalVectorIndex, QdrantBackend
+
+    collection = collection or DEFAULT_COLLECTION
+    local_path = local_path or LocalVectorIndex.default_dir(collection)
+    try:
+        index = LocalVectorIndex.load(local_path)
+        built_from = str(local_path)
+    except FileNotFoundError:
+        print(f"No local vector index at {local_path}; reading vectors from Qdrant '{collection}'...")
+        index = LocalVectorIndex.from_qdrant(QdrantBackend(collection))
+        built_from = f"qdrant:{collection}"
+
+    ids = np.asarray(index.ids, dtype=np.int64)
+    topk = vector_topk(np.asarray(index.vectors), ids, k)
+    return CaseSimilarityGraph.from_topk(ids, topk, "vector", {"built_from": built_from})
+
+
+def build_bm25_graph(
+    csv_path: Optional[str | Path] = None,
+    k: int = DEFAULT_K,
+    batch_size: int = 256,
+) -> CaseSimilarityGraph:
+    """Graph from BM25: every case's indexed tokens are used as a query against the corpus."""
+    from med_search import MedSearchEngine
+
+    csv_path = Path(csv_path or DEFAULT_CSV)
+    engine = MedSearchEngine(str(csv_path))
+    bm25 = engine.bm25
+    doc_offsets = np.asarray(bm25.doc_offsets)
+    doc_terms = np.asarray(bm25.doc_terms)
+    doc_tfs = np.asarray(bm25.doc_tfs)
+
+    rows = [row for row, case in enumerate(engine.cases) if case.case_number is not None]
+    row_case_ids = np.array([case.case_number or -1 for case in engine.cases], dtype=np.int64)
+    topk: list[tuple[np.ndarray, np.ndarray]] = []
+    for start in range(0, len(rows), batch_size):
+        block = rows[start:start + batch_size]
+        queries = [
+            [bm25.vocab[tid] for tid, tf in zip(doc_terms[a:b], doc_tfs[a:b]) for _ in range(tf)]
+            for a, b in ((doc_offsets[row], doc_offsets[row + 1]) for row in block)
+        ]
+        for row, (docs, scores) in zip(block, bm25.top_k_many(queries, k + 1)):
+            keep = (docs != row) & (row_case_ids[docs] >= 0)
+            topk.append((row_case_ids[docs[keep]][:k], scores[keep][:k]))
+        print(f"  bm25: {min(start + batch_size, len(rows))}/{len(rows)} cases")
+
+    return CaseSimilarityGraph.from_topk(row_case_ids[rows], topk, "bm25", {"built_from": str(csv_path)})
+
+
+_graphs: dict[Path, CaseSimilarityGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def load_graph(source: str = "vector", graph_dir: Optional[str | Path] = None) -> CaseSimilarityGraph:
+    """Graph for a source, loaded (memory-mapped) once per process."""
+    if source not in SOURCES:
+        raise ValueError(f"Unknown similarity source '{source}'. Use one of: {', '.join(SOURCES)}")
+    path = Path(graph_dir) if graph_dir else CaseSimilarityGraph.default_dir(source)
+    with _graphs_lock:
+        if path not in _graphs:
+            _graphs[path] = CaseSimilarityGraph.load(path)
+        return _graphs[path]
+
+
+def neighbors(case_id: int, k: int = 10, source: str = "vector") -> list[tuple[int, float]]:
+    """Up to k (case number, score) most similar to case_id under the given source."""
+    return load_graph(source).neighbors_of(case_id, k)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precomputed case-to-case similarity graph")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compute neighbour lists for every case")
+    build_parser.add_argument("--source", choices=(*SOURCES, "all"), default="all", help="Similarity source")
+    build_parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours stored per case")
+    build_parser.add_argument("--csv", type=str, default=str(DEFAULT_CSV), help="Corpus CSV (bm25)")
+    build_parser.add_argument("--collection", type=str, default=None, help="Vector collection (vector)")
+    build_parser.add_argument("--local-index", type=Path, default=None, help="Local vector index dir (vector)")
+    build_parser.add_argument("--out-root", type=Path, default=DEFAULT_ROOT, help="Graph root directory")
+
+    nb_parser = subparsers.add_parser("neighbors", help="Show the most similar cases of one case")
+    nb_parser.add_argument("case_id", type=int, help="Case number")
+    nb_parser.add_argument("--source", choices=SOURCES, default="vector", help="Similarity source")
+    nb_parser.add_argument("-k", type=int, default=10, help="Number of neighbours")
+    nb_parser.add_argument("--graph-root", type=Path, default=DEFAULT_ROOT, help="Graph root directory")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        sources = SOURCES if args.source == "all" else (args.source,)
+        for source in sources:
+            print(f"Building {source} similarity graph (k={args.k})...")
+            if source == "vector":
+                graph = build_vector_graph(args.collection, args.local_index, args.k)
+            else:
+                graph = build_bm25_graph(args.csv, args.k)
+            graph.save(args.out_root / source)
+            print(f"Saved {len(graph.case_ids)} cases x {graph.k} neighbours to {args.out_root / source}")
+        return 0
+
+    graph = load_graph(args.source, args.graph_root / args.source)
+    results = graph.neighbors_of(args.case_id, args.k)
+    if not results:
+        print(f"Case number {args.case_id} is not in the {args.source} graph.")
+        return 1
+    for rank, (case_id, score) in enumerate(results, 1):
+        print(f"{rank:>3}. Case number {case_id}  ({args.source} score {score:.4f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Keyed case store: case records and case-number lookup, with no ranking index.
+
+Cases are written once to data/case_store/<csv name>/ as one UTF-8 JSON record
+per case inside a memory-mapped byte blob (cases.npy), with byte offsets
+(case_offsets.npy) and case numbers (case_numbers.npy). Opening the store only
+maps these files and decodes the records that are actually read, so a
+case-number lookup never parses the CSV or builds BM25. The store is rebuilt
+when the corpus CSV or the image-caption CSV changes.
+"""
+
+import csv
+import json
+import os
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import ClassVar, Iterator, Optional
+
+import numpy as np
+
+from bm25_index import dir_lock, file_sha256, read_manifest, replace_dir
+
+# Bump when MedCase fields or the record layout change
+STORE_VERSION = 1
+
+
+@dataclass
+class MedCase:
+    """Represents a medical case from the dataset."""
+    case_title: str
+    case_date: str
+    link: str
+    clinical_history: str
+    imaging_findings: str
+    discussion: str
+    differential_diagnosis: str
+    final_diagnosis: str
+    images: str
+    relate_case: str
+    categories: str
+    image_captions: list = field(default_factory=list)
+
+    # Text fields indexed for search, in searchable_text order
+    SEARCH_FIELDS: ClassVar[tuple[str, ...]] = (
+        "clinical_history", "imaging_findings", "discussion", "differential_diagnosis", "final_diagnosis",
+    )
+
+    @property
+    def case_number(self) -> Optional[int]:
+        """Extract case number from title."""
+        match = re.search(r'Case number (\d+)', self.case_title)
+        if match:
+            return int(match.group(1))
+        return None
+
+    @property
+    def searchable_text(self) -> str:
+        """Combined text for BM25 indexing."""
+        return f"{self.clinical_history} {self.imaging_findings} {self.discussion} {self.differential_diagnosis} {self.final_diagnosis}"
+
+    @property
+    def related_cases_top5(self) -> str:
+        """Get top 5 related cases."""
+        if not self.relate_case:
+            return 'N/A'
+        cases = self.relate_case.split(';')[:20]
+        return ';'.join(cases)
+
+    @property
+    def images_display(self) -> str:
+        """Format image info with captions."""
+        count = self.images or '0'
+        if not self.image_captions:
+            return f"{count} image(s)"
+        lines = [f"{count} image(s):"]
+        for i, cap in enumerate(self.image_captions, 1):
+            lines.append(f"  {i}. {cap}")
+        return "\n".join(lines)
+
+    def display(self) -> str:
+        """Format case for display."""
+        separator = "=" * 20
+        return f"""
+{separator}
+CASE: {self.case_title}
+Date: {self.case_date}
+Link: {self.link}
+Categories: {self.categories}
+
+--- CLINICAL HISTORY ---
+{self.clinical_history or 'N/A'}
+
+--- IMAGING FINDINGS ---
+{self.imaging_findings or 'N/A'}
+
+--- DIFFERENTIAL DIAGNOSIS ---
+{self.differential_diagnosis or 'N/A'}
+
+--- FINAL DIAGNOSIS ---
+{self.final_diagnosis or 'N/A'}
+
+--- RELATED CASES ---
+{self.related_cases_top5}
+{separator}
+"""
+
+## should add back later
+# --- DISCUSSION ---
+# {self.discussion or 'N/A'}
+
+# --- IMAGES ---
+# {self.images_display}
+
+# --- RELATED CASES ---
+# {self.related_cases_top5}
+# {separator}
+
+
+class _CaseRecords(Sequence):
+    """Read-only case list backed by the store's memory-mapped records.
+
+    Each case is a UTF-8 JSON record inside cases.npy; it is decoded on first access only.
+    """
+
+    def __init__(self, store_dir: Path):
+        self._blob = np.load(store_dir / "cases.npy", mmap_mode="r")
+        self._offsets = np.load(store_dir / "case_offsets.npy", mmap_mode="r")
+        self._decoded: dict[int, MedCase] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        case = self._decoded.get(idx)
+        if case is None:
+            start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+            record = json.loads(self._blob[start:end].tobytes().decode("utf-8"))
+            case = self._decoded[idx] = MedCase(**record)
+        return case
+
+
+class _CaseNumberIndex(Mapping):
+    """case_number -> MedCase view over a row-number mapping."""
+
+    def __init__(self, rows: dict[int, int], cases: Sequence):
+        self._rows = rows
+        self._cases = cases
+
+    def __getitem__(self, case_number: int) -> MedCase:
+        return self._cases[self._rows[case_number]]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def source_fingerprint(path: Path) -> Optional[dict]:
+    """Identify a source file by stat info plus content hash."""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return {
+        "path": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+
+
+def source_unchanged(path: Path, recorded: Optional[dict]) -> bool:
+    """Compare a source file with its recorded fingerprint.
+
+    Size and mtime are checked first so the hash is only computed when the
+    file was touched; a touched file with identical content still matches.
+    """
+    if not path.exists() or recorded is None:
+        return not path.exists() and recorded is None
+    stat = path.stat()
+    if stat.st_size != recorded.get("size"):
+        return False
+    if stat.st_mtime_ns == recorded.get("mtime_ns"):
+        return True
+    if file_sha256(path) != recorded.get("sha256"):
+        return False
+    recorded["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def load_captions(image_csv_path: Path) -> dict[str, list[str]]:
+    """Load image captions from the image CSV into a case_id -> captions index."""
+    captions: dict[str, list[str]] = {}
+    if not image_csv_path.exists():
+        print(f"Warning: Image CSV not found at {image_csv_path}. Captions unavailable.")
+        return captions
+
+    with open(image_csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            plink = row.get("plink", "")
+            match = re.search(r'/case/(\d+)', plink)
+            if not match:
+                continue
+            case_id = match.group(1)
+            caption = row.get("img_alt", "").strip()
+            if caption:
+                captions.setdefault(case_id, []).append(caption)
+    return captions
+
+
+def load_cases(csv_path: Path, captions: dict[str, list[str]]) -> list[MedCase]:
+    """Load cases from CSV file, attaching image captions."""
+    print(f"Loading data from {csv_path}...")
+    cases: list[MedCase] = []
+    with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            case = MedCase(
+                case_title=row.get('case_title', ''),
+                case_date=row.get('case_date', ''),
+                link=row.get('link', ''),
+                clinical_history=row.get('clinical_history', ''),
+                imaging_findings=row.get('imaging_findings', ''),
+                discussion=row.get('discussion', ''),
+                differential_diagnosis=row.get('differential_diagnosis', ''),
+                final_diagnosis=row.get('final_diagnosis', ''),
+                images=row.get('images', ''),
+                relate_case=row.get('relate_case', ''),
+                categories=row.get('Categories', ''),
+            )
+            # Attach image captions from the image CSV
+            link = row.get('link', '')
+            link_match = re.search(r'/case/(\d+)', link)
+            if link_match:
+                case.image_captions = captions.get(link_match.group(1), [])
+            cases.append(case)
+
+    print(f"Loaded {len(cases)} cases.")
+    return cases
+
+
+class CaseStore:
+    """Case records addressable by row and by case number."""
+
+    # Default image CSV path (relative to this file's parent's parent)
+    DEFAULT_IMAGE_CSV = Path(__file__).parent.parent / "deepresearch图片链接.csv"
+    # Default store root; each corpus CSV gets its own sub-directory
+    DEFAULT_ROOT = Path(__file__).parent.parent / "data" / "case_store"
+
+    def __init__(self, cases: Sequence[MedCase], case_rows: Mapping[int, int]):
+        self.cases = cases
+        # case_number -> row in self.cases (last row wins for duplicates)
+        self.case_rows = case_rows
+        self.by_number: Mapping[int, MedCase] = _CaseNumberIndex(dict(case_rows), cases)
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def get(self, case_number: int) -> Optional[MedCase]:
+        """Case with this number, or None."""
+        row = self.case_rows.get(case_number)
+        return None if row is None else self.cases[row]
+
+    @staticmethod
+    def default_dir(csv_path: str | Path) -> Path:
+        return CaseStore.DEFAULT_ROOT / Path(csv_path).stem
+
+    @classmethod
+    def from_csv(cls, csv_path: str | Path, image_csv_path: Optional[str | Path] = None) -> "CaseStore":
+        """Parse the CSVs into an in-memory store."""
+        cases = load_cases(Path(csv_path), load_captions(Path(image_csv_path or cls.DEFAULT_IMAGE_CSV)))
+        rows = {case.case_number: row for row, case in enumerate(cases) if case.case_number is not None}
+        return cls(cases, rows)
+
+    @classmethod
+    def load(cls, store_dir: str | Path) -> "CaseStore":
+        """Memory-map a saved store."""
+        store_dir = Path(store_dir)
+        cases = _CaseRecords(store_dir)
+        case_numbers = np.load(store_dir / "case_numbers.npy")
+        rows = {int(num): row for row, num in enumerate(case_numbers.tolist()) if num >= 0}
+        return cls(cases, rows)
+
+    def save(self, store_dir: str | Path, csv_path: Path, image_csv_path: Path) -> None:
+        """Write records to a fresh directory and swap it into place.
+
+        The caller holds dir_lock(store_dir); csv_path and image_csv_path are
+        fingerprinted so open() can tell when the store is stale.
+        """
+        store_dir = Path(store_dir)
+        tmp_dir = store_dir.parent / f"{store_dir.name}.tmp-{os.getpid()}"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        records = [json.dumps(asdict(case), ensure_ascii=False).encode("utf-8") for case in self.cases]
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in records], out=offsets[1:])
+        np.save(tmp_dir / "cases.npy", np.frombuffer(b"".join(records), dtype=np.uint8))
+        np.save(tmp_dir / "case_offsets.npy", offsets)
+        numbers = np.full(len(self.cases), -1, dtype=np.int64)
+        for number, row in self.case_rows.items():
+            numbers[row] = number
+        np.save(tmp_dir / "case_numbers.npy", numbers)
+
+        # Manifest last: a directory without one is never treated as valid
+        manifest = {
+            "store_version": STORE_VERSION,
+            "num_cases": len(self.cases),
+            "sources": {"csv": source_fingerprint(csv_path), "image_csv": source_fingerprint(image_csv_path)},
+        }
+        with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        replace_dir(tmp_dir, store_dir)
+        print(f"Saved case store to {store_dir}")
+
+    @classmethod
+    def open(
+        cls,
+        csv_path: str | Path,
+        image_csv_path: Optional[str | Path] = None,
+        store_dir: Optional[str | Path] = None,
+    ) -> "CaseStore":
+        """Load the store for csv_path, rebuilding it first if the sources changed."""
+        csv_path = Path(csv_path)
+        image_csv_path = Path(image_csv_path or cls.DEFAULT_IMAGE_CSV)
+        store_dir = Path(store_dir) if store_dir else cls.default_dir(csv_path)
+
+        store = cls._load_fresh(csv_path, image_csv_path, store_dir)
+        if store is None:
+            with dir_lock(store_dir):
+                # Another process may have rebuilt it while we waited
+                store = cls._load_fresh(csv_path, image_csv_path, store_dir)
+                if store is None:
+                    store = cls.from_csv(csv_path, image_csv_path)
+                    store.save(store_dir, csv_path, image_csv_path)
+        return store
+
+    @classmethod
+    def _load_fresh(cls, csv_path: Path, image_csv_path: Path, store_dir: Path) -> Optional["CaseStore"]:
+        """The saved store if it matches the current source files, else None."""
+        manifest = read_manifest(store_dir)
+        if not manifest or manifest.get("store_version") != STORE_VERSION:
+            return None
+        sources = manifest.get("sources", {})
+        recorded = json.dumps(sources, sort_keys=True)
+        if not source_unchanged(csv_path, sources.get("csv")):
+            return None
+        if not source_unchanged(image_csv_path, sources.get("image_csv")):
+            return None
+        try:
+            store = cls.load(store_dir)
+        except (OSError, ValueError) as e:
+            print(f"Warning: case store at {store_dir} unreadable ({e}); rebuilding.")
+            return None
+
+        # Persist refreshed mtimes so touched-but-unchanged files skip hashing next time
+        if json.dumps(sources, sort_keys=True) != recorded:
+            try:
+                tmp = store_dir / "manifest.json.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(tmp, store_dir / "manifest.json")
+            except OSError:
+                pass
+        return store
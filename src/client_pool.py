@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Process-wide pool of API clients.
+
+Every Agent, subagent, research tool and vector search used to build its own
+OpenAI/OpenRouter/Qdrant client, each with its own connection pool, so a
+benchmark running subagents in parallel opened (and TLS-handshook) a fresh
+connection per agent. Clients are now created once per (base_url, api_key)
+and shared: they are thread-safe, and their keep-alive connections are
+reused across agents and threads.
+
+    from client_pool import get_openai_client, get_qdrant_client
+    client = get_openai_client(api_key, "https://openrouter.ai/api/v1")
+
+Async clients (Agent.arun) are pooled per event loop, since httpx async
+connections belong to the loop that opened them:
+
+    client = get_async_openai_client(api_key, "https://openrouter.ai/api/v1")
+
+Environment:
+    CLIENT_POOL_MAX_CONNECTIONS  open connections per client (default: 64)
+    CLIENT_POOL_MAX_KEEPALIVE    idle connections kept alive per client (default: 32)
+    CLIENT_POOL_KEEPALIVE_EXPIRY seconds an idle connection is kept (default: 60)
+    CLIENT_POOL_HTTP2            "1" to use HTTP/2 when the h2 package is installed
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Any, Optional
+
+import httpx
+
+MAX_CONNECTIONS_ENV = "CLIENT_POOL_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV = "CLIENT_POOL_MAX_KEEPALIVE"
+KEEPALIVE_EXPIRY_ENV = "CLIENT_POOL_KEEPALIVE_EXPIRY"
+HTTP2_ENV = "CLIENT_POOL_HTTP2"
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_MAX_KEEPALIVE = 32
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+# Same as the openai package default; long generations need the long read timeout
+DEFAULT_TIMEOUT = httpx.Timeout(timeout=600.0, connect=5.0)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientPool:
+    """Thread-safe cache of OpenAI-compatible and Qdrant clients."""
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # httpx raises at client creation if http2 is requested without h2
+        self.http2 = http2 and http2_available()
+        self._clients: dict[tuple[str, str, Optional[str]], Any] = {}
+        # event loop -> clients opened on it; dropped with the loop
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ClientPool":
+        return cls(
+            max_connections=int(os.getenv(MAX_CONNECTIONS_ENV) or DEFAULT_MAX_CONNECTIONS),
+            max_keepalive=int(os.getenv(MAX_KEEPALIVE_ENV) or DEFAULT_MAX_KEEPALIVE),
+            keepalive_expiry=float(os.getenv(KEEPALIVE_EXPIRY_ENV) or DEFAULT_KEEPALIVE_EXPIRY),
+            http2=os.getenv(HTTP2_ENV, "").lower() in ("1", "true", "yes"),
+        )
+
+    def http_client(self) -> httpx.Client:
+        """New httpx client with the pool's limits (one per API client)."""
+        return httpx.Client(limits=self.limits, http2=self.http2, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+
+    def openai(self, api_key: Optional[str], base_url: Optional[str] = None):
+        """Shared OpenAI client for (base_url, api_key)."""
+        from openai import OpenAI
+
+        key = ("openai", base_url or "", api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # OpenAI() validates the key (and falls back to $OPENAI_API_KEY) before
+                # anything is cached, so a missing key still fails here as before
+                client = OpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client())
+                self._clients[key] = client
+            return client
+
+    def async_openai(self, api_key: Optional[str], base_url: Optional[str] = None):
+        """Shared AsyncOpenAI client for (base_url, api_key) on the running event loop."""
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        key = ("async_openai", base_url or "", api_key)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.async_http_client())
+                clients[key] = client
+            return client
+
+    def qdrant(self, url: str, api_key: Optional[str] = None):
+        """Shared Qdrant client for (url, api_key)."""
+        from qdrant_client import QdrantClient
+
+        key = ("qdrant", url, api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # Extra kwargs are passed on to the REST client's httpx.Client
+                client = QdrantClient(url=url, api_key=api_key, limits=self.limits, http2=self.http2)
+                self._clients[key] = client
+            return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def close(self) -> None:
+        """Close every pooled client and forget it.
+
+        Async clients are only forgotten: closing them needs their own loop.
+        """
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            self._async_clients.clear()
+        for client in clients:
+            client.close()
+
+
+_default_pool: Optional[ClientPool] = None
+_default_lock = threading.Lock()
+
+
+def get_pool() -> ClientPool:
+    """Process-wide pool configured from the environment."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool.from_env()
+        return _default_pool
+
+
+def get_openai_client(api_key: Optional[str], base_url: Optional[str] = None):
+    return get_pool().openai(api_key, base_url)
+
+
+def get_async_openai_client(api_key: Optional[str], base_url: Optional[str] = None):
+    """Must be called from a coroutine; see ClientPool.async_openai."""
+    return get_pool().async_openai(api_key, base_url)
+
+
+def get_qdrant_client(url: str, api_key: Optional[str] = None):
+    return get_pool().qdrant(url, api_key)
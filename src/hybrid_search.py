@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Hybrid BM25 + vector retrieval for one query.
+
+The lexical (BM25/BM25F) and embedding rankings are fetched concurrently -- the
+vector side waits on the embedding API while BM25 scores run locally -- and
+fused into a single list, deduplicated by case number:
+
+    rrf       reciprocal rank fusion, sum of weight / (RRF_K + rank)
+    weighted  sum of weight * score after min-max normalising each ranking
+
+If one side fails (e.g. the vector backend is unreachable) the other side is
+still returned, with the error reported above the results.
+
+Usage:
+    uv run python src/hybrid_search.py "ring enhancing lesion" --top_k 5
+    uv run python src/hybrid_search.py "ring enhancing lesion" --fusion weighted --weights bm25=1,vector=2
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from case_exclusions import DEFAULT_EXCLUDE, parse_exclude, resolve_exclusions
+from vector_backends import BACKENDS, BACKEND_ENV, DEFAULT_COLLECTION, VectorBackend
+
+FUSIONS = ("rrf", "weighted")
+SOURCES = ("bm25", "vector")
+# Standard RRF constant; damps the advantage of the very top ranks
+RRF_K = 60
+# Candidates fetched from each side before fusion
+DEFAULT_CANDIDATES = 50
+
+# One ranking: (case number, score), best first
+Ranking = list[tuple[int, float]]
+
+
+@dataclass
+class HybridHit:
+    """A fused result and the 1-based rank it had in each source ranking."""
+    case_id: int
+    score: float
+    ranks: dict[str, int] = field(default_factory=dict)
+
+
+def rrf_fuse(rankings: dict[str, Ranking], weights: Optional[dict[str, float]] = None, k: int = RRF_K) -> list[HybridHit]:
+    """Reciprocal rank fusion of source -> ranking."""
+    hits: dict[int, HybridHit] = {}
+    for source, ranking in rankings.items():
+        weight = (weights or {}).get(source, 1.0)
+        for rank, (case_id, _) in enumerate(ranking, 1):
+            hit = hits.setdefault(case_id, HybridHit(case_id, 0.0))
+            # A case listed twice by one source counts once, at its best rank
+            if source not in hit.ranks:
+                hit.ranks[source] = rank
+                hit.score += weight / (k + rank)
+    return sorted(hits.values(), key=lambda hit: (-hit.score, min(hit.ranks.values())))
+
+
+def weighted_fuse(rankings: dict[str, Ranking], weights: Optional[dict[str, float]] = None) -> list[HybridHit]:
+    """Weighted sum of min-max normalised scores (BM25 and cosine scales differ)."""
+    hits: dict[int, HybridHit] = {}
+    for source, ranking in rankings.items():
+        if not ranking:
+            continue
+        weight = (weights or {}).get(source, 1.0)
+        scores = [score for _, score in ranking]
+        low, span = min(scores), max(scores) - min(scores)
+        for rank, (case_id, score) in enumerate(ranking, 1):
+            hit = hits.setdefault(case_id, HybridHit(case_id, 0.0))
+            if source not in hit.ranks:
+                hit.ranks[source] = rank
+                hit.score += weight * ((score - low) / span if span > 0 else 1.0)
+    return sorted(hits.values(), key=lambda hit: (-hit.score, min(hit.ranks.values())))
+
+
+def fuse(rankings: dict[str, Ranking], fusion: str = "rrf", weights: Optional[dict[str, float]] = None) -> list[HybridHit]:
+    if fusion == "rrf":
+        return rrf_fuse(rankings, weights)
+    if fusion == "weighted":
+        return weighted_fuse(rankings, weights)
+    raise ValueError(f"Unknown fusion '{fusion}'. Use one of: {', '.join(FUSIONS)}")
+
+
+def bm25_ranking(
+    engine,
+    query: str,
+    limit: int,
+    mode: str = "bm25",
+    field_weights: Optional[dict[str, float]] = None,
+    excluded: Iterable[int] = (),
+) -> Ranking:
+    results = engine.search(query, top_k=limit, mode=mode, field_weights=field_weights, exclude=list(excluded))
+    return [(case.case_number, score) for case, score in results if case.case_number is not None]
+
+
+def vector_ranking(
+    vector_clients: Callable[[], tuple[VectorBackend, Any]],
+    query: str,
+    limit: int,
+    model: str,
+    excluded: Iterable[int] = (),
+) -> Ranking:
+    from qdrant_vector_embedding import embed_texts
+
+    backend, openrouter = vector_clients()
+    query_vector = embed_texts([query], model=model, client=openrouter)[0]
+    return [(int(hit.id), hit.score) for hit in backend.query(query_vector, limit=limit, exclude_ids=excluded)]
+
+
+@dataclass
+class HybridResult:
+    hits: list[HybridHit]
+    # source -> error message for a side that failed
+    errors: dict[str, str] = field(default_factory=dict)
+    # source -> seconds spent, plus "total"
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _timed(fn, *args, **kwargs) -> tuple[Any, float]:
+    start = time.perf_counter()
+    return fn(*args, **kwargs), time.perf_counter() - start
+
+
+def hybrid_search(
+    query: str,
+    engine,
+    vector_clients: Callable[[], tuple[VectorBackend, Any]],
+    top_k: int = 5,
+    candidate_limit: int = DEFAULT_CANDIDATES,
+    fusion: str = "rrf",
+    weights: Optional[dict[str, float]] = None,
+    bm25_mode: str = "bm25",
+    field_weights: Optional[dict[str, float]] = None,
+    model: Optional[str] = None,
+    excluded: Iterable[int] = (),
+) -> HybridResult:
+    """Fused top_k over BM25 and vector rankings of candidate_limit cases each.
+
+    vector_clients returns (vector backend, openrouter client); it is called on
+    the worker thread, so a backend that cannot be opened only loses the vector
+    side, like any other vector error.
+    """
+    from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL
+
+    excluded = set(excluded)
+    limit = max(top_k, candidate_limit)
+    start = time.perf_counter()
+    rankings: dict[str, Ranking] = {}
+    result = HybridResult(hits=[])
+
+    # The vector side is mostly network wait, so it runs beside the local BM25 scoring
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="hybrid-vector") as pool:
+        vector_future = pool.submit(
+            _timed, vector_ranking, vector_clients, query, limit, model or DEFAULT_EMBEDDING_MODEL, excluded,
+        )
+        try:
+            rankings["bm25"], result.timings["bm25"] = _timed(
+                bm25_ranking, engine, query, limit, bm25_mode, field_weights, excluded,
+            )
+        except Exception as exc:  # noqa: BLE001
+            result.errors["bm25"] = f"{type(exc).__name__}: {exc}"
+        try:
+            rankings["vector"], result.timings["vector"] = vector_future.result()
+        except Exception as exc:  # noqa: BLE001
+            result.errors["vector"] = f"{type(exc).__name__}: {exc}"
+
+    if not rankings:
+        raise RuntimeError("; ".join(f"{source} search failed: {error}" for source, error in result.errors.items()))
+    result.hits = fuse(rankings, fusion, weights)[:top_k]
+    result.timings["total"] = time.perf_counter() - start
+    return result
+
+
+def parse_source_weights(value: str) -> dict[str, float]:
+    """Parse "bm25=1,vector=2" into fusion weights (unlisted sources weigh 1)."""
+    weights = {source: 1.0 for source in SOURCES}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, sep, weight = item.partition("=")
+        name = name.strip()
+        if not sep or name not in SOURCES:
+            raise argparse.ArgumentTypeError(f"invalid source weight '{item}' (sources: {', '.join(SOURCES)})")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight in '{item}'")
+    return weights
+
+
+def format_results(query: str, result: HybridResult, store, fusion: str = "rrf") -> tuple[int, str]:
+    """CLI output for a hybrid query as (exit code, text); cases come from store."""
+    lines = [f"\nSearching for: '{query}' (hybrid: bm25 + vector, {fusion})", "-" * 40]
+    for source, error in result.errors.items():
+        lines.append(f"Warning: {source} search failed ({error}); showing the other ranking only.")
+    shown = [(hit, store.get(hit.case_id)) for hit in result.hits]
+    shown = [(hit, case) for hit, case in shown if case is not None]
+    if not shown:
+        lines.append("No results found.")
+        return 1, "\n".join(lines)
+    lines.append(f"\nTop {len(shown)} results:\n")
+    for rank, (hit, case) in enumerate(shown, 1):
+        found_by = ", ".join(f"{source} #{hit.ranks[source]}" for source in SOURCES if source in hit.ranks)
+        lines.append(f"{'=' * 80}")
+        lines.append(f"RANK {rank} | HYBRID SCORE: {hit.score:.4f} ({found_by})")
+        lines.append(case.display())
+    return 0, "\n".join(lines)
+
+
+def main() -> int:
+    from case_store import CaseStore
+    from med_search import SEARCH_MODES, MedSearchEngine, case_number_query, format_lookup
+    from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL, get_openrouter_client
+    from vector_backends import open_backend
+
+    parser = argparse.ArgumentParser(
+        description="Hybrid BM25 + vector medical case search",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("query", help="Search query text or case number")
+    parser.add_argument("--top_k", "-k", type=int, default=5, help="Number of results")
+    parser.add_argument("--candidate-limit", type=int, default=DEFAULT_CANDIDATES, help="Candidates fetched from each side")
+    parser.add_argument("--fusion", choices=FUSIONS, default="rrf", help="Rank fusion method (default: rrf)")
+    parser.add_argument("--weights", type=parse_source_weights, default=None, help="Source weights, e.g. \"bm25=1,vector=2\"")
+    parser.add_argument("--bm25-mode", choices=SEARCH_MODES, default="bm25", help="Lexical ranking: bm25 or bm25f")
+    parser.add_argument("--csv", type=str, default=str(SRC_DIR.parent / "deepsearch_complete.csv"), help="Corpus CSV")
+    parser.add_argument("--collection", type=str, default=DEFAULT_COLLECTION, help="Qdrant collection")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help=f"Vector backend (default: ${BACKEND_ENV} or qdrant)")
+    parser.add_argument("--local-index", type=Path, default=None, help="Local index dir (default: data/vector_index/<collection>)")
+    parser.add_argument("--model", type=str, default=DEFAULT_EMBEDDING_MODEL, help="Embedding model")
+    parser.add_argument(
+        "--exclude",
+        type=parse_exclude,
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma-separated case numbers or named lists to hide (benchmark_50, target, none; default: benchmark_50)",
+    )
+    parser.add_argument("--target-case", type=int, default=None, help="Case excluded by --exclude target")
+    args = parser.parse_args()
+    excluded = resolve_exclusions(args.exclude, args.target_case)
+
+    case_number = case_number_query(args.query)
+    if case_number is not None:
+        # Lookup-only fast path: the case store alone, no BM25
+        case = None if case_number in excluded else CaseStore.open(args.csv).get(case_number)
+        code, output = format_lookup(args.query, case_number, case)
+        print(output)
+        return code
+
+    engine = MedSearchEngine(args.csv)
+    try:
+        result = hybrid_search(
+            args.query,
+            engine,
+            lambda: (open_backend(args.backend, args.collection, args.local_index), get_openrouter_client()),
+            top_k=args.top_k,
+            candidate_limit=args.candidate_limit,
+            fusion=args.fusion,
+            weights=args.weights,
+            bm25_mode=args.bm25_mode,
+            model=args.model,
+            excluded=excluded,
+        )
+    except Exception as exc:  # noqa: BLE001
+        print(f"\nSearching for: '{args.query}'")
+        print("-" * 40)
+        print(f"Error running hybrid search: {exc}", file=sys.stderr)
+        return 1
+
+    code, output = format_results(args.query, result, engine.store, args.fusion)
+    print(output)
+    timings = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in result.timings.items())
+    print(f"\n[{timings}]", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
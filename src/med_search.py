@@ -4,105 +4,57 @@ Medical Case BM25 Search Engine
 
 Supports two search modes:
 1. Text query mode: Uses BM25 to rank cases based on clinical_history, imaging_findings, and discussion
+   (--mode bm25f ranks with per-field weights and length normalisation instead)
 2. Case number mode: Direct lookup by case number (e.g., "1000" matches "Case number 1000")
+
+Case records live in a keyed case store (see case_store.py); case-number
+queries from the CLI are answered from it alone and never build BM25.
+The tokenized corpus and BM25 statistics are cached as a snapshot under
+data/bm25_index/<csv name>/ and memory-mapped on later runs. Both are rebuilt
+only when their source CSVs change.
 """
 
 import argparse
-import csv
+import json
+import os
 import re
 import sys
-from dataclasses import dataclass, field
+from collections.abc import Mapping, Sequence
 from pathlib import Path
 from typing import Optional
 
-from rank_bm25 import BM25Okapi
-
-
-@dataclass
-class MedCase:
-    """Represents a medical case from the dataset."""
-    case_title: str
-    case_date: str
-    link: str
-    clinical_history: str
-    imaging_findings: str
-    discussion: str
-    differential_diagnosis: str
-    final_diagnosis: str
-    images: str
-    relate_case: str
-    categories: str
-    image_captions: list = field(default_factory=list)
-
-    @property
-    def case_number(self) -> Optional[int]:
-        """Extract case number from title."""
-        match = re.search(r'Case number (\d+)', self.case_title)
-        if match:
-            return int(match.group(1))
-        return None
-
-    @property
-    def searchable_text(self) -> str:
-        """Combined text for BM25 indexing."""
-        return f"{self.clinical_history} {self.imaging_findings} {self.discussion} {self.differential_diagnosis} {self.final_diagnosis}"
-
-    @property
-    def related_cases_top5(self) -> str:
-        """Get top 5 related cases."""
-        if not self.relate_case:
-            return 'N/A'
-        cases = self.relate_case.split(';')[:20]
-        return ';'.join(cases)
-
-    @property
-    def images_display(self) -> str:
-        """Format image info with captions."""
-        count = self.images or '0'
-        if not self.image_captions:
-            return f"{count} image(s)"
-        lines = [f"{count} image(s):"]
-        for i, cap in enumerate(self.image_captions, 1):
-            lines.append(f"  {i}. {cap}")
-        return "\n".join(lines)
-
-    def display(self) -> str:
-        """Format case for display."""
-        separator = "=" * 20
-        return f"""
-{separator}
-CASE: {self.case_title}
-Date: {self.case_date}
-Link: {self.link}
-Categories: {self.categories}
-
---- CLINICAL HISTORY ---
-{self.clinical_history or 'N/A'}
-
---- IMAGING FINDINGS ---
-{self.imaging_findings or 'N/A'}
-
---- DIFFERENTIAL DIAGNOSIS ---
-{self.differential_diagnosis or 'N/A'}
-
---- FINAL DIAGNOSIS ---
-{self.final_diagnosis or 'N/A'}
-
---- RELATED CASES ---
-{self.related_cases_top5}
-{separator}
-"""
+import numpy as np
+
+from bm25_index import FORMAT_VERSION, BM25FIndex, BM25Index, dir_lock, read_manifest, replace_dir
+from case_exclusions import DEFAULT_EXCLUDE, ExcludeSpec, parse_exclude, resolve_exclusions
+from case_store import CaseStore, MedCase, source_fingerprint, source_unchanged
+
+# Bump when tokenization or the BM25 snapshot layout change
+SNAPSHOT_VERSION = 3
 
-## should add back later
-# --- DISCUSSION ---
-# {self.discussion or 'N/A'}
+SEARCH_MODES = ("bm25", "bm25f")
 
-# --- IMAGES ---
-# {self.images_display}
+# BM25F field weights: diagnosis and imaging terms matter more than a mention
+# somewhere in the long discussion section.
+DEFAULT_FIELD_WEIGHTS = {
+    "clinical_history": 1.0,
+    "imaging_findings": 1.5,
+    "discussion": 0.5,
+    "differential_diagnosis": 1.0,
+    "final_diagnosis": 2.0,
+}
 
-# --- RELATED CASES ---
-# {self.related_cases_top5}
-# {separator}
+
+def case_number_query(query: str) -> Optional[int]:
+    """Case number if the query is a case number lookup, else None."""
+    query = query.strip()
+    # Match pure numbers or "case 1000" or "case number 1000"
+    if query.isdigit():
+        return int(query)
+    match = re.match(r'^case\s*(?:number\s*)?(\d+)$', query, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    return None
 
 
 
@@ -110,68 +62,112 @@ class MedSearchEngine:
     """BM25-based medical case search engine."""
 
     # Default image CSV path (relative to this file's parent's parent)
-    DEFAULT_IMAGE_CSV = Path(__file__).parent.parent / "deepresearch图片链接.csv"
-
-    def __init__(self, csv_path: str, image_csv_path: Optional[str] = None):
-        self.cases: list[MedCase] = []
-        self.case_number_index: dict[int, MedCase] = {}
-        self.bm25: Optional[BM25Okapi] = None
-        self._caption_index: dict[str, list[str]] = {}
-        self._load_captions(image_csv_path or str(self.DEFAULT_IMAGE_CSV))
-        self._load_data(csv_path)
-        self._build_index()
-
-    def _load_captions(self, image_csv_path: str) -> None:
-        """Load image captions from the image CSV into a case_id -> captions index."""
-        path = Path(image_csv_path)
-        if not path.exists():
-            print(f"Warning: Image CSV not found at {path}. Captions unavailable.")
+    DEFAULT_IMAGE_CSV = CaseStore.DEFAULT_IMAGE_CSV
+    # Default snapshot root; each corpus CSV gets its own sub-directory
+    DEFAULT_INDEX_ROOT = Path(__file__).parent.parent / "data" / "bm25_index"
+
+    def __init__(
+        self,
+        csv_path: str,
+        image_csv_path: Optional[str] = None,
+        index_dir: Optional[str] = None,
+        use_snapshot: bool = True,
+        store_dir: Optional[str] = None,
+    ):
+        self.csv_path = Path(csv_path)
+        self.image_csv_path = Path(image_csv_path or self.DEFAULT_IMAGE_CSV)
+        self.index_dir = Path(index_dir) if index_dir else self.DEFAULT_INDEX_ROOT / self.csv_path.stem
+        self.store_dir = Path(store_dir) if store_dir else CaseStore.default_dir(self.csv_path)
+        self.bm25: Optional[BM25Index] = None
+        self.bm25f: Optional[BM25FIndex] = None
+
+        if not use_snapshot:
+            self._set_store(CaseStore.from_csv(self.csv_path, self.image_csv_path))
+            self._build_index()
             return
 
-        with open(path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                plink = row.get("plink", "")
-                match = re.search(r'/case/(\d+)', plink)
-                if not match:
-                    continue
-                case_id = match.group(1)
-                caption = row.get("img_alt", "").strip()
-                if caption:
-                    self._caption_index.setdefault(case_id, []).append(caption)
-
-    def _load_data(self, csv_path: str) -> None:
-        """Load cases from CSV file."""
-        print(f"Loading data from {csv_path}...")
-        with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                case = MedCase(
-                    case_title=row.get('case_title', ''),
-                    case_date=row.get('case_date', ''),
-                    link=row.get('link', ''),
-                    clinical_history=row.get('clinical_history', ''),
-                    imaging_findings=row.get('imaging_findings', ''),
-                    discussion=row.get('discussion', ''),
-                    differential_diagnosis=row.get('differential_diagnosis', ''),
-                    final_diagnosis=row.get('final_diagnosis', ''),
-                    images=row.get('images', ''),
-                    relate_case=row.get('relate_case', ''),
-                    categories=row.get('Categories', ''),
-                )
-                # Attach image captions from the image CSV
-                link = row.get('link', '')
-                link_match = re.search(r'/case/(\d+)', link)
-                if link_match:
-                    case.image_captions = self._caption_index.get(link_match.group(1), [])
-
-                self.cases.append(case)
-
-                # Index by case number
-                if case.case_number is not None:
-                    self.case_number_index[case.case_number] = case
-
-        print(f"Loaded {len(self.cases)} cases.")
+        self._set_store(CaseStore.open(self.csv_path, self.image_csv_path, self.store_dir))
+        if not self._load_snapshot():
+            with dir_lock(self.index_dir):
+                # Another process may have rebuilt it while we waited
+                if not self._load_snapshot():
+                    self._build_index()
+                    self._save_snapshot()
+
+    @classmethod
+    def build_snapshot(
+        cls,
+        csv_path: str,
+        image_csv_path: Optional[str] = None,
+        index_dir: Optional[str] = None,
+        store_dir: Optional[str] = None,
+    ) -> "MedSearchEngine":
+        """Rebuild the on-disk case store and BM25 snapshot from the CSV unconditionally."""
+        engine = cls(
+            csv_path, image_csv_path=image_csv_path, index_dir=index_dir, use_snapshot=False, store_dir=store_dir,
+        )
+        with dir_lock(engine.store_dir):
+            engine.store.save(engine.store_dir, engine.csv_path, engine.image_csv_path)
+        with dir_lock(engine.index_dir):
+            engine._save_snapshot()
+        return engine
+
+    def _set_store(self, store: CaseStore) -> None:
+        self.store = store
+        self.cases: Sequence[MedCase] = store.cases
+        self.case_number_index: Mapping[int, MedCase] = store.by_number
+        # case_number -> row in self.cases, used to build exclusion masks
+        self.case_rows: Mapping[int, int] = store.case_rows
+
+    def _load_snapshot(self) -> bool:
+        """Memory-map the BM25 snapshot if it matches the current corpus CSV."""
+        manifest = read_manifest(self.index_dir)
+        if not manifest or manifest.get("snapshot_version") != SNAPSHOT_VERSION:
+            return False
+        if manifest.get("format_version") != FORMAT_VERSION:
+            return False
+        sources = manifest.get("sources", {})
+        recorded = json.dumps(sources, sort_keys=True)
+        if not source_unchanged(self.csv_path, sources.get("csv")):
+            return False
+
+        try:
+            self.bm25 = BM25Index.load(self.index_dir)
+            self.bm25f = BM25FIndex.load(self.index_dir, self.bm25)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: BM25 snapshot at {self.index_dir} unreadable ({e}); rebuilding.")
+            return False
+        if self.bm25.corpus_size != len(self.cases):
+            return False
+
+        # Persist refreshed mtimes so touched-but-unchanged files skip hashing next time
+        if json.dumps(sources, sort_keys=True) != recorded:
+            self._write_manifest(manifest)
+        print(f"Loaded BM25 snapshot {self.index_dir} ({len(self.cases)} cases).")
+        return True
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Rewrite the manifest in place (best effort)."""
+        try:
+            tmp = self.index_dir / "manifest.json.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, self.index_dir / "manifest.json")
+        except OSError:
+            pass
+
+    def _save_snapshot(self) -> None:
+        """Write BM25 and BM25F arrays to a fresh snapshot directory."""
+        tmp_dir = self.index_dir.parent / f"{self.index_dir.name}.tmp-{os.getpid()}"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        self.bm25f.save(tmp_dir)
+        self.bm25.save(tmp_dir, metadata={
+            "snapshot_version": SNAPSHOT_VERSION,
+            "sources": {"csv": source_fingerprint(self.csv_path)},
+        })
+        replace_dir(tmp_dir, self.index_dir)
+        print(f"Saved BM25 snapshot to {self.index_dir}")
 
     def _tokenize(self, text: str) -> list[str]:
         """Simple tokenization: lowercase, split on non-alphanumeric."""
@@ -180,35 +176,83 @@ class MedSearchEngine:
         return tokens
 
     def _build_index(self) -> None:
-        """Build BM25 index from cases."""
+        """Build BM25 and BM25F indexes from cases."""
         print("Building BM25 index...")
-        tokenized_corpus = [self._tokenize(case.searchable_text) for case in self.cases]
-        self.bm25 = BM25Okapi(tokenized_corpus)
+        # searchable_text joins the fields with spaces, so concatenated field
+        # tokens are exactly the tokens of searchable_text
+        tokenized_fields = [
+            [self._tokenize(getattr(case, name)) for name in MedCase.SEARCH_FIELDS]
+            for case in self.cases
+        ]
+        tokenized_corpus = [[tok for tokens in fields for tok in tokens] for fields in tokenized_fields]
+        self.bm25 = BM25Index.from_tokenized(tokenized_corpus)
+        self.bm25f = BM25FIndex.from_tokenized_fields(self.bm25, MedCase.SEARCH_FIELDS, tokenized_fields)
         print("Index built successfully.")
 
     def _is_case_number_query(self, query: str) -> Optional[int]:
         """Check if query is a case number lookup."""
-        query = query.strip()
-        # Match pure numbers or "case 1000" or "case number 1000"
-        if query.isdigit():
-            return int(query)
-        match = re.match(r'^case\s*(?:number\s*)?(\d+)$', query, re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-        return None
-
-    def search(self, query: str, top_k: int = 5) -> list[tuple[MedCase, float]]:
+        return case_number_query(query)
+
+    def exclusion_mask(
+        self,
+        exclude: Optional[ExcludeSpec],
+        target_case: Optional[int] = None,
+    ) -> Optional[np.ndarray]:
+        """Boolean mask over self.cases (True = excluded), or None if nothing is excluded.
+
+        exclude mixes case numbers and named lists (see case_exclusions);
+        "target" stands for target_case.
+        """
+        numbers = resolve_exclusions(exclude, target_case)
+        rows = [self.case_rows[n] for n in numbers if n in self.case_rows]
+        if not rows:
+            return None
+        mask = np.zeros(len(self.cases), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def _rank(
+        self,
+        tokens: list[str],
+        top_k: int,
+        mode: str,
+        field_weights: Optional[dict[str, float]],
+        exclude: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Top-k (doc_ids, scores) for a tokenized query under the given ranking mode."""
+        if mode == "bm25f":
+            weights = field_weights if field_weights is not None else DEFAULT_FIELD_WEIGHTS
+            return self.bm25f.top_k(tokens, top_k, weights=weights, exclude=exclude)
+        if mode != "bm25":
+            raise ValueError(f"Unknown search mode '{mode}'. Available: {SEARCH_MODES}")
+        # Only documents sharing a query term are scored; top-k via argpartition
+        return self.bm25.top_k(tokens, top_k, exclude=exclude)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: str = "bm25",
+        field_weights: Optional[dict[str, float]] = None,
+        exclude: Optional[ExcludeSpec] = None,
+        target_case: Optional[int] = None,
+    ) -> list[tuple[MedCase, float]]:
         """
         Search for cases matching the query.
 
         Returns list of (case, score) tuples.
         For case number queries, score is 1.0 for exact match.
-        For text queries, score is BM25 score.
+        For text queries, score is BM25 score, or BM25F score with mode="bm25f"
+        (field_weights overrides DEFAULT_FIELD_WEIGHTS).
+        Cases named by exclude (case numbers, "benchmark_50", "target" = target_case)
+        are skipped during top-k selection and are not found by number either.
         """
+        excluded = resolve_exclusions(exclude, target_case)
+
         # Check if it's a case number query
         case_number = self._is_case_number_query(query)
         if case_number is not None:
-            if case_number in self.case_number_index:
+            if case_number in self.case_number_index and case_number not in excluded:
                 return [(self.case_number_index[case_number], 1.0)]
             else:
                 return []  # Return empty list, caller handles the message
@@ -219,20 +263,109 @@ class MedSearchEngine:
             print("Empty query after tokenization.")
             return []
 
-        scores = self.bm25.get_scores(tokenized_query)
+        mask = self.exclusion_mask(excluded)
+        doc_ids, scores = self._rank(tokenized_query, top_k, mode, field_weights, mask)
+        return [(self.cases[int(idx)], float(score)) for idx, score in zip(doc_ids, scores)]
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        mode: str = "bm25",
+        field_weights: Optional[dict[str, float]] = None,
+        exclude: Optional[ExcludeSpec] = None,
+        target_cases: Optional[Sequence[Optional[int]]] = None,
+    ) -> list[list[tuple[MedCase, float]]]:
+        """
+        Search for many queries at once; results[i] equals
+        search(queries[i], top_k, exclude=exclude, target_case=target_cases[i]).
 
-        # Get top k results
-        indexed_scores = list(enumerate(scores))
-        indexed_scores.sort(key=lambda x: x[1], reverse=True)
+        In bm25 mode, text queries are scored together in one sparse-matrix pass
+        over the index instead of one Python scoring loop per query.
+        """
+        results: list[list[tuple[MedCase, float]]] = [[] for _ in queries]
+        text_slots: list[int] = []
+        text_tokens: list[list[str]] = []
+        targets = list(target_cases) if target_cases is not None else [None] * len(queries)
+        excluded = [resolve_exclusions(exclude, target) for target in targets]
+
+        for i, query in enumerate(queries):
+            case_number = self._is_case_number_query(query)
+            if case_number is not None:
+                if case_number in self.case_number_index and case_number not in excluded[i]:
+                    results[i] = [(self.case_number_index[case_number], 1.0)]
+                continue
+            tokens = self._tokenize(query)
+            if tokens:
+                text_slots.append(i)
+                text_tokens.append(tokens)
+
+        if len({excluded[i] for i in text_slots}) <= 1:
+            # Same exclusions for every query: one shared mask
+            masks = self.exclusion_mask(excluded[text_slots[0]]) if text_slots else None
+        else:
+            masks = np.zeros((len(text_slots), len(self.cases)), dtype=bool)
+            for row, slot in enumerate(text_slots):
+                masks[row, [self.case_rows[n] for n in excluded[slot] if n in self.case_rows]] = True
 
-        results = []
-        for idx, score in indexed_scores[:top_k]:
-            if score > 0:
-                results.append((self.cases[idx], score))
+        if mode == "bm25":
+            ranked = self.bm25.top_k_many(text_tokens, top_k, exclude=masks)
+        else:
+            ranked = []
+            for row, tokens in enumerate(text_tokens):
+                row_mask = masks[row] if masks is not None and masks.ndim == 2 else masks
+                ranked.append(self._rank(tokens, top_k, mode, field_weights, row_mask))
+        for slot, (doc_ids, scores) in zip(text_slots, ranked):
+            results[slot] = [(self.cases[int(idx)], float(score)) for idx, score in zip(doc_ids, scores)]
 
         return results
 
 
+def parse_field_weights(value: str) -> dict[str, float]:
+    """Parse "field=weight,field=weight" into a BM25F weight dict.
+
+    Fields not listed keep their DEFAULT_FIELD_WEIGHTS value.
+    """
+    weights = dict(DEFAULT_FIELD_WEIGHTS)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, sep, weight = item.partition("=")
+        name = name.strip()
+        if not sep or name not in MedCase.SEARCH_FIELDS:
+            raise argparse.ArgumentTypeError(
+                f"invalid field weight '{item}' (fields: {', '.join(MedCase.SEARCH_FIELDS)})"
+            )
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight in '{item}'")
+    return weights
+
+
+def format_lookup(query: str, case_number: int, case: Optional[MedCase]) -> tuple[int, str]:
+    """CLI output for a case-number lookup as (exit code, text)."""
+    lines = [f"\nSearching for: '{query}'", "-" * 40]
+    if case is None:
+        lines.append(f"Error: Case number {case_number} does not exist in the database.")
+        return 1, "\n".join(lines)
+    lines += ["\nFound exact match for case number:", case.display()]
+    return 0, "\n".join(lines)
+
+
+def format_results(query: str, results: list[tuple[MedCase, float]]) -> tuple[int, str]:
+    """CLI output for a text query as (exit code, text)."""
+    lines = [f"\nSearching for: '{query}'", "-" * 40]
+    if not results:
+        lines.append("No results found.")
+        return 1, "\n".join(lines)
+    # Text query mode: show top k results with scores
+    lines.append(f"\nTop {len(results)} results:\n")
+    for rank, (case, score) in enumerate(results, 1):
+        lines.append(f"{'='*80}")
+        lines.append(f"RANK {rank} | SCORE: {score:.4f}")
+        lines.append(case.display())
+    return 0, "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Medical Case BM25 Search Engine",
@@ -249,9 +382,20 @@ Examples:
   python med_search.py "1000"
   python med_search.py "case 1000"
   python med_search.py "case number 1000"
+
+  # Field-weighted BM25F ranking, optionally with custom field weights
+  python med_search.py "ring enhancing lesion" --mode bm25f
+  python med_search.py "ring enhancing lesion" --mode bm25f --field-weights "imaging_findings=3,discussion=0.2"
+
+  # Exclusions (default: benchmark_50); "none" searches the whole corpus
+  python med_search.py "ring enhancing lesion" --exclude none
+  python med_search.py "ring enhancing lesion" --exclude benchmark_50,target --target-case 19172
+
+  # Rebuild the on-disk index snapshot (normally rebuilt automatically on CSV change)
+  python med_search.py --build-index
         """
     )
-    parser.add_argument("query", help="Search query (text or case number)")
+    parser.add_argument("query", nargs="?", help="Search query (text or case number)")
     parser.add_argument(
         "--top_k", "-k",
         type=int,
@@ -261,8 +405,21 @@ Examples:
     parser.add_argument(
         "--csv",
         type=str,
-        default=str(Path(__file__).parent.parent / "deepsearch_filtered.csv"), #deepsearch_complete.csv, deepsearch_filtered.csv
-        help="Path to the CSV data file (default: filtered version excluding selected 50 cases)"
+        default=str(Path(__file__).parent.parent / "deepsearch_complete.csv"),
+        help="Path to the CSV data file (default: deepsearch_complete.csv)"
+    )
+    parser.add_argument(
+        "--exclude",
+        type=parse_exclude,
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma-separated case numbers or named lists to hide from results: "
+             "benchmark_50, target (needs --target-case), or none (default: benchmark_50)"
+    )
+    parser.add_argument(
+        "--target-case",
+        type=int,
+        default=None,
+        help="Case being diagnosed; excluded when --exclude contains 'target'"
     )
     parser.add_argument(
         "--image-csv",
@@ -270,43 +427,86 @@ Examples:
         default=None,
         help="Path to image CSV with captions (default: deepresearch图片链接.csv)"
     )
+    parser.add_argument(
+        "--mode",
+        choices=SEARCH_MODES,
+        default="bm25",
+        help="Ranking for text queries: bm25 (default) or field-weighted bm25f"
+    )
+    parser.add_argument(
+        "--field-weights",
+        type=parse_field_weights,
+        default=None,
+        help="BM25F field weights as name=weight pairs, e.g. \"final_diagnosis=3,discussion=0.5\""
+    )
+    parser.add_argument(
+        "--index-dir",
+        type=str,
+        default=None,
+        help="Snapshot directory (default: data/bm25_index/<csv name>)"
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=str,
+        default=None,
+        help="Case store directory (default: data/case_store/<csv name>)"
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="Rebuild the case store and index snapshot from the CSV and exit"
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Build the index in memory without reading or writing a snapshot"
+    )
 
     args = parser.parse_args()
 
+    if args.build_index:
+        MedSearchEngine.build_snapshot(
+            args.csv, image_csv_path=args.image_csv, index_dir=args.index_dir, store_dir=args.store_dir,
+        )
+        return
+    if args.query is None:
+        parser.error("query is required unless --build-index is given")
+
+    queried_case_number = case_number_query(args.query)
+    if queried_case_number is not None:
+        # Lookup-only fast path: the case store alone, no BM25
+        if args.no_snapshot:
+            store = CaseStore.from_csv(args.csv, args.image_csv)
+        else:
+            store = CaseStore.open(args.csv, args.image_csv, args.store_dir)
+        case = store.get(queried_case_number)
+        if queried_case_number in resolve_exclusions(args.exclude, args.target_case):
+            case = None
+        code, output = format_lookup(args.query, queried_case_number, case)
+        print(output)
+        sys.exit(code)
+
     # Initialize search engine
-    engine = MedSearchEngine(args.csv, image_csv_path=args.image_csv)
+    engine = MedSearchEngine(
+        args.csv,
+        image_csv_path=args.image_csv,
+        index_dir=args.index_dir,
+        use_snapshot=not args.no_snapshot,
+        store_dir=args.store_dir,
+    )
 
     # Perform search
-    print(f"\nSearching for: '{args.query}'")
-    print("-" * 40)
-
-    results = engine.search(args.query, top_k=args.top_k)
-
-    # Check if it's a case number query
-    queried_case_number = engine._is_case_number_query(args.query)
-
-    if not results:
-        if queried_case_number is not None:
-            print(f"Error: Case number {queried_case_number} does not exist in the database.")
-        else:
-            print("No results found.")
-        sys.exit(1)
-
-    # Check if it's a case number search (single result with score 1.0)
-    is_case_number_search = len(results) == 1 and results[0][1] == 1.0 and queried_case_number is not None
-
-    if is_case_number_search:
-        # Case number mode: show everything
-        case, _ = results[0]
-        print(f"\nFound exact match for case number:")
-        print(case.display())
-    else:
-        # Text query mode: show top k results with scores
-        print(f"\nTop {len(results)} results:\n")
-        for rank, (case, score) in enumerate(results, 1):
-            print(f"{'='*80}")
-            print(f"RANK {rank} | SCORE: {score:.4f}")
-            print(case.display())
+    results = engine.search(
+        args.query,
+        top_k=args.top_k,
+        mode=args.mode,
+        field_weights=args.field_weights,
+        exclude=args.exclude,
+        target_case=args.target_case,
+    )
+    code, output = format_results(args.query, results)
+    print(output)
+    sys.exit(code)
 
 
 if __name__ == "__main__":
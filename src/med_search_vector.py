@@ -9,7 +9,7 @@ import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 if str(REPO_ROOT) not in sys.path:
@@ -19,8 +19,9 @@ from qdrant_vector_embedding import (
     DEFAULT_EMBEDDING_MODEL,
     embed_texts,
     get_openrouter_client,
-    get_qdrant_client,
 )
+from case_exclusions import DEFAULT_EXCLUDE, parse_exclude, resolve_exclusions
+from vector_backends import BACKENDS, BACKEND_ENV, DEFAULT_COLLECTION, VectorBackend, open_backend
 
 
 @dataclass
@@ -122,31 +123,45 @@ def vector_search(
     candidate_limit: int,
     collection: str,
     model: str,
+    excluded: Iterable[int] = (),
+    backend: Optional[VectorBackend] = None,
+    openrouter: Any = None,
 ) -> list[tuple[MedCaseView, float]]:
-    qdrant = get_qdrant_client()
-    openrouter = get_openrouter_client()
+    # Long-lived callers (search_daemon) pass their own backend and client
+    backend = backend or open_backend(collection=collection)
+    openrouter = openrouter or get_openrouter_client()
 
     query_vector = embed_texts([query], model=model, client=openrouter)[0]
-    response = qdrant.query_points(
-        collection_name=collection,
-        query=query_vector,
-        limit=max(top_k, candidate_limit),
-        with_payload=True,
-    )
+    hits = backend.query(query_vector, limit=max(top_k, candidate_limit), exclude_ids=excluded)
+    return [(payload_to_view(hit.payload), hit.score) for hit in hits[:top_k]]
+
 
-    results: list[tuple[MedCaseView, float]] = []
-    for point in response.points:
-        payload = point.payload or {}
-        score = float(point.score) if point.score is not None else 0.0
-        results.append((payload_to_view(payload), score))
-        if len(results) >= top_k:
-            break
+def format_lookup(query: str, case_number: int, case: Optional[MedCaseView]) -> tuple[int, str]:
+    """CLI output for a case-number lookup as (exit code, text)."""
+    lines = [f"\nSearching for: '{query}'", "-" * 40]
+    if case is None:
+        lines.append(f"Error: Case number {case_number} does not exist in the database.")
+        return 1, "\n".join(lines)
+    lines += ["\nFound exact match for case number:", case.display()]
+    return 0, "\n".join(lines)
 
-    return results
+
+def format_results(query: str, results: list[tuple[MedCaseView, float]]) -> tuple[int, str]:
+    """CLI output for a vector query as (exit code, text)."""
+    lines = [f"\nSearching for: '{query}'", "-" * 40]
+    if not results:
+        lines.append("No results found.")
+        return 1, "\n".join(lines)
+    lines.append(f"\nTop {len(results)} results:\n")
+    for rank, (case, score) in enumerate(results, 1):
+        lines.append(f"{'=' * 80}")
+        lines.append(f"RANK {rank} | VECTOR SCORE: {score:.4f}")
+        lines.append(case.display())
+    return 0, "\n".join(lines)
 
 
 def main() -> int:
-    default_csv = Path(__file__).parent.parent / "deepsearch_filtered.csv"
+    default_csv = Path(__file__).parent.parent / "deepsearch_complete.csv"
 
     parser = argparse.ArgumentParser(
         description="Medical case vector search",
@@ -155,24 +170,33 @@ def main() -> int:
     parser.add_argument("query", help="Search query text or case number")
     parser.add_argument("--top_k", "-k", type=int, default=5, help="Number of results")
     parser.add_argument("--candidate-limit", type=int, default=20, help="Vector candidates to fetch")
-    parser.add_argument("--collection", type=str, default="med_deepresearch_qwen3_8b", help="Qdrant collection")
+    parser.add_argument("--collection", type=str, default=DEFAULT_COLLECTION, help="Qdrant collection")
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help=f"Vector backend (default: ${BACKEND_ENV} or qdrant)",
+    )
+    parser.add_argument("--local-index", type=Path, default=None, help="Local index dir (default: data/vector_index/<collection>)")
     parser.add_argument("--model", type=str, default=DEFAULT_EMBEDDING_MODEL, help="Embedding model")
     parser.add_argument("--csv", type=Path, default=default_csv, help="CSV path for case-id navigation")
+    parser.add_argument(
+        "--exclude",
+        type=parse_exclude,
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma-separated case numbers or named lists to hide (benchmark_50, target, none; default: benchmark_50)",
+    )
+    parser.add_argument("--target-case", type=int, default=None, help="Case excluded by --exclude target")
     args = parser.parse_args()
-
-    print(f"\nSearching for: '{args.query}'")
-    print("-" * 40)
+    excluded = resolve_exclusions(args.exclude, args.target_case)
 
     case_id_query = extract_case_id(args.query)
     if case_id_query is not None:
         case_index = load_case_index(args.csv)
-        if case_id_query not in case_index:
-            print(f"Error: Case number {case_id_query} does not exist in the database.")
-            return 1
-        case = row_to_view(case_index[case_id_query])
-        print("\nFound exact match for case number:")
-        print(case.display())
-        return 0
+        row = case_index.get(case_id_query) if case_id_query not in excluded else None
+        code, output = format_lookup(args.query, case_id_query, row_to_view(row) if row else None)
+        print(output)
+        return code
 
     try:
         results = vector_search(
@@ -181,22 +205,18 @@ def main() -> int:
             candidate_limit=args.candidate_limit,
             collection=args.collection,
             model=args.model,
+            excluded=excluded,
+            backend=open_backend(args.backend, args.collection, args.local_index),
         )
     except Exception as exc:  # noqa: BLE001
+        print(f"\nSearching for: '{args.query}'")
+        print("-" * 40)
         print(f"Error running vector search: {exc}", file=sys.stderr)
         return 1
 
-    if not results:
-        print("No results found.")
-        return 1
-
-    print(f"\nTop {len(results)} results:\n")
-    for rank, (case, score) in enumerate(results, 1):
-        print(f"{'=' * 80}")
-        print(f"RANK {rank} | VECTOR SCORE: {score:.4f}")
-        print(case.display())
-
-    return 0
+    code, output = format_results(args.query, results)
+    print(output)
+    return code
 
 
 if __name__ == "__main__":
@@ -3,11 +3,29 @@
 Vector search for medical cases using OpenRouter embeddings + Qdrant.
 
 Usage:
-  Index CSV into Qdrant:
+  Index CSV into Qdrant (only new or changed cases are embedded; cases gone
+  from the CSV are deleted; an interrupted run resumes where it stopped):
+    python src/med_vector_search.py index --csv deepsearch_complete.csv
+
+  Drop the collection and rebuild it from scratch:
     python src/med_vector_search.py index --csv deepsearch_complete.csv --recreate
 
   Query top-k similar cases:
     python src/med_vector_search.py query "chest pain dyspnea" -k 5
+
+  Query including the benchmark cases (hidden by default):
+    python src/med_vector_search.py query "chest pain dyspnea" --exclude none
+
+  Copy a Qdrant collection into a local index, then query it offline:
+    python src/med_vector_search.py export --collection med_deepresearch_qwen3_8b
+    python src/med_vector_search.py query "chest pain dyspnea" --backend local
+
+  Project a local index to fewer dimensions (prefix truncation or PCA), after
+  checking recall@k of each option against the full-dimension index:
+    python src/med_vector_search.py evaluate-reduction --dims 256,512,1024 -k 5
+    python src/med_vector_search.py reduce --method pca --dim 512
+    python src/med_vector_search.py query "chest pain dyspnea" --backend local \
+        --local-index data/vector_index/med_deepresearch_qwen3_8b_pca512
 """
 
 from __future__ import annotations
@@ -15,18 +33,41 @@ from __future__ import annotations
 import argparse
 import csv
 import hashlib
+import json
+import os
+import queue
+import random
 import re
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
-
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+from qdrant_client.models import Distance, VectorParams
+
+from case_exclusions import DEFAULT_EXCLUDE, parse_exclude, resolve_exclusions
+from vector_backends import (
+    BACKEND_ENV,
+    BACKENDS,
+    CONTENT_HASH_KEY,
+    DEFAULT_BACKEND,
+    DEFAULT_COLLECTION,
+    PROJECTIONS,
+    LocalVectorIndex,
+    Projection,
+    QdrantBackend,
+    open_backend,
+)
 
 try:
     from qdrant_vector_embedding import (
         DEFAULT_EMBEDDING_MODEL,
         embed_texts,
+        get_default_cache,
         get_openrouter_client,
         get_qdrant_client,
     )
@@ -35,6 +76,7 @@ except ModuleNotFoundError:
     from qdrant_vector_embedding import (  # type: ignore
         DEFAULT_EMBEDDING_MODEL,
         embed_texts,
+        get_default_cache,
         get_openrouter_client,
         get_qdrant_client,
     )
@@ -151,6 +193,12 @@ def _stable_point_id(case: MedCase, row_index: int) -> int:
     return int(digest[:15], 16)
 
 
+def content_hash(case: MedCase, model: str) -> str:
+    """Hash of everything a point is built from: embedding model, embedded text and payload."""
+    data = json.dumps([model, case.searchable_text, case.payload()], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
 def load_cases(csv_path: str) -> list[MedCase]:
     path = Path(csv_path)
     if not path.exists():
@@ -183,14 +231,121 @@ def ensure_collection(
         )
 
 
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts while a collection settles, rate limits
+_RETRY_STATUSES = {408, 409, 425, 429}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """True for rate limits, 5xx responses and connection/timeout errors."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRY_STATUSES or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # openai.APIConnectionError / APITimeoutError, qdrant ResponseHandlingException, httpx transport errors
+    return type(exc).__name__ in {"APIConnectionError", "APITimeoutError", "ResponseHandlingException"} or (
+        type(exc).__module__.startswith("httpx") and "Error" in type(exc).__name__
+    )
+
+
+def with_backoff(fn: Callable[[], T], what: str, max_retries: int = 5, base_delay: float = 1.0) -> T:
+    """Call fn, retrying transient failures with exponential backoff and jitter."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as exc:  # noqa: BLE001
+            if attempt >= max_retries or not _is_transient(exc):
+                raise
+            delay = base_delay * (2 ** attempt) + random.uniform(0, base_delay)
+            attempt += 1
+            print(f"  {what} failed ({type(exc).__name__}: {exc}); retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+@dataclass
+class IndexStats:
+    """Throughput counters shared by the embedding and upsert threads."""
+
+    total: int
+    upserted: int = 0
+    tokens: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_tokens(self, count: int) -> None:
+        with self.lock:
+            self.tokens += count
+
+    def add_upserted(self, count: int) -> None:
+        with self.lock:
+            self.upserted += count
+
+    def rates(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return f"{self.upserted / elapsed:.1f} cases/s, {self.tokens / elapsed:.0f} tokens/s"
+
+
+def _upsert_worker(
+    backend: Any,
+    batches: "queue.Queue[tuple[list[int], list[list[float]], list[dict[str, Any]]] | None]",
+    stats: IndexStats,
+    errors: list[BaseException],
+    max_retries: int,
+    checkpoint_every: int = 16,
+) -> None:
+    """Drain embedded batches into the backend until a None sentinel arrives.
+
+    Every checkpoint_every batches the backend is flushed, so a crashed run of a
+    local index loses at most that many batches (Qdrant writes are durable already).
+    """
+    written = 0
+    while True:
+        item = batches.get()
+        if item is None:
+            return
+        if errors:
+            continue  # keep draining so the producer never blocks on a dead consumer
+        ids, vectors, payloads = item
+        try:
+            with_backoff(lambda: backend.upsert(ids=ids, vectors=vectors, payloads=payloads), "upsert", max_retries)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+            continue
+        stats.add_upserted(len(ids))
+        written += 1
+        if written % checkpoint_every == 0:
+            backend.flush()
+        print(f"  upserted {stats.upserted}/{stats.total} ({stats.rates()})")
+
+
 def index_cases(
     csv_path: str,
     collection_name: str,
     embed_model: str,
     batch_size: int,
     recreate: bool,
+    backend_kind: str | None = None,
+    local_path: Path | None = None,
+    concurrency: int = 4,
+    max_retries: int = 5,
 ) -> None:
-    qdrant = get_qdrant_client()
+    """Embed and upsert new or changed cases, and delete cases no longer in the CSV.
+
+    Each point stores content_hash() in its payload, so a case is re-embedded
+    only when its text, payload or the model changed, and a run that crashed
+    half-way resumes from the points it had already written.
+
+    Up to `concurrency` embedding requests are in flight at once while a single
+    upsert thread writes finished batches to the backend; the queue between them
+    is bounded so embeddings never run far ahead of the writes. Transient API
+    errors (429, 5xx, timeouts) are retried with exponential backoff.
+    """
+    backend_kind = backend_kind or os.getenv(BACKEND_ENV) or DEFAULT_BACKEND
     openrouter = get_openrouter_client()
 
     print(f"Loading CSV: {csv_path}")
@@ -202,41 +357,95 @@ def index_cases(
     if not probe_text:
         raise RuntimeError("All cases have empty searchable text.")
 
-    probe_vector = embed_texts([probe_text], model=embed_model, client=openrouter)[0]
+    probe_vector = with_backoff(
+        lambda: embed_texts([probe_text], model=embed_model, client=openrouter)[0], "embedding", max_retries
+    )
     vector_size = len(probe_vector)
     print(f"Embedding model: {embed_model} (dimension={vector_size})")
 
-    ensure_collection(
-        client=qdrant,
-        collection_name=collection_name,
-        vector_size=vector_size,
-        distance=Distance.COSINE,
-        recreate=recreate,
+    # Quantized local backends read the same float index; their codes are rebuilt on load
+    if backend_kind.startswith("local"):
+        local_path = local_path or LocalVectorIndex.default_dir(collection_name)
+        if recreate or not (local_path / "manifest.json").exists():
+            backend = LocalVectorIndex.empty(vector_size, path=local_path)
+        else:
+            backend = LocalVectorIndex.load(local_path, mmap=False)
+    else:
+        qdrant = get_qdrant_client()
+        ensure_collection(
+            client=qdrant,
+            collection_name=collection_name,
+            vector_size=vector_size,
+            distance=Distance.COSINE,
+            recreate=recreate,
+        )
+        backend = QdrantBackend(collection_name, client=qdrant)
+
+    # Later rows win for duplicate ids, as they did when every row was upserted in order
+    wanted: dict[int, tuple[MedCase, str]] = {}
+    for row_index, case in enumerate(cases):
+        wanted[_stable_point_id(case, row_index)] = (case, content_hash(case, embed_model))
+
+    existing = {} if recreate else with_backoff(backend.content_hashes, "listing points", max_retries)
+    todo = [(point_id, case, digest) for point_id, (case, digest) in wanted.items() if existing.get(point_id) != digest]
+    stale = sorted(set(existing) - set(wanted))
+    new_count = sum(point_id not in existing for point_id, _, _ in todo)
+    print(
+        f"{len(wanted)} cases: {new_count} new, {len(todo) - new_count} changed, "
+        f"{len(wanted) - len(todo)} unchanged, {len(stale)} to delete"
     )
+    if stale:
+        with_backoff(lambda: backend.delete(stale), "delete", max_retries)
+
+    total = len(todo)
+    concurrency = max(1, concurrency)
+    print(
+        f"Indexing {total} cases into '{collection_name}' with batch_size={batch_size}, "
+        f"concurrency={concurrency}..."
+    )
+    stats = IndexStats(total=total)
+
+    def embed_batch(start: int) -> tuple[list[int], list[list[float]], list[dict[str, Any]]]:
+        batch = todo[start:start + batch_size]
+        texts = [case.searchable_text for _, case, _ in batch]
+        vectors = with_backoff(
+            lambda: embed_texts(texts, model=embed_model, client=openrouter, on_usage=stats.add_tokens),
+            "embedding",
+            max_retries,
+        )
+        payloads = [{**case.payload(), CONTENT_HASH_KEY: digest} for _, case, digest in batch]
+        return [point_id for point_id, _, _ in batch], vectors, payloads
 
-    total = len(cases)
-    print(f"Indexing {total} cases into '{collection_name}' with batch_size={batch_size}...")
-    upserted = 0
-
-    for start in range(0, total, batch_size):
-        end = min(start + batch_size, total)
-        batch_cases = cases[start:end]
-        texts = [c.searchable_text for c in batch_cases]
-        vectors = embed_texts(texts, model=embed_model, client=openrouter)
-
-        points = [
-            PointStruct(
-                id=_stable_point_id(case, start + idx),
-                vector=vectors[idx],
-                payload=case.payload(),
-            )
-            for idx, case in enumerate(batch_cases)
-        ]
-        qdrant.upsert(collection_name=collection_name, points=points, wait=True)
-        upserted += len(points)
-        print(f"  upserted {upserted}/{total}")
-
-    print("Indexing complete.")
+    batches: queue.Queue = queue.Queue(maxsize=concurrency)
+    errors: list[BaseException] = []
+    uploader = threading.Thread(
+        target=_upsert_worker, args=(backend, batches, stats, errors, max_retries), daemon=True
+    )
+    uploader.start()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending: set[Future] = set()
+            for start in range(0, total, batch_size):
+                if errors:
+                    break
+                pending.add(pool.submit(embed_batch, start))
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batches.put(future.result())
+            for future in pending:
+                batches.put(future.result())
+    finally:
+        batches.put(None)
+        uploader.join()
+    if errors:
+        raise errors[0]
+
+    backend.flush()
+    print(f"Indexing complete: {stats.upserted} cases, {stats.tokens} tokens ({stats.rates()}).")
+    cache = get_default_cache()
+    if cache is not None:
+        print(f"Embedding cache: {cache.hits} hits, {cache.misses} misses")
 
 
 def query_cases(
@@ -244,12 +453,15 @@ def query_cases(
     top_k: int,
     collection_name: str,
     embed_model: str,
+    excluded: frozenset[int] = frozenset(),
+    backend_kind: str | None = None,
+    local_path: Path | None = None,
 ) -> int:
     if not query.strip():
         print("Empty query.")
         return 1
 
-    qdrant = get_qdrant_client()
+    backend = open_backend(backend_kind, collection_name, local_path)
     openrouter = get_openrouter_client()
 
     print(f"\nSearching for: '{query}'")
@@ -257,13 +469,8 @@ def query_cases(
 
     query_vector = embed_texts([query], model=embed_model, client=openrouter)[0]
 
-    response = qdrant.query_points(
-        collection_name=collection_name,
-        query=query_vector,
-        limit=top_k,
-        with_payload=True,
-    )
-    points = response.points
+    # Point ids are case numbers, so exclusions are applied inside the backend's top-k
+    points = backend.query(query_vector, limit=top_k, exclude_ids=excluded)
 
     if not points:
         print("No results found.")
@@ -271,7 +478,7 @@ def query_cases(
 
     print(f"\nTop {len(points)} vector results:\n")
     for rank, point in enumerate(points, 1):
-        case = MedCase.from_payload(point.payload or {})
+        case = MedCase.from_payload(point.payload)
         print(f"{'=' * 80}")
         print(f"RANK {rank} | VECTOR SCORE: {point.score:.4f}")
         print(case.display())
@@ -279,6 +486,86 @@ def query_cases(
     return 0
 
 
+def export_collection(collection_name: str, out_dir: Path | None, batch_size: int) -> None:
+    """Copy a Qdrant collection (vectors + payloads) into a local vector index."""
+    out_dir = out_dir or LocalVectorIndex.default_dir(collection_name)
+    print(f"Exporting '{collection_name}' from Qdrant...")
+    index = LocalVectorIndex.from_qdrant(QdrantBackend(collection_name), batch_size=batch_size)
+    index.save(out_dir, source=f"qdrant:{collection_name}")
+    print(f"Saved {index.count()} vectors (dimension={index.dimension}) to {out_dir}")
+
+
+def make_projection(index: LocalVectorIndex, method: str, dim: int) -> Projection:
+    """Projection of index's (full-dimension) vectors to dim; PCA is fitted on the index."""
+    if index.projection is not None:
+        raise ValueError("Index is already reduced; start from the full-dimension index.")
+    if method == "truncate":
+        return Projection.truncate(index.dimension, dim)
+    return Projection.fit_pca(index.vectors, dim)
+
+
+def reduce_index(
+    collection_name: str,
+    local_path: Path | None,
+    method: str,
+    dim: int,
+    out_dir: Path | None,
+) -> None:
+    """Write a reduced copy of a local index; queries against it are projected the same way."""
+    local_path = local_path or LocalVectorIndex.default_dir(collection_name)
+    out_dir = out_dir or local_path.parent / f"{local_path.name}_{method}{dim}"
+    index = LocalVectorIndex.load(local_path)
+    start = time.perf_counter()
+    reduced = index.reduced(make_projection(index, method, dim))
+    reduced.save(out_dir, source=f"{method}{dim}:{local_path.name}")
+    print(
+        f"Projected {index.count()} vectors {index.dimension} -> {dim} dims ({method}) "
+        f"in {time.perf_counter() - start:.1f}s; saved to {out_dir}"
+    )
+
+
+def evaluate_reduction(
+    collection_name: str,
+    local_path: Path | None,
+    methods: list[str],
+    dims: list[int],
+    top_k: int,
+    num_queries: int,
+    seed: int = 0,
+) -> None:
+    """Recall@k of each (method, dim) against exact full-dimension search.
+
+    Queries are stored case vectors (their own case excluded), as in the
+    case-to-case similarity lookups. PCA is fitted on the same corpus.
+    """
+    local_path = local_path or LocalVectorIndex.default_dir(collection_name)
+    index = LocalVectorIndex.load(local_path, mmap=False)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(index.count(), size=min(num_queries, index.count()), replace=False))
+    queries = index.vectors[rows]
+    excluded = [[int(point_id)] for point_id in index.ids[rows]]
+
+    def run(target: LocalVectorIndex) -> tuple[list[set[int]], float]:
+        start = time.perf_counter()
+        results = [{hit.id for hit in target.query(vector, top_k, ex)} for vector, ex in zip(queries, excluded)]
+        return results, (time.perf_counter() - start) / len(queries)
+
+    baseline, base_seconds = run(index)
+    full_mb = index.vectors.nbytes / (1 << 20)
+    print(f"{index.count()} vectors x {index.dimension} dims, {len(queries)} queries, recall@{top_k}\n")
+    print(f"{'method':<10} {'dims':>6} {'recall':>8} {'ms/query':>9} {'MB':>8}")
+    print(f"{'full':<10} {index.dimension:>6} {1.0:>8.4f} {base_seconds * 1000:>9.3f} {full_mb:>8.1f}")
+    for method in methods:
+        for dim in dims:
+            if dim > index.dimension or (method == "pca" and dim > index.count()):
+                continue
+            reduced = index.reduced(make_projection(index, method, dim))
+            # Queries are full-width, as at search time; the index projects them
+            results, seconds = run(reduced)
+            recall = float(np.mean([len(r & b) / max(1, len(b)) for r, b in zip(results, baseline)]))
+            print(f"{method:<10} {dim:>6} {recall:>8.4f} {seconds * 1000:>9.3f} {reduced.vectors.nbytes / (1 << 20):>8.1f}")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Medical case vector search (OpenRouter embeddings + Qdrant)"
@@ -286,9 +573,23 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     default_csv = str(Path(__file__).parent.parent / "deepsearch_complete.csv")
-    default_collection = "med_deepresearch_qwen3_8b"
+    default_collection = DEFAULT_COLLECTION
+
+    backend_parent = argparse.ArgumentParser(add_help=False)
+    backend_parent.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help=f"Vector backend (default: ${BACKEND_ENV} or {DEFAULT_BACKEND})",
+    )
+    backend_parent.add_argument(
+        "--local-index",
+        type=Path,
+        default=None,
+        help="Local index dir (default: data/vector_index/<collection>)",
+    )
 
-    index_parser = subparsers.add_parser("index", help="Index CSV into Qdrant")
+    index_parser = subparsers.add_parser("index", help="Index CSV into Qdrant", parents=[backend_parent])
     index_parser.add_argument("--csv", type=str, default=default_csv, help="Path to CSV")
     index_parser.add_argument(
         "--collection",
@@ -308,13 +609,25 @@ def build_parser() -> argparse.ArgumentParser:
         default=32,
         help="Batch size for embedding/upsert",
     )
+    index_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Embedding requests in flight at once",
+    )
+    index_parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries per request on rate limits, 5xx and timeouts",
+    )
     index_parser.add_argument(
         "--recreate",
         action="store_true",
         help="Delete collection before re-indexing",
     )
 
-    query_parser = subparsers.add_parser("query", help="Query similar cases")
+    query_parser = subparsers.add_parser("query", help="Query similar cases", parents=[backend_parent])
     query_parser.add_argument("query", type=str, help="Search query text")
     query_parser.add_argument(
         "--top_k",
@@ -335,6 +648,95 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_EMBEDDING_MODEL,
         help="OpenRouter embedding model",
     )
+    query_parser.add_argument(
+        "--exclude",
+        type=parse_exclude,
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma-separated case numbers or named lists to hide (benchmark_50, target, none; default: benchmark_50)",
+    )
+    query_parser.add_argument(
+        "--target-case",
+        type=int,
+        default=None,
+        help="Case excluded by --exclude target",
+    )
+
+    export_parser = subparsers.add_parser("export", help="Copy a Qdrant collection into a local index")
+    export_parser.add_argument(
+        "--collection",
+        type=str,
+        default=default_collection,
+        help="Qdrant collection name",
+    )
+    export_parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Output dir (default: data/vector_index/<collection>)",
+    )
+    export_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Points per scroll request",
+    )
+
+    reduce_parser = subparsers.add_parser("reduce", help="Write a lower-dimensional copy of a local index")
+    reduce_parser.add_argument(
+        "--collection",
+        type=str,
+        default=default_collection,
+        help="Collection of the local index",
+    )
+    reduce_parser.add_argument(
+        "--local-index",
+        type=Path,
+        default=None,
+        help="Full-dimension local index dir (default: data/vector_index/<collection>)",
+    )
+    reduce_parser.add_argument(
+        "--method",
+        choices=PROJECTIONS,
+        default="truncate",
+        help="Prefix truncation + renormalisation, or PCA fitted on the corpus",
+    )
+    reduce_parser.add_argument("--dim", type=int, required=True, help="Target dimension")
+    reduce_parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Output dir (default: <local index>_<method><dim>)",
+    )
+
+    eval_parser = subparsers.add_parser(
+        "evaluate-reduction", help="Recall@k of reduced dimensions against the full-dimension index"
+    )
+    eval_parser.add_argument(
+        "--collection",
+        type=str,
+        default=default_collection,
+        help="Collection of the local index",
+    )
+    eval_parser.add_argument(
+        "--local-index",
+        type=Path,
+        default=None,
+        help="Full-dimension local index dir (default: data/vector_index/<collection>)",
+    )
+    eval_parser.add_argument(
+        "--methods",
+        type=lambda value: [m for m in value.split(",") if m],
+        default=list(PROJECTIONS),
+        help="Comma-separated projection methods (default: truncate,pca)",
+    )
+    eval_parser.add_argument(
+        "--dims",
+        type=lambda value: [int(d) for d in value.split(",") if d],
+        default=[128, 256, 512, 1024, 2048],
+        help="Comma-separated target dimensions",
+    )
+    eval_parser.add_argument("--top_k", "-k", type=int, default=5, help="Neighbours compared per query")
+    eval_parser.add_argument("--queries", type=int, default=200, help="Number of sampled query cases")
 
     return parser
 
@@ -350,6 +752,10 @@ def main() -> int:
             embed_model=args.model,
             batch_size=args.batch_size,
             recreate=args.recreate,
+            backend_kind=args.backend,
+            local_path=args.local_index,
+            concurrency=args.concurrency,
+            max_retries=args.max_retries,
         )
         return 0
 
@@ -359,8 +765,28 @@ def main() -> int:
             top_k=args.top_k,
             collection_name=args.collection,
             embed_model=args.model,
+            excluded=resolve_exclusions(args.exclude, args.target_case),
+            backend_kind=args.backend,
+            local_path=args.local_index,
         )
 
+    if args.command == "export":
+        export_collection(args.collection, args.out, args.batch_size)
+        return 0
+
+    if args.command == "reduce":
+        reduce_index(args.collection, args.local_index, args.method, args.dim, args.out)
+        return 0
+
+    if args.command == "evaluate-reduction":
+        unknown = [m for m in args.methods if m not in PROJECTIONS]
+        if unknown:
+            parser.error(f"unknown methods {unknown} (choose from {', '.join(PROJECTIONS)})")
+        evaluate_reduction(
+            args.collection, args.local_index, args.methods, args.dims, args.top_k, args.queries,
+        )
+        return 0
+
     parser.print_help()
     return 1
 
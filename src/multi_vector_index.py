@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Per-field multi-vector case index with late-interaction scoring.
+
+The single-vector index embeds MedCase.searchable_text, which runs five long
+fields together, so a long discussion dilutes (or truncates) the rest. This
+index embeds each of FIELDS separately, giving every case one vector per
+non-empty field. A query is scored against all field vectors of the corpus in
+one matrix product and each case's field scores are combined:
+
+    max       best matching field (a case matches if any one field does)
+    weighted  weighted mean over the case's non-empty fields
+
+Restricting `fields` gives field-targeted retrieval, e.g. only
+imaging_findings for "which cases show this imaging pattern".
+
+Usage:
+    uv run python src/multi_vector_index.py build --csv deepsearch_complete.csv
+    uv run python src/multi_vector_index.py query "ring enhancing lesion" --fields imaging_findings
+    uv run python src/multi_vector_index.py query "fever rash child" --aggregation weighted \\
+        --weights clinical_history=2,imaging_findings=1
+
+Embeddings go through the embedding cache, so rebuilding after a CSV change
+only embeds field texts that are new or changed.
+
+Index layout (one directory, default data/vector_index/<collection>_fields):
+    manifest.json   format version, fields, dimension, count, model, source
+    vectors.npy     float32 (count, len(fields), dimension), rows L2-normalised, zeros if absent
+    present.npy     bool (count, len(fields)), False where the field is empty
+    ids.npy         int64 case number of each row
+    payloads.json   payload dict of each row
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from bm25_index import dir_lock, read_manifest, replace_dir
+from vector_backends import DEFAULT_COLLECTION, DEFAULT_LOCAL_ROOT, VectorHit, normalize_rows
+
+FORMAT_VERSION = 1
+FIELDS = ("clinical_history", "imaging_findings", "differential_diagnosis", "final_diagnosis")
+AGGREGATIONS = ("max", "weighted")
+
+
+@dataclass
+class FieldHit(VectorHit):
+    """A case hit plus its similarity in each scored field it has."""
+    field_scores: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def best_field(self) -> Optional[str]:
+        return max(self.field_scores, key=self.field_scores.get) if self.field_scores else None
+
+
+def parse_fields(value: str) -> list[str]:
+    """Parse "imaging_findings,final_diagnosis" into a field list."""
+    fields = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(f"invalid fields '{value}' (fields: {', '.join(FIELDS)})")
+    return fields
+
+
+def parse_weights(value: str) -> dict[str, float]:
+    """Parse "clinical_history=2,imaging_findings=1" (unlisted fields weigh 1)."""
+    weights = {name: 1.0 for name in FIELDS}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, sep, weight = item.partition("=")
+        name = name.strip()
+        if not sep or name not in FIELDS:
+            raise argparse.ArgumentTypeError(f"invalid field weight '{item}' (fields: {', '.join(FIELDS)})")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight in '{item}'")
+    return weights
+
+
+class MultiVectorIndex:
+    """One L2-normalised vector per (case, field), scored together with NumPy."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        present: np.ndarray,
+        payloads: list[dict[str, Any]],
+        fields: Sequence[str] = FIELDS,
+        path: Optional[Path] = None,
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = vectors
+        self.present = np.asarray(present, dtype=bool)
+        self.payloads = payloads
+        self.fields = tuple(fields)
+        self.path = Path(path) if path else None
+        if not (len(self.ids) == len(self.vectors) == len(self.present) == len(self.payloads)):
+            raise ValueError("ids, vectors, present and payloads must have the same length")
+        self.row_of = {int(point_id): row for row, point_id in enumerate(self.ids)}
+
+    @staticmethod
+    def default_dir(collection: str = DEFAULT_COLLECTION) -> Path:
+        return DEFAULT_LOCAL_ROOT / f"{collection}_fields"
+
+    @property
+    def dimension(self) -> int:
+        return int(self.vectors.shape[2]) if self.vectors.ndim == 3 else 0
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "MultiVectorIndex":
+        path = Path(path)
+        manifest = read_manifest(path)
+        if manifest is None or manifest.get("format_version") != FORMAT_VERSION:
+            raise FileNotFoundError(
+                f"No per-field vector index at {path}. Build one with: "
+                "uv run python src/multi_vector_index.py build"
+            )
+        with (path / "payloads.json").open("r", encoding="utf-8") as f:
+            payloads = json.load(f)
+        return cls(
+            ids=np.load(path / "ids.npy"),
+            vectors=np.load(path / "vectors.npy", mmap_mode="r" if mmap else None),
+            present=np.load(path / "present.npy"),
+            payloads=payloads,
+            fields=manifest["fields"],
+            path=path,
+        )
+
+    def save(self, path: Optional[str | Path] = None, model: Optional[str] = None, source: Optional[str] = None) -> None:
+        """Write the index atomically (tmp dir + rename) under the directory lock."""
+        path = Path(path or self.path)
+        with dir_lock(path):
+            tmp_dir = path.parent / f".{path.name}.tmp-{os.getpid()}"
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+            np.save(tmp_dir / "ids.npy", self.ids)
+            np.save(tmp_dir / "vectors.npy", np.ascontiguousarray(self.vectors))
+            np.save(tmp_dir / "present.npy", self.present)
+            with (tmp_dir / "payloads.json").open("w", encoding="utf-8") as f:
+                json.dump(self.payloads, f, ensure_ascii=False)
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "fields": list(self.fields),
+                "dimension": self.dimension,
+                "count": self.count(),
+                "distance": "cosine",
+                "model": model,
+                "source": source,
+            }
+            # Manifest last: a directory without one is never loaded
+            with (tmp_dir / "manifest.json").open("w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            replace_dir(tmp_dir, path)
+        self.path = path
+
+    def field_scores(self, vector: Sequence[float], fields: Optional[Sequence[str]] = None) -> tuple[np.ndarray, np.ndarray]:
+        """(count, len(fields)) cosine scores and the matching presence mask."""
+        columns = [self.fields.index(name) for name in (fields or self.fields)]
+        query = normalize_rows(np.asarray(vector, dtype=np.float32))
+        if columns == list(range(len(self.fields))):
+            # All field vectors of the corpus in one (count * fields, dimension) product
+            scores = (np.asarray(self.vectors).reshape(-1, self.dimension) @ query).reshape(self.count(), -1)
+        else:
+            scores = np.asarray(self.vectors[:, columns, :]) @ query
+        return scores, self.present[:, columns]
+
+    def scores(
+        self,
+        vector: Sequence[float],
+        fields: Optional[Sequence[str]] = None,
+        aggregation: str = "max",
+        weights: Optional[dict[str, float]] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-case scores (-inf for cases without any of the fields), plus field scores and mask."""
+        field_scores, present = self.field_scores(vector, fields)
+        if aggregation == "max":
+            combined = np.where(present, field_scores, -np.inf).max(axis=1)
+        elif aggregation == "weighted":
+            w = np.array([(weights or {}).get(name, 1.0) for name in (fields or self.fields)], dtype=np.float32)
+            total = present @ w
+            combined = np.where(total > 0, (np.where(present, field_scores, 0.0) @ w) / np.where(total > 0, total, 1.0), -np.inf)
+        else:
+            raise ValueError(f"Unknown aggregation '{aggregation}'. Use one of: {', '.join(AGGREGATIONS)}")
+        return combined, field_scores, present
+
+    def query(
+        self,
+        vector: Sequence[float],
+        limit: int,
+        exclude_ids: Iterable[int] = (),
+        fields: Optional[Sequence[str]] = None,
+        aggregation: str = "max",
+        weights: Optional[dict[str, float]] = None,
+    ) -> list[FieldHit]:
+        """Top `limit` cases by combined field similarity, skipping exclude_ids."""
+        if limit <= 0 or not self.count():
+            return []
+        fields = list(fields or self.fields)
+        combined, field_scores, present = self.scores(vector, fields, aggregation, weights)
+        keep = np.isfinite(combined)
+        keep[[self.row_of[i] for i in exclude_ids if i in self.row_of]] = False
+        candidates = np.flatnonzero(keep)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-combined[candidates], limit - 1)[:limit]]
+        order = np.lexsort((self.ids[candidates], -combined[candidates]))
+        return [
+            FieldHit(
+                int(self.ids[row]),
+                float(combined[row]),
+                self.payloads[row],
+                {name: float(field_scores[row, col]) for col, name in enumerate(fields) if present[row, col]},
+            )
+            for row in candidates[order]
+        ]
+
+
+def build_field_index(
+    csv_path: str,
+    embed_model: str,
+    batch_size: int = 32,
+    concurrency: int = 4,
+    max_retries: int = 5,
+) -> MultiVectorIndex:
+    """Embed every non-empty field of every case in the CSV."""
+    from med_vector_search import IndexStats, _stable_point_id, load_cases, with_backoff
+    from qdrant_vector_embedding import embed_texts, get_default_cache, get_openrouter_client
+
+    openrouter = get_openrouter_client()
+    print(f"Loading CSV: {csv_path}")
+    cases = load_cases(csv_path)
+    # Later rows win for duplicate ids, as in med_vector_search index
+    by_id = {_stable_point_id(case, row_index): case for row_index, case in enumerate(cases)}
+    ids = np.fromiter(by_id, dtype=np.int64, count=len(by_id))
+    cases = list(by_id.values())
+    slots = [
+        (row, col, text)
+        for row, case in enumerate(cases)
+        for col, name in enumerate(FIELDS)
+        if (text := getattr(case, name).strip())
+    ]
+    if not slots:
+        raise RuntimeError("All cases have empty fields.")
+    print(f"Embedding {len(slots)} field texts of {len(cases)} cases with {embed_model}...")
+
+    stats = IndexStats(total=len(slots))
+
+    def embed_batch(start: int) -> tuple[int, list[list[float]]]:
+        texts = [text for _, _, text in slots[start:start + batch_size]]
+        vectors = with_backoff(
+            lambda: embed_texts(texts, model=embed_model, client=openrouter, on_usage=stats.add_tokens),
+            "embedding",
+            max_retries,
+        )
+        stats.add_upserted(len(texts))
+        print(f"  embedded {stats.upserted}/{stats.total} ({stats.rates()})")
+        return start, vectors
+
+    vectors: Optional[np.ndarray] = None
+    present = np.zeros((len(cases), len(FIELDS)), dtype=bool)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for start, batch in pool.map(embed_batch, range(0, len(slots), batch_size)):
+            batch = normalize_rows(np.asarray(batch, dtype=np.float32))
+            if vectors is None:
+                vectors = np.zeros((len(cases), len(FIELDS), batch.shape[1]), dtype=np.float32)
+            for (row, col, _), vector in zip(slots[start:start + batch_size], batch):
+                vectors[row, col] = vector
+                present[row, col] = True
+
+    cache = get_default_cache()
+    if cache is not None:
+        print(f"Embedding cache: {cache.hits} hits, {cache.misses} misses")
+    return MultiVectorIndex(ids, vectors, present, [case.payload() for case in cases])
+
+
+def format_results(query: str, hits: list[FieldHit], fields: Sequence[str], aggregation: str) -> tuple[int, str]:
+    """CLI output for a per-field query as (exit code, text)."""
+    from med_search_vector import payload_to_view
+
+    lines = [f"\nSearching for: '{query}' (fields: {', '.join(fields)}; {aggregation})", "-" * 40]
+    if not hits:
+        lines.append("No results found.")
+        return 1, "\n".join(lines)
+    lines.append(f"\nTop {len(hits)} results:\n")
+    for rank, hit in enumerate(hits, 1):
+        lines.append(f"{'=' * 80}")
+        lines.append(f"RANK {rank} | FIELD SCORE: {hit.score:.4f} (best field: {hit.best_field})")
+        lines.append(payload_to_view(hit.payload).display())
+    return 0, "\n".join(lines)
+
+
+def main() -> int:
+    from case_exclusions import DEFAULT_EXCLUDE, parse_exclude, resolve_exclusions
+    from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL
+
+    parser = argparse.ArgumentParser(description="Per-field multi-vector case index")
+    parser.add_argument("--collection", type=str, default=DEFAULT_COLLECTION, help="Collection the index belongs to")
+    parser.add_argument("--index-dir", type=Path, default=None, help="Index dir (default: data/vector_index/<collection>_fields)")
+    parser.add_argument("--model", type=str, default=DEFAULT_EMBEDDING_MODEL, help="Embedding model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Embed every field of every case")
+    build_parser.add_argument("--csv", type=str, default=str(SRC_DIR.parent / "deepsearch_complete.csv"), help="Path to CSV")
+    build_parser.add_argument("--batch-size", type=int, default=32, help="Texts per embedding request")
+    build_parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight at once")
+    build_parser.add_argument("--max-retries", type=int, default=5, help="Retries per request on rate limits, 5xx and timeouts")
+
+    query_parser = subparsers.add_parser("query", help="Query cases by field similarity")
+    query_parser.add_argument("query", type=str, help="Search query text")
+    query_parser.add_argument("--top_k", "-k", type=int, default=5, help="Number of results")
+    query_parser.add_argument("--fields", type=parse_fields, default=None, help=f"Comma-separated fields to match (default: all of {', '.join(FIELDS)})")
+    query_parser.add_argument("--aggregation", choices=AGGREGATIONS, default="max", help="Combine field scores by max (default) or weighted mean")
+    query_parser.add_argument("--weights", type=parse_weights, default=None, help="Field weights for --aggregation weighted")
+    query_parser.add_argument(
+        "--exclude",
+        type=parse_exclude,
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma-separated case numbers or named lists to hide (benchmark_50, target, none; default: benchmark_50)",
+    )
+    query_parser.add_argument("--target-case", type=int, default=None, help="Case excluded by --exclude target")
+    args = parser.parse_args()
+    index_dir = args.index_dir or MultiVectorIndex.default_dir(args.collection)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = build_field_index(args.csv, args.model, args.batch_size, args.concurrency, args.max_retries)
+        index.save(index_dir, model=args.model, source=f"csv:{Path(args.csv).name}")
+        print(f"Saved {index.count()} cases x {len(index.fields)} fields to {index_dir} in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    from qdrant_vector_embedding import embed_texts, get_openrouter_client
+
+    index = MultiVectorIndex.load(index_dir)
+    query_vector = embed_texts([args.query], model=args.model, client=get_openrouter_client())[0]
+    fields = args.fields or list(index.fields)
+    hits = index.query(
+        query_vector,
+        args.top_k,
+        exclude_ids=resolve_exclusions(args.exclude, args.target_case),
+        fields=fields,
+        aggregation=args.aggregation,
+        weights=args.weights,
+    )
+    code, output = format_results(args.query, hits, fields, args.aggregation)
+    print(output)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Resident search service shared by research tools, subagents and runners.
+
+One long-lived process holds the case store, the BM25/BM25F index, the vector
+backend and the OpenRouter client in memory and answers JSON-lines requests
+over a Unix socket, so a tool call no longer pays for interpreter startup,
+imports, CSV loading and index setup.
+
+Usage:
+    uv run python src/search_daemon.py serve      # foreground; background it with &
+    uv run python src/search_daemon.py status
+    uv run python src/search_daemon.py stop
+
+Clients call search(op, **params). When no daemon is listening on the socket
+(default: $MED_SEARCH_SOCKET or <tmp>/med_search-<uid>.sock) the same request
+is served in-process instead.
+
+Protocol, one JSON object per line in each direction:
+    -> {"op": "bm25_query", "params": {"query": "...", "top_k": 5}}
+    <- {"code": 0, "output": "<same text as the CLI>", "error": ""}
+Ops: bm25_query, vector_query, hybrid_query, field_query, navigate, similar, ping, shutdown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from case_exclusions import DEFAULT_EXCLUDE, resolve_exclusions
+from vector_backends import BACKENDS, DEFAULT_COLLECTION
+
+PROJECT_ROOT = SRC_DIR.parent
+DEFAULT_CSV = PROJECT_ROOT / "deepsearch_complete.csv"
+SOCKET_ENV = "MED_SEARCH_SOCKET"
+# Matches the subprocess timeout the research tools used before
+DEFAULT_TIMEOUT = 60.0
+
+
+def default_socket_path() -> Path:
+    return Path(os.environ.get(SOCKET_ENV) or Path(tempfile.gettempdir()) / f"med_search-{os.getuid()}.sock")
+
+
+class SearchService:
+    """Search backends kept in memory; heavy modules are imported on first use."""
+
+    def __init__(
+        self,
+        csv_path: Optional[str] = None,
+        image_csv_path: Optional[str] = None,
+        vector_backend: Optional[str] = None,
+    ):
+        self.csv_path = Path(csv_path or DEFAULT_CSV)
+        self.image_csv_path = image_csv_path
+        self.vector_backend = vector_backend
+        self._lock = threading.Lock()
+        self._store = None
+        self._engine = None
+        self._vector_backends: dict[str, Any] = {}
+        self._field_indexes: dict[str, Any] = {}
+        self._openrouter = None
+
+    def store(self):
+        """Keyed case store (no BM25)."""
+        with self._lock:
+            if self._store is None:
+                from case_store import CaseStore
+                self._store = CaseStore.open(self.csv_path, self.image_csv_path)
+            return self._store
+
+    def engine(self):
+        """BM25 search engine over the same corpus."""
+        with self._lock:
+            if self._engine is None:
+                from med_search import MedSearchEngine
+                self._engine = MedSearchEngine(str(self.csv_path), image_csv_path=self.image_csv_path)
+                self._store = self._engine.store
+            return self._engine
+
+    def vector_clients(self, collection: str = DEFAULT_COLLECTION) -> tuple[Any, Any]:
+        """(vector backend, openrouter client) for a collection, created once."""
+        with self._lock:
+            if collection not in self._vector_backends:
+                from vector_backends import open_backend
+                self._vector_backends[collection] = open_backend(self.vector_backend, collection)
+            if self._openrouter is None:
+                from med_search_vector import get_openrouter_client
+                self._openrouter = get_openrouter_client()
+            return self._vector_backends[collection], self._openrouter
+
+    def field_index(self, collection: str = DEFAULT_COLLECTION):
+        """Per-field multi-vector index of a collection (multi_vector_index.py)."""
+        with self._lock:
+            if collection not in self._field_indexes:
+                from multi_vector_index import MultiVectorIndex
+                self._field_indexes[collection] = MultiVectorIndex.load(MultiVectorIndex.default_dir(collection))
+            return self._field_indexes[collection]
+
+    def handle(self, request: dict) -> dict:
+        """Serve one request dict; never raises."""
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            return {"code": 2, "output": "", "error": f"Unknown op '{op}'"}
+        try:
+            code, output = handler(**request.get("params", {}))
+        except Exception as exc:  # noqa: BLE001
+            return {"code": 1, "output": "", "error": f"{type(exc).__name__}: {exc}"}
+        return {"code": code, "output": output, "error": ""}
+
+    def op_ping(self) -> tuple[int, str]:
+        return 0, "pong"
+
+    def op_navigate(
+        self,
+        case_id: int | str,
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Same output as `med_search.py <case_id>`."""
+        from med_search import case_number_query, format_lookup
+
+        query = str(case_id)
+        case_number = case_number_query(query)
+        if case_number is None:
+            return 1, f"Error: '{case_id}' is not a case number."
+        excluded = resolve_exclusions(DEFAULT_EXCLUDE if exclude is None else exclude, target_case)
+        case = None if case_number in excluded else self.store().get(case_number)
+        return format_lookup(query, case_number, case)
+
+    def op_similar(
+        self,
+        case_id: int | str,
+        top_k: int = 5,
+        source: str = "vector",
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Most similar cases from the precomputed graph (case_similarity_graph.py)."""
+        from case_similarity_graph import load_graph
+        from med_search import case_number_query, format_results
+
+        case_number = case_number_query(str(case_id))
+        if case_number is None:
+            return 1, f"Error: '{case_id}' is not a case number."
+        excluded = resolve_exclusions(DEFAULT_EXCLUDE if exclude is None else exclude, target_case)
+        store = self.store()
+        results = []
+        # The graph keeps more neighbours than are shown, so exclusions can be skipped over
+        for neighbor, score in load_graph(source).neighbors_of(case_number):
+            case = None if neighbor in excluded else store.get(neighbor)
+            if case is not None:
+                results.append((case, score))
+            if len(results) >= top_k:
+                break
+        return format_results(f"cases similar to {case_number} ({source})", results)
+
+    def op_bm25_query(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: str = "bm25",
+        field_weights: Optional[dict[str, float]] = None,
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Same output as `med_search.py <query> --top_k k --mode mode`."""
+        from med_search import case_number_query, format_results
+
+        if case_number_query(query) is not None:
+            return self.op_navigate(query, exclude, target_case)
+        results = self.engine().search(
+            query,
+            top_k=top_k,
+            mode=mode,
+            field_weights=field_weights,
+            exclude=DEFAULT_EXCLUDE if exclude is None else exclude,
+            target_case=target_case,
+        )
+        return format_results(query, results)
+
+    def op_vector_query(
+        self,
+        query: str,
+        top_k: int = 5,
+        candidate_limit: int = 20,
+        collection: str = DEFAULT_COLLECTION,
+        model: Optional[str] = None,
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Same output as `med_search_vector.py <query> --top_k k`."""
+        from dataclasses import asdict
+
+        from med_search_vector import (
+            DEFAULT_EMBEDDING_MODEL, extract_case_id, format_lookup, format_results, row_to_view, vector_search,
+        )
+
+        excluded = resolve_exclusions(DEFAULT_EXCLUDE if exclude is None else exclude, target_case)
+        case_number = extract_case_id(query)
+        if case_number is not None:
+            case = None if case_number in excluded else self.store().get(case_number)
+            return format_lookup(query, case_number, row_to_view(asdict(case)) if case else None)
+
+        backend, openrouter = self.vector_clients(collection)
+        results = vector_search(
+            query=query,
+            top_k=top_k,
+            candidate_limit=candidate_limit,
+            collection=collection,
+            model=model or DEFAULT_EMBEDDING_MODEL,
+            excluded=excluded,
+            backend=backend,
+            openrouter=openrouter,
+        )
+        return format_results(query, results)
+
+    def op_hybrid_query(
+        self,
+        query: str,
+        top_k: int = 5,
+        fusion: str = "rrf",
+        weights: Optional[dict[str, float]] = None,
+        candidate_limit: Optional[int] = None,
+        bm25_mode: str = "bm25",
+        collection: str = DEFAULT_COLLECTION,
+        model: Optional[str] = None,
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Same output as `hybrid_search.py <query> --top_k k --fusion fusion`."""
+        from hybrid_search import DEFAULT_CANDIDATES, format_results, hybrid_search
+        from med_search import case_number_query
+
+        if case_number_query(query) is not None:
+            return self.op_navigate(query, exclude, target_case)
+        result = hybrid_search(
+            query,
+            self.engine(),
+            lambda: self.vector_clients(collection),
+            top_k=top_k,
+            candidate_limit=candidate_limit or DEFAULT_CANDIDATES,
+            fusion=fusion,
+            weights=weights,
+            bm25_mode=bm25_mode,
+            model=model,
+            excluded=resolve_exclusions(DEFAULT_EXCLUDE if exclude is None else exclude, target_case),
+        )
+        return format_results(query, result, self.store(), fusion)
+
+
+    def op_field_query(
+        self,
+        query: str,
+        top_k: int = 5,
+        fields: Optional[list[str]] = None,
+        aggregation: str = "max",
+        weights: Optional[dict[str, float]] = None,
+        collection: str = DEFAULT_COLLECTION,
+        model: Optional[str] = None,
+        exclude: Optional[list] = None,
+        target_case: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Same output as `multi_vector_index.py query <query> --fields ...`."""
+        from med_search import case_number_query
+        from multi_vector_index import format_results
+        from qdrant_vector_embedding import DEFAULT_EMBEDDING_MODEL, embed_texts
+
+        if case_number_query(query) is not None:
+            return self.op_navigate(query, exclude, target_case)
+        index = self.field_index(collection)
+        _, openrouter = self.vector_clients(collection)
+        query_vector = embed_texts([query], model=model or DEFAULT_EMBEDDING_MODEL, client=openrouter)[0]
+        fields = fields or list(index.fields)
+        hits = index.query(
+            query_vector,
+            top_k,
+            exclude_ids=resolve_exclusions(DEFAULT_EXCLUDE if exclude is None else exclude, target_case),
+            fields=fields,
+            aggregation=aggregation,
+            weights=weights,
+        )
+        return format_results(query, hits, fields, aggregation)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads JSON-lines requests from one client connection."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as exc:
+                response = {"code": 2, "output": "", "error": f"Bad request: {exc}"}
+            else:
+                if request.get("op") == "shutdown":
+                    response = {"code": 0, "output": "shutting down", "error": ""}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    response = self.server.service.handle(request)
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class SearchDaemon(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix-socket server around one SearchService."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, service: SearchService):
+        self.service = service
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+
+def serve(socket_path: Path, service: SearchService, warm: bool = True) -> int:
+    """Run the daemon in the foreground until stopped."""
+    if socket_path.exists():
+        try:
+            running = request("ping", socket_path=socket_path) is not None
+        except TimeoutError:
+            running = True  # alive but busy or hung; do not steal its socket
+        if running:
+            print(f"Search daemon already running on {socket_path}", file=sys.stderr)
+            return 1
+        socket_path.unlink()  # stale socket from a crashed daemon
+
+    if warm:
+        # Load everything up front so the first tool call is as fast as the rest
+        service.engine()
+    server = SearchDaemon(socket_path, service)
+    print(f"Search daemon listening on {socket_path} (corpus: {service.csv_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+    return 0
+
+
+def request(
+    op: str,
+    socket_path: Optional[Path] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    **params: Any,
+) -> Optional[dict]:
+    """Send one request to the daemon.
+
+    None when no daemon is reachable: no socket, connection refused, or the
+    connection dropped or answered with a truncated/invalid reply (a daemon
+    that died), so callers fall back to searching in-process.
+
+    Raises TimeoutError when a daemon is there but does not answer within
+    timeout: running the query again in-process would add a full index load
+    to time the caller has already spent.
+    """
+    path = Path(socket_path or default_socket_path())
+    if not path.exists():
+        return None
+    payload = json.dumps({"op": op, "params": params}, ensure_ascii=False) + "\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(payload.encode("utf-8"))
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        response = json.loads(line) if line else None
+    except TimeoutError:
+        raise TimeoutError(f"Search daemon on {path} did not answer within {timeout:g}s") from None
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+        # Missing/refused sockets, resets and broken pipes: no working daemon
+        return None
+    return response if isinstance(response, dict) else None
+
+
+_local_service: Optional[SearchService] = None
+
+
+def search(op: str, **params: Any) -> dict:
+    """Run a request on the daemon, or in this process if none is running.
+
+    A daemon that times out raises TimeoutError (see request()).
+    """
+    global _local_service
+    response = request(op, **params)
+    if response is None:
+        if _local_service is None:
+            _local_service = SearchService()
+        response = _local_service.handle({"op": op, "params": params})
+    return response
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Resident medical case search daemon")
+    parser.add_argument("--socket", type=Path, default=None, help=f"Socket path (default: ${SOCKET_ENV} or tmp dir)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon in the foreground")
+    serve_parser.add_argument("--csv", type=str, default=str(DEFAULT_CSV), help="Corpus CSV")
+    serve_parser.add_argument("--image-csv", type=str, default=None, help="Image caption CSV")
+    serve_parser.add_argument("--vector-backend", choices=BACKENDS, default=None, help="Vector backend (default: $VECTOR_BACKEND or qdrant)")
+    serve_parser.add_argument("--no-warm", action="store_true", help="Load indexes on first request instead")
+    subparsers.add_parser("status", help="Check whether the daemon is running")
+    subparsers.add_parser("stop", help="Stop a running daemon")
+
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == "serve":
+        return serve(socket_path, SearchService(args.csv, args.image_csv, args.vector_backend), warm=not args.no_warm)
+
+    try:
+        response = request("ping" if args.command == "status" else "shutdown", socket_path=socket_path)
+    except TimeoutError as e:
+        print(e)
+        return 1
+    if response is None:
+        print(f"No search daemon on {socket_path}")
+        return 1
+    print(f"Search daemon on {socket_path}: {response['output']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
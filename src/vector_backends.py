@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Vector search backends: the hosted Qdrant collection or a local NumPy index.
+
+Both implement VectorBackend (query / query_many / retrieve / upsert / delete /
+count / flush), so the search CLIs, the
+search daemon and the benchmark scripts can switch with --backend (or
+$VECTOR_BACKEND) without code changes. Point ids are case numbers.
+
+LocalVectorIndex keeps every vector as an L2-normalised float32 row of one
+memory-mapped matrix and answers cosine top-k exactly with a single
+matrix-vector product plus argpartition, which for this corpus takes well under
+a millisecond and needs no network. Build one from an existing collection with:
+
+    uv run python src/med_vector_search.py export --collection med_deepresearch_qwen3_8b
+
+QuantizedVectorIndex (--backend local-int8 / local-binary) reads the same
+directory but keeps only compact codes resident: int8 scalar codes (4x smaller)
+or sign bits (32x smaller). A query scores every row on the codes, then
+rescores a shortlist against the float rows of the memory-mapped vectors.npy,
+so only the shortlisted pages are ever read. Codes are computed on load when
+the directory does not hold them; store them with:
+
+    uv run python src/benchmark_vector_quantization.py build --quantization int8
+
+A local index may also hold reduced vectors plus the Projection that made them
+(prefix truncation, or PCA fitted on the corpus); full-width query and upsert
+vectors are then projected on the way in. Derive and evaluate one with:
+
+    uv run python src/med_vector_search.py reduce --method pca --dim 512
+    uv run python src/med_vector_search.py evaluate-reduction --dims 256,512,1024
+
+Local index layout (one directory, default data/vector_index/<collection>):
+    manifest.json   format version, dimension, count, distance, source, quantization, projection
+    vectors.npy     float32 (count, dimension), rows L2-normalised
+    ids.npy         int64 point id of each row
+    payloads.json   payload dict of each row
+    int8_codes.npy  int8 (count, dimension) and int8_scales.npy float32 (dimension,)
+    binary_codes.npy  uint8 (count, dimension / 8), packed sign bits
+    projection_mean.npy, projection_components.npy  PCA projection (source_dim,), (dimension, source_dim)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Protocol, Sequence
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SRC_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from bm25_index import dir_lock, read_manifest, replace_dir
+
+FORMAT_VERSION = 1
+BACKENDS = ("qdrant", "local", "local-int8", "local-binary")
+QUANTIZATIONS = ("int8", "binary")
+PROJECTIONS = ("truncate", "pca")
+BACKEND_ENV = "VECTOR_BACKEND"
+DEFAULT_BACKEND = "qdrant"
+DEFAULT_COLLECTION = "med_deepresearch_qwen3_8b"
+DEFAULT_LOCAL_ROOT = PROJECT_ROOT / "data" / "vector_index"
+# Shortlist rescored exactly, as a multiple of the requested limit
+DEFAULT_RESCORE_FACTOR = {"int8": 4, "binary": 16}
+# Rows quantized/compared at once, bounds temporary memory
+_SCORE_BLOCK = 4096
+# int8 rows are widened to float32 for BLAS in blocks of this many values;
+# small enough to stay in cache, which keeps the pass as fast as exact float search
+_INT8_BLOCK_VALUES = 1 << 18
+# Payload key holding the hash of what a point was built from (see med_vector_search.content_hash)
+CONTENT_HASH_KEY = "content_hash"
+
+
+@dataclass
+class VectorHit:
+    id: int
+    score: float
+    payload: dict[str, Any]
+
+
+class VectorBackend(Protocol):
+    def query(self, vector: Sequence[float], limit: int, exclude_ids: Iterable[int] = ()) -> list[VectorHit]:
+        """Top `limit` points by cosine similarity, skipping exclude_ids."""
+
+    def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        limit: int,
+        exclude_ids: Optional[Sequence[Iterable[int]]] = None,
+    ) -> list[list[VectorHit]]:
+        """query() for several vectors in one round trip; exclude_ids is per query."""
+
+    def retrieve(self, ids: Sequence[int]) -> dict[int, np.ndarray]:
+        """Stored vectors of the given ids (missing ids are left out)."""
+
+    def upsert(self, ids: Sequence[int], vectors: Sequence[Sequence[float]], payloads: Sequence[dict[str, Any]]) -> None:
+        """Insert or replace points."""
+
+    def delete(self, ids: Sequence[int]) -> None:
+        """Remove points (unknown ids are ignored)."""
+
+    def content_hashes(self) -> dict[int, Optional[str]]:
+        """CONTENT_HASH_KEY payload value of every point (None when absent)."""
+
+    def count(self) -> int:
+        """Number of stored points."""
+
+    def flush(self) -> None:
+        """Persist upserts that are only held in memory."""
+
+
+def exclusion_filter(excluded: Iterable[int]) -> Optional[Any]:
+    """Qdrant filter dropping excluded case numbers (point ids are case numbers)."""
+    ids = sorted(excluded)
+    if not ids:
+        return None
+    from qdrant_client.models import Filter, HasIdCondition
+
+    return Filter(must_not=[HasIdCondition(has_id=ids)])
+
+
+class QdrantBackend:
+    """A Qdrant collection (hosted cluster from qdrant_vector_embedding by default)."""
+
+    def __init__(self, collection: str = DEFAULT_COLLECTION, client: Any = None):
+        if client is None:
+            from qdrant_vector_embedding import get_qdrant_client
+
+            client = get_qdrant_client()
+        self.collection = collection
+        self.client = client
+
+    def query(self, vector: Sequence[float], limit: int, exclude_ids: Iterable[int] = ()) -> list[VectorHit]:
+        response = self.client.query_points(
+            collection_name=self.collection,
+            query=list(vector),
+            query_filter=exclusion_filter(exclude_ids),
+            limit=limit,
+            with_payload=True,
+        )
+        return [
+            VectorHit(int(point.id), float(point.score) if point.score is not None else 0.0, point.payload or {})
+            for point in response.points
+        ]
+
+    def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        limit: int,
+        exclude_ids: Optional[Sequence[Iterable[int]]] = None,
+        batch_size: int = 128,
+    ) -> list[list[VectorHit]]:
+        from qdrant_client.models import QueryRequest
+
+        exclude_ids = exclude_ids or [()] * len(vectors)
+        requests = [
+            QueryRequest(query=list(map(float, vector)), filter=exclusion_filter(excluded), limit=limit, with_payload=True)
+            for vector, excluded in zip(vectors, exclude_ids)
+        ]
+        results: list[list[VectorHit]] = []
+        for start in range(0, len(requests), batch_size):
+            responses = self.client.query_batch_points(
+                collection_name=self.collection,
+                requests=requests[start:start + batch_size],
+            )
+            results.extend(
+                [
+                    VectorHit(int(point.id), float(point.score) if point.score is not None else 0.0, point.payload or {})
+                    for point in response.points
+                ]
+                for response in responses
+            )
+        return results
+
+    def retrieve(self, ids: Sequence[int]) -> dict[int, np.ndarray]:
+        if not ids:
+            return {}
+        points = self.client.retrieve(
+            collection_name=self.collection,
+            ids=[int(point_id) for point_id in ids],
+            with_payload=False,
+            with_vectors=True,
+        )
+        return {int(point.id): np.asarray(point.vector, dtype=np.float32) for point in points if point.vector is not None}
+
+    def upsert(self, ids: Sequence[int], vectors: Sequence[Sequence[float]], payloads: Sequence[dict[str, Any]]) -> None:
+        from qdrant_client.models import PointStruct
+
+        points = [
+            PointStruct(id=int(point_id), vector=list(vector), payload=payload)
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        self.client.upsert(collection_name=self.collection, points=points, wait=True)
+
+    def delete(self, ids: Sequence[int]) -> None:
+        from qdrant_client.models import PointIdsList
+
+        if ids:
+            self.client.delete(
+                collection_name=self.collection,
+                points_selector=PointIdsList(points=[int(point_id) for point_id in ids]),
+                wait=True,
+            )
+
+    def content_hashes(self) -> dict[int, Optional[str]]:
+        return {
+            point_id: payload.get(CONTENT_HASH_KEY)
+            for point_id, _, payload in self.scroll(batch_size=1024, with_payload=[CONTENT_HASH_KEY], with_vectors=False)
+        }
+
+    def count(self) -> int:
+        return self.client.count(collection_name=self.collection, exact=True).count
+
+    def flush(self) -> None:
+        pass  # upserts are written with wait=True
+
+    def scroll(
+        self,
+        batch_size: int = 256,
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = True,
+    ) -> Iterator[tuple[int, Optional[list[float]], dict[str, Any]]]:
+        """Every (id, vector, payload) in the collection."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+            )
+            for point in points:
+                yield int(point.id), point.vector, point.payload or {}
+            if offset is None:
+                break
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """float32 copy with unit-length rows (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+@dataclass
+class Projection:
+    """Maps full-width embeddings to `dimension` components, then renormalises.
+
+    truncate keeps the first `dimension` components (Matryoshka-style models put
+    the most information first); pca projects the centred vector onto the top
+    principal components of the corpus.
+    """
+    method: str
+    source_dimension: int
+    dimension: int
+    mean: Optional[np.ndarray] = None
+    components: Optional[np.ndarray] = None
+
+    @classmethod
+    def truncate(cls, source_dimension: int, dimension: int) -> "Projection":
+        if not 0 < dimension <= source_dimension:
+            raise ValueError(f"Cannot truncate {source_dimension} dimensions to {dimension}")
+        return cls("truncate", source_dimension, dimension)
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dimension: int) -> "Projection":
+        """Top principal components of the normalised corpus vectors."""
+        vectors = normalize_rows(vectors)
+        if not 0 < dimension <= min(vectors.shape):
+            raise ValueError(f"PCA of {vectors.shape[0]} x {vectors.shape[1]} vectors cannot keep {dimension} components")
+        mean = vectors.mean(axis=0)
+        _, _, components = np.linalg.svd(vectors - mean, full_matrices=False)
+        return cls("pca", vectors.shape[1], dimension, mean, np.ascontiguousarray(components[:dimension]))
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """Normalised projection of full-width vectors; already projected ones pass through."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        width = vectors.shape[-1]
+        if width == self.dimension:
+            return normalize_rows(vectors)
+        if width != self.source_dimension:
+            raise ValueError(f"Expected {self.source_dimension}- or {self.dimension}-dimensional vectors, got {width}")
+        if self.method == "truncate":
+            return normalize_rows(vectors[..., :self.dimension])
+        # Centre in the same (unit-norm) space the components were fitted in
+        return normalize_rows((normalize_rows(vectors) - self.mean) @ self.components.T)
+
+    def save(self, directory: Path) -> dict[str, Any]:
+        """Write arrays into directory; returns the manifest entry."""
+        if self.method == "pca":
+            np.save(directory / "projection_mean.npy", self.mean)
+            np.save(directory / "projection_components.npy", self.components)
+        return {"method": self.method, "source_dimension": self.source_dimension, "dimension": self.dimension}
+
+    @classmethod
+    def load(cls, directory: Path, entry: dict[str, Any]) -> "Projection":
+        projection = cls(entry["method"], entry["source_dimension"], entry["dimension"])
+        if projection.method == "pca":
+            projection.mean = np.load(directory / "projection_mean.npy")
+            projection.components = np.load(directory / "projection_components.npy")
+        return projection
+
+
+class LocalVectorIndex:
+    """Exact cosine search over an in-memory (or memory-mapped) float32 matrix."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+        path: Optional[Path] = None,
+        normalized: bool = False,
+        projection: Optional[Projection] = None,
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.projection = projection
+        self.vectors = vectors if normalized else self.prepare(vectors)
+        self.payloads = payloads
+        self.path = Path(path) if path else None
+        if not (len(self.ids) == len(self.vectors) == len(self.payloads)):
+            raise ValueError("ids, vectors and payloads must have the same length")
+        self.row_of = {int(point_id): row for row, point_id in enumerate(self.ids)}
+
+    @staticmethod
+    def default_dir(collection: str = DEFAULT_COLLECTION) -> Path:
+        return DEFAULT_LOCAL_ROOT / collection
+
+    def prepare(self, vectors: Sequence[Sequence[float]] | np.ndarray) -> np.ndarray:
+        """Incoming (query or upsert) vectors as normalised rows in this index's space."""
+        if self.projection is not None:
+            return self.projection.apply(vectors)
+        return normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+    def reduced(self, projection: Projection) -> "LocalVectorIndex":
+        """New in-memory index holding this index's vectors projected by projection."""
+        vectors = np.empty((self.count(), projection.dimension), dtype=np.float32)
+        for start in range(0, self.count(), _SCORE_BLOCK):
+            vectors[start:start + _SCORE_BLOCK] = projection.apply(self.vectors[start:start + _SCORE_BLOCK])
+        return LocalVectorIndex(self.ids, vectors, self.payloads, normalized=True, projection=projection)
+
+    @classmethod
+    def empty(cls, dimension: int, path: Optional[str | Path] = None) -> "LocalVectorIndex":
+        return cls(np.empty(0, dtype=np.int64), np.empty((0, dimension), dtype=np.float32), [], path=path)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "LocalVectorIndex":
+        path = Path(path)
+        manifest = read_manifest(path)
+        if manifest is None or manifest.get("format_version") != FORMAT_VERSION:
+            raise FileNotFoundError(
+                f"No local vector index at {path}. Build one with: "
+                "uv run python src/med_vector_search.py export --collection <name>"
+            )
+        mmap_mode = "r" if mmap else None
+        with (path / "payloads.json").open("r", encoding="utf-8") as f:
+            payloads = json.load(f)
+        projection = manifest.get("projection")
+        return cls(
+            ids=np.load(path / "ids.npy", mmap_mode=mmap_mode),
+            vectors=np.load(path / "vectors.npy", mmap_mode=mmap_mode),
+            payloads=payloads,
+            path=path,
+            normalized=True,
+            projection=Projection.load(path, projection) if projection else None,
+        )
+
+    def save(self, path: Optional[str | Path] = None, source: Optional[str] = None) -> None:
+        """Write the index atomically (tmp dir + rename) under the directory lock."""
+        path = Path(path or self.path)
+        with dir_lock(path):
+            tmp_dir = path.parent / f".{path.name}.tmp-{os.getpid()}"
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+            np.save(tmp_dir / "ids.npy", np.ascontiguousarray(self.ids))
+            np.save(tmp_dir / "vectors.npy", np.ascontiguousarray(self.vectors))
+            with (tmp_dir / "payloads.json").open("w", encoding="utf-8") as f:
+                json.dump(self.payloads, f, ensure_ascii=False)
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "dimension": self.dimension,
+                "count": self.count(),
+                "distance": "cosine",
+                "source": source,
+                "projection": self.projection.save(tmp_dir) if self.projection else None,
+                **self._write_extra(tmp_dir, path),
+            }
+            # Manifest last: a directory without one is never loaded
+            with (tmp_dir / "manifest.json").open("w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            replace_dir(tmp_dir, path)
+        self.path = path
+
+    def _write_extra(self, directory: Path, target: Path) -> dict[str, Any]:
+        """Write subclass files into a snapshot being saved to target; returns manifest entries."""
+        return {}
+
+    @classmethod
+    def from_qdrant(cls, backend: QdrantBackend, batch_size: int = 256) -> "LocalVectorIndex":
+        """Copy every point of a Qdrant collection into a new local index."""
+        ids, vectors, payloads = [], [], []
+        for point_id, vector, payload in backend.scroll(batch_size):
+            ids.append(point_id)
+            vectors.append(vector)
+            payloads.append(payload)
+        return cls(np.array(ids, dtype=np.int64), np.array(vectors, dtype=np.float32).reshape(len(ids), -1), payloads)
+
+    def _select(self, scores: np.ndarray, limit: int, exclude_ids: Iterable[int]) -> np.ndarray:
+        """Rows of the `limit` highest scores, excluded ids skipped (unordered)."""
+        candidates = np.arange(len(scores))
+        excluded = [self.row_of[i] for i in exclude_ids if i in self.row_of]
+        if excluded:
+            keep = np.ones(len(scores), dtype=bool)
+            keep[excluded] = False
+            candidates = candidates[keep]
+        if len(candidates) > limit:
+            part = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[part]
+        return candidates
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray, limit: int) -> list[VectorHit]:
+        """Best `limit` of rows with their scores (aligned with rows), ties by id."""
+        order = np.lexsort((self.ids[rows], -scores))[:limit]
+        return [VectorHit(int(self.ids[rows[i]]), float(scores[i]), self.payloads[rows[i]]) for i in order]
+
+    def _top_hits(self, scores: np.ndarray, limit: int, exclude_ids: Iterable[int]) -> list[VectorHit]:
+        rows = self._select(scores, limit, exclude_ids)
+        return self._hits(rows, scores[rows], limit)
+
+    def query(self, vector: Sequence[float], limit: int, exclude_ids: Iterable[int] = ()) -> list[VectorHit]:
+        if limit <= 0 or not self.count():
+            return []
+        scores = self.vectors @ self.prepare(vector)
+        return self._top_hits(scores, limit, exclude_ids)
+
+    def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        limit: int,
+        exclude_ids: Optional[Sequence[Iterable[int]]] = None,
+    ) -> list[list[VectorHit]]:
+        exclude_ids = exclude_ids or [()] * len(vectors)
+        if limit <= 0 or not self.count() or not len(vectors):
+            return [[] for _ in range(len(vectors))]
+        # One (corpus x queries) matrix product for the whole batch
+        scores = self.vectors @ self.prepare(vectors).T
+        return [self._top_hits(scores[:, col], limit, excluded) for col, excluded in enumerate(exclude_ids)]
+
+    def retrieve(self, ids: Sequence[int]) -> dict[int, np.ndarray]:
+        return {int(i): np.array(self.vectors[self.row_of[int(i)]]) for i in ids if int(i) in self.row_of}
+
+    def upsert(self, ids: Sequence[int], vectors: Sequence[Sequence[float]], payloads: Sequence[dict[str, Any]]) -> None:
+        """Insert or replace points in memory; flush() writes them to disk.
+
+        Replaced points move to the end; row order carries no meaning.
+        """
+        if not len(ids):
+            return
+        incoming = {int(point_id): row for row, point_id in enumerate(ids)}  # last one wins
+        new_rows = list(incoming.values())
+        new_vectors = self.prepare(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)[new_rows])
+        keep = [row for row, point_id in enumerate(self.ids) if int(point_id) not in incoming]
+
+        self.ids = np.concatenate([self.ids[keep], np.fromiter(incoming, dtype=np.int64, count=len(incoming))])
+        self.vectors = np.vstack([np.asarray(self.vectors)[keep].reshape(len(keep), -1), new_vectors]) if keep else new_vectors
+        self.payloads = [self.payloads[row] for row in keep] + [payloads[row] for row in new_rows]
+        self.row_of = {int(point_id): row for row, point_id in enumerate(self.ids)}
+
+    def delete(self, ids: Sequence[int]) -> None:
+        drop = {self.row_of[int(point_id)] for point_id in ids if int(point_id) in self.row_of}
+        if not drop:
+            return
+        keep = [row for row in range(len(self.ids)) if row not in drop]
+        self.ids = self.ids[keep]
+        self.vectors = np.asarray(self.vectors)[keep].reshape(len(keep), -1)
+        self.payloads = [self.payloads[row] for row in keep]
+        self.row_of = {int(point_id): row for row, point_id in enumerate(self.ids)}
+
+    def content_hashes(self) -> dict[int, Optional[str]]:
+        return {int(point_id): payload.get(CONTENT_HASH_KEY) for point_id, payload in zip(self.ids, self.payloads)}
+
+    def flush(self) -> None:
+        if self.path is not None:
+            self.save(self.path)
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-dimension int8 codes and scales; row ~= codes * scales."""
+    dimension = vectors.shape[1]
+    max_abs = np.zeros(dimension, dtype=np.float32)
+    for start in range(0, len(vectors), _SCORE_BLOCK):
+        np.maximum(max_abs, np.abs(np.asarray(vectors[start:start + _SCORE_BLOCK], dtype=np.float32)).max(axis=0), out=max_abs)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    codes = np.empty(vectors.shape, dtype=np.int8)
+    for start in range(0, len(vectors), _SCORE_BLOCK):
+        block = np.asarray(vectors[start:start + _SCORE_BLOCK], dtype=np.float32) / scales
+        codes[start:start + _SCORE_BLOCK] = np.clip(np.rint(block), -127, 127)
+    return codes, scales
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Sign bit of every component, packed 8 per byte."""
+    codes = np.empty((len(vectors), (vectors.shape[1] + 7) // 8), dtype=np.uint8)
+    for start in range(0, len(vectors), _SCORE_BLOCK):
+        codes[start:start + _SCORE_BLOCK] = np.packbits(np.asarray(vectors[start:start + _SCORE_BLOCK]) > 0, axis=1)
+    return codes
+
+
+class QuantizedVectorIndex(LocalVectorIndex):
+    """Two-pass cosine search: compact codes in memory, exact rescoring from the float rows.
+
+    The float vectors should be memory-mapped (load() does this); only the
+    shortlisted rows are read from them, so resident memory is about the size
+    of the codes. Results are exact whenever the true top `limit` rows make
+    the shortlist of limit * rescore_factor rows.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+        path: Optional[Path] = None,
+        normalized: bool = False,
+        quantization: str = "int8",
+        rescore_factor: Optional[int] = None,
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+        projection: Optional[Projection] = None,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}'. Use one of: {', '.join(QUANTIZATIONS)}")
+        super().__init__(ids, vectors, payloads, path=path, normalized=normalized, projection=projection)
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor or DEFAULT_RESCORE_FACTOR[quantization]
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        quantization: str = "int8",
+        rescore_factor: Optional[int] = None,
+    ) -> "QuantizedVectorIndex":
+        index = LocalVectorIndex.load(path, mmap=True)
+        codes = scales = None
+        manifest = read_manifest(index.path) or {}
+        if quantization in manifest.get("quantization", []):
+            codes = np.load(index.path / f"{quantization}_codes.npy")
+            if quantization == "int8":
+                scales = np.load(index.path / "int8_scales.npy")
+        return cls(
+            index.ids,
+            index.vectors,
+            index.payloads,
+            path=index.path,
+            normalized=True,
+            quantization=quantization,
+            rescore_factor=rescore_factor,
+            codes=codes,
+            scales=scales,
+            projection=index.projection,
+        )
+
+    def _ensure_codes(self) -> None:
+        if self.codes is not None and len(self.codes) == self.count():
+            return
+        if self.quantization == "int8":
+            self.codes, self.scales = quantize_int8(self.vectors)
+        else:
+            self.codes = quantize_binary(self.vectors)
+
+    def resident_bytes(self) -> int:
+        """Memory held by the codes (the float rows stay on disk)."""
+        self._ensure_codes()
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """(count, len(queries)) first-pass scores of normalised queries; higher is closer."""
+        self._ensure_codes()
+        scores = np.empty((self.count(), len(queries)), dtype=np.float32)
+        if self.quantization == "int8":
+            scaled = (queries * self.scales).T
+            step = max(16, _INT8_BLOCK_VALUES // max(1, self.dimension))
+            for start in range(0, self.count(), step):
+                scores[start:start + step] = self.codes[start:start + step].astype(np.float32) @ scaled
+        else:
+            # Negated Hamming distance between sign bits: XOR, then popcount
+            bits = np.packbits(queries > 0, axis=1)
+            step = max(64, _SCORE_BLOCK // len(queries))
+            for start in range(0, self.count(), step):
+                block = self.codes[start:start + step, None, :] ^ bits[None, :, :]
+                scores[start:start + step] = -np.bitwise_count(block).sum(axis=2, dtype=np.int32)
+        return scores
+
+    def _rescored_hits(self, approximate: np.ndarray, query: np.ndarray, limit: int, exclude_ids: Iterable[int]) -> list[VectorHit]:
+        # Sorted rows read the memory-mapped file front to back
+        rows = np.sort(self._select(approximate, limit * self.rescore_factor, exclude_ids))
+        return self._hits(rows, np.asarray(self.vectors[rows]) @ query, limit)
+
+    def query(self, vector: Sequence[float], limit: int, exclude_ids: Iterable[int] = ()) -> list[VectorHit]:
+        return self.query_many([vector], limit, [exclude_ids])[0]
+
+    def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        limit: int,
+        exclude_ids: Optional[Sequence[Iterable[int]]] = None,
+    ) -> list[list[VectorHit]]:
+        exclude_ids = exclude_ids or [()] * len(vectors)
+        if limit <= 0 or not self.count() or not len(vectors):
+            return [[] for _ in range(len(vectors))]
+        queries = self.prepare(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1))
+        approximate = self.approximate_scores(queries)
+        return [
+            self._rescored_hits(approximate[:, col], queries[col], limit, excluded)
+            for col, excluded in enumerate(exclude_ids)
+        ]
+
+    def upsert(self, ids: Sequence[int], vectors: Sequence[Sequence[float]], payloads: Sequence[dict[str, Any]]) -> None:
+        super().upsert(ids, vectors, payloads)
+        self.codes = self.scales = None  # requantized on the next query or save
+
+    def delete(self, ids: Sequence[int]) -> None:
+        super().delete(ids)
+        self.codes = self.scales = None
+
+    def _write_extra(self, directory: Path, target: Path) -> dict[str, Any]:
+        """Codes of this quantization plus every other one the target snapshot had.
+
+        The other codes are recomputed from the vectors being saved (they may
+        have changed since), so saving an int8 index over a directory that
+        also serves binary search keeps both.
+        """
+        existing = (read_manifest(target) or {}).get("quantization", [])
+        kept = [q for q in QUANTIZATIONS if q == self.quantization or q in existing]
+        for quantization in kept:
+            if quantization == self.quantization:
+                self._ensure_codes()
+                codes, scales = self.codes, self.scales
+            elif quantization == "int8":
+                codes, scales = quantize_int8(self.vectors)
+            else:
+                codes, scales = quantize_binary(self.vectors), None
+            np.save(directory / f"{quantization}_codes.npy", codes)
+            if scales is not None:
+                np.save(directory / "int8_scales.npy", scales)
+        return {"quantization": kept}
+
+
+def open_backend(
+    kind: Optional[str] = None,
+    collection: str = DEFAULT_COLLECTION,
+    local_path: Optional[str | Path] = None,
+    client: Any = None,
+) -> VectorBackend:
+    """Backend by name (one of BACKENDS; default $VECTOR_BACKEND or qdrant)."""
+    kind = kind or os.getenv(BACKEND_ENV) or DEFAULT_BACKEND
+    if kind == "qdrant":
+        return QdrantBackend(collection, client=client)
+    if kind == "local":
+        return LocalVectorIndex.load(local_path or LocalVectorIndex.default_dir(collection))
+    if kind.startswith("local-") and kind[len("local-"):] in QUANTIZATIONS:
+        return QuantizedVectorIndex.load(local_path or LocalVectorIndex.default_dir(collection), kind[len("local-"):])
+    raise ValueError(f"Unknown vector backend '{kind}'. Use one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test that the array-backed BM25 index ranks exactly like rank_bm25.BM25Okapi."""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from rank_bm25 import BM25Okapi
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from bm25_index import BM25FIndex, BM25Index
+
+VOCAB = [f"w{i}" for i in range(60)]
+
+
+def toy_corpus(seed: int = 0, docs: int = 120) -> list[list[str]]:
+    """Zipf-like corpus: a few terms occur in most documents (negative IDF),
+    plus empty documents and exact duplicates to produce score ties."""
+    rng = random.Random(seed)
+    corpus = [
+        [VOCAB[min(int(rng.expovariate(0.08)), len(VOCAB) - 1)] for _ in range(rng.randint(0, 30))]
+        for _ in range(docs)
+    ]
+    corpus += [list(corpus[3]), list(corpus[7]), [], list(corpus[3])]
+    return corpus
+
+
+def toy_queries(seed: int = 1, count: int = 60) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [[rng.choice(VOCAB + ["unknown"]) for _ in range(rng.randint(1, 5))] for _ in range(count)]
+
+
+def reference_top_k(scores: np.ndarray, k: int, exclude: np.ndarray | None = None) -> list[int]:
+    """Positive-score documents by descending score, ties in document order."""
+    order = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+    return [i for i in order if scores[i] > 0 and (exclude is None or not exclude[i])][:k]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return toy_corpus()
+
+
+@pytest.fixture(scope="module")
+def index(corpus):
+    return BM25Index.from_tokenized(corpus)
+
+
+def test_idf_matches_including_epsilon_floor(corpus, index):
+    reference = BM25Okapi(corpus)
+    assert any(reference.idf[term] == reference.average_idf * reference.epsilon for term in reference.idf), \
+        "toy corpus should contain terms floored at epsilon * average idf"
+    for term, idf in reference.idf.items():
+        assert index.idf[index.term_ids[term]] == pytest.approx(idf)
+
+
+def test_scores_match_bm25okapi(corpus, index):
+    reference = BM25Okapi(corpus)
+    for query in toy_queries():
+        np.testing.assert_allclose(index.get_scores(query), reference.get_scores(query), rtol=1e-12, atol=1e-12)
+
+
+def test_top_k_ranking_and_ties_match_bm25okapi(corpus, index):
+    reference = BM25Okapi(corpus)
+    for query in toy_queries():
+        expected = reference_top_k(reference.get_scores(query), 10)
+        docs, scores = index.top_k(query, 10)
+        assert list(docs) == expected
+        np.testing.assert_allclose(scores, reference.get_scores(query)[expected])
+
+    # Duplicated documents score the same and come back in document order
+    docs, _ = index.top_k(corpus[3], len(corpus))
+    duplicates = [d for d in docs if corpus[d] == corpus[3]]
+    assert duplicates == sorted(duplicates) and len(duplicates) == 3
+
+
+def test_top_k_many_matches_top_k(index):
+    queries = toy_queries()
+    rng = np.random.default_rng(0)
+    exclude = rng.random(index.corpus_size) < 0.2
+    per_query = rng.random((len(queries), index.corpus_size)) < 0.2
+
+    # Several query blocks, and postings gathered in chunks (splitting queries' terms)
+    for kwargs in ({}, {"max_cells": index.corpus_size * 7}, {"max_postings": 7}, {"max_postings": 100}):
+        for (docs, scores), query in zip(index.top_k_many(queries, 8, **kwargs), queries):
+            expected_docs, expected_scores = index.top_k(query, 8)
+            assert list(docs) == list(expected_docs)
+            np.testing.assert_allclose(scores, expected_scores)
+
+    for (docs, _), query in zip(index.top_k_many(queries, 8, exclude=exclude), queries):
+        assert list(docs) == list(index.top_k(query, 8, exclude=exclude)[0])
+    for i, ((docs, _), query) in enumerate(zip(index.top_k_many(queries, 8, exclude=per_query), queries)):
+        assert list(docs) == list(index.top_k(query, 8, exclude=per_query[i])[0])
+
+
+def test_top_k_many_chunked_postings_are_bit_identical(corpus, index):
+    """Whole-document queries gathered a few postings at a time give the same floats."""
+    queries = corpus[:40]
+    expected = index.top_k_many(queries, 8)
+    for max_postings in (1, 13, 500):
+        for (docs, scores), (expected_docs, expected_scores) in zip(
+            index.top_k_many(queries, 8, max_postings=max_postings), expected
+        ):
+            assert np.array_equal(docs, expected_docs)
+            assert np.array_equal(scores, expected_scores)
+
+
+def test_bm25f_single_field_equals_bm25(corpus, index):
+    """With one field of weight 1, BM25F reduces to BM25Okapi."""
+    fielded = BM25FIndex.from_tokenized_fields(index, ["text"], ([doc] for doc in corpus))
+    reference = BM25Okapi(corpus)
+    for query in toy_queries():
+        expected = reference_top_k(reference.get_scores(query), 10)
+        docs, scores = fielded.top_k(query, 10, weights={"text": 1.0})
+        assert list(docs) == expected
+        np.testing.assert_allclose(scores, reference.get_scores(query)[expected])
+
+
+def test_bm25f_unit_weights_without_length_normalisation_equals_bm25(corpus):
+    """Several fields of weight 1 and b = 0 sum to the plain term frequency."""
+    fields = [(doc[: len(doc) // 2], doc[len(doc) // 2:]) for doc in corpus]
+    base = BM25Index.from_tokenized([a + b for a, b in fields], b=0.0)
+    fielded = BM25FIndex.from_tokenized_fields(base, ["history", "findings"], fields)
+    reference = BM25Okapi(corpus, b=0.0)
+    for query in toy_queries():
+        expected = reference_top_k(reference.get_scores(query), 10)
+        docs, scores = fielded.top_k(
+            query, 10, weights={"history": 1.0, "findings": 1.0}, b={"history": 0.0, "findings": 0.0}
+        )
+        assert list(docs) == expected
+        np.testing.assert_allclose(scores, reference.get_scores(query)[expected])
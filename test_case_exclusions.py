@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test that excluded cases never leak into search results (benchmark leakage)."""
+
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from case_exclusions import TARGET, resolve_exclusions
+from med_search import MedSearchEngine
+
+NUM_CASES = 12
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    """Toy corpus where case 1000 + i mentions the query term NUM_CASES - i times,
+    so the lowest case numbers are the top scorers."""
+    tmp = tmp_path_factory.mktemp("corpus")
+    corpus_csv = tmp / "corpus.csv"
+    with open(corpus_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["case_title", "link", "clinical_history", "final_diagnosis"])
+        writer.writeheader()
+        for i in range(NUM_CASES):
+            number = 1000 + i
+            writer.writerow({
+                "case_title": f"Case number {number}",
+                "link": f"https://www.eurorad.org/case/{number}",
+                "clinical_history": " ".join(["pneumothorax"] * (NUM_CASES - i) + ["chest", "pain"] * 5),
+                "final_diagnosis": f"Diagnosis {number}",
+            })
+    image_csv = tmp / "images.csv"
+    image_csv.write_text("plink,img_url,img_alt,img_id\n", encoding="utf-8")
+    return MedSearchEngine(str(corpus_csv), image_csv_path=str(image_csv), use_snapshot=False)
+
+
+def numbers(results):
+    return [case.case_number for case, _ in results]
+
+
+def test_unexcluded_ranking(engine):
+    assert numbers(engine.search("pneumothorax", top_k=3)) == [1000, 1001, 1002]
+
+
+@pytest.mark.parametrize("mode", ["bm25", "bm25f"])
+def test_excluded_top_scorers_are_skipped_and_k_is_filled(engine, mode):
+    results = engine.search("pneumothorax", top_k=3, mode=mode, exclude=[1000, "1001", TARGET], target_case=1002)
+    assert numbers(results) == [1003, 1004, 1005]
+
+
+def test_excluded_cases_never_appear_for_any_k(engine):
+    excluded = {1000, 1003, 1007, 1011}
+    for k in range(1, NUM_CASES + 1):
+        found = numbers(engine.search("pneumothorax chest", top_k=k, exclude=excluded))
+        assert not excluded & set(found)
+        assert len(found) == min(k, NUM_CASES - len(excluded))
+
+
+def test_excluded_case_is_not_found_by_number(engine):
+    assert numbers(engine.search("1004")) == [1004]
+    assert engine.search("1004", exclude=[1004]) == []
+    assert engine.search("1004", exclude=[TARGET], target_case=1004) == []
+
+
+def test_search_many_applies_exclusions_per_query(engine):
+    queries = ["pneumothorax", "pneumothorax", "1000"]
+    results = engine.search_many(queries, top_k=2, exclude=[1001, TARGET], target_cases=[1000, 1002, 1000])
+    assert [numbers(r) for r in results] == [[1002, 1003], [1000, 1003], []]
+
+
+def test_resolve_exclusions():
+    assert resolve_exclusions([5, "6", TARGET], target_case=7) == {5, 6, 7}
+    assert resolve_exclusions([TARGET]) == frozenset()
+    with pytest.raises(ValueError):
+        resolve_exclusions(["no_such_list"])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test that concurrent tool calls sharing one Session never lose store entries."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src" / "agent_v2"))
+
+from session import Session
+
+THREADS = 8
+APPENDS = 25
+
+
+class SlowSaveSession(Session):
+    """Widens the window between an append and its save, where a reload used to land."""
+
+    def save(self):
+        time.sleep(0.002)
+        super().save()
+
+
+def test_concurrent_append_store_and_reload_keep_every_entry(tmp_path):
+    # One shared object, as for the tool calls of one agent turn
+    session = SlowSaveSession(session_id="concurrent", session_dir=tmp_path)
+    start = threading.Barrier(THREADS * 2)
+
+    def append(worker: int):
+        start.wait()
+        for i in range(APPENDS):
+            session.append_store({"worker": worker, "i": i})
+
+    def reload():
+        start.wait()
+        for _ in range(APPENDS * 2):
+            session.reload()
+
+    threads = [threading.Thread(target=append, args=(w,)) for w in range(THREADS)]
+    threads += [threading.Thread(target=reload) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = {(w, i) for w in range(THREADS) for i in range(APPENDS)}
+    for view in (session, Session(session_id="concurrent", session_dir=tmp_path)):
+        stored = [(entry["data"]["worker"], entry["data"]["i"]) for entry in view.store]
+        assert len(stored) == len(expected)
+        assert set(stored) == expected
+
+
+def test_concurrent_add_run_keeps_every_run(tmp_path):
+    session = SlowSaveSession(session_id="runs", session_dir=tmp_path)
+    threads = [threading.Thread(target=session.add_run, args=({"run_id": f"r{i}"},)) for i in range(THREADS * 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reloaded = Session(session_id="runs", session_dir=tmp_path)
+    assert sorted(run["run_id"] for run in reloaded.history) == sorted(f"r{i}" for i in range(THREADS * 4))